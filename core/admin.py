@@ -1,9 +1,69 @@
 from django.contrib import admin
-from .models import *
+from django.contrib.admin.views.main import ChangeList
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models.functions import Substr
+from django.utils.functional import cached_property
+from django.utils.text import Truncator
+from .cache import bump_version
+from .models import Tag, Skill, ContactMessage, Project, Post, Comment, TimelineEvent, Job, DailyView, localized
+from .signals import batched_comment_changes
+from .snapshot import mark_dirty, post_paths
 from markdownx.admin import MarkdownxModelAdmin
 from modeltranslation.admin import TranslationAdmin
 
 
+# -----------------
+# LARGE TABLES
+# -----------------
+class EstimatedCountPaginator(Paginator):
+    """Counts an unfiltered PostgreSQL table from the planner's statistics
+    once it holds more than ``threshold`` rows, instead of COUNT(*)."""
+    threshold = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql' and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT reltuples FROM pg_class WHERE oid = %s::regclass', [queryset.model._meta.db_table])
+                row = cursor.fetchone()
+            if row and row[0] > self.threshold:
+                return int(row[0])
+        return super().count
+
+
+class PreviewChangeList(ChangeList):
+    def get_queryset(self, request, exclude_parameters=None):
+        queryset = super().get_queryset(request, exclude_parameters)
+        previews = self.model_admin.previews
+        if not previews:
+            return queryset
+        # The database cuts the text, so long bodies never leave it.
+        return queryset.defer(*previews).annotate(**{
+            f'{field}_head': Substr(field, 1, length + 1) for field, length in previews.items()
+        })
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Changelists for tables that grow without bound (visitor submissions,
+    jobs, analytics): estimated totals, no second COUNT(*) for the
+    unfiltered total, and ``previews`` ({field: length}) listed as
+    ``<field>_preview`` with the text cut by the database.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    previews = {}
+
+    def get_changelist(self, request, **kwargs):
+        return PreviewChangeList
+
+    def preview(self, obj, field):
+        return Truncator(getattr(obj, f'{field}_head', None) or '').chars(self.previews[field])
+
+
 class TagAdmin(admin.ModelAdmin):
     list_display = ('name', 'slug')
     prepopulated_fields = {'slug': ('name',)}
@@ -11,8 +71,38 @@ class TagAdmin(admin.ModelAdmin):
 class SkillAdmin(admin.ModelAdmin):
     list_display = ('name', 'logo', 'is_key_skill')
 
-class ContactMessageAdmin(admin.ModelAdmin):
-    list_display = ('name', 'email', 'message', 'timestamp')
+class ContactMessageAdmin(LargeTableAdmin):
+    list_display = ('name', 'email', 'message_preview', 'timestamp', 'is_spam', 'spam_score')
+    list_filter = ('is_spam', 'timestamp')
+    search_fields = ('email__iexact',)  # indexed on UPPER(email)
+    ordering = ('-timestamp',)
+    previews = {'message': 80}
+    actions = ['mark_spam', 'mark_not_spam', 'delete_messages']
+
+    @admin.display(description='Message')
+    def message_preview(self, obj):
+        return self.preview(obj, 'message')
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)  # one query per message
+        return actions
+
+    @admin.action(description='Mark selected messages as spam')
+    def mark_spam(self, request, queryset):
+        count = queryset.update(is_spam=True)
+        self.message_user(request, f'{count} messages marked as spam.')
+
+    @admin.action(description='Mark selected messages as not spam')
+    def mark_not_spam(self, request, queryset):
+        count = queryset.update(is_spam=False)
+        self.message_user(request, f'{count} messages marked as not spam.')
+
+    @admin.action(description='Delete selected messages', permissions=['delete'])
+    def delete_messages(self, request, queryset):
+        # No signals or relations, so this is a single DELETE.
+        count, _ = queryset.delete()
+        self.message_user(request, f'{count} messages deleted.')
 
 class ProjectAdmin(TranslationAdmin, MarkdownxModelAdmin):
     list_display = ('title', 'slug', 'category', 'short_description', 'is_featured', 'created_at')
@@ -23,12 +113,80 @@ class PostAdmin(TranslationAdmin, MarkdownxModelAdmin):
     list_display = ('title', 'slug', 'is_active', 'created_at')
     prepopulated_fields = {'slug': ('title',)}
 
-class CommentAdmin(admin.ModelAdmin):
-    list_display = ('post', 'author_name', 'body', 'created_at', 'is_approved')
+class CommentAdmin(LargeTableAdmin):
+    list_display = ('post_title', 'author_name', 'body_preview', 'created_at', 'is_approved', 'is_spam', 'spam_score')
+    list_filter = ('is_approved', 'is_spam', 'created_at')
+    search_fields = ('author_name__iexact', 'post__slug__exact')  # indexed on UPPER(author_name), slug
+    ordering = ('-created_at',)
+    previews = {'body': 80}
+    actions = ['approve', 'reject', 'delete_comments']
+
+    def get_queryset(self, request):
+        # Joins the post for its title only, not its Markdown bodies.
+        return super().get_queryset(request).annotate(post_title=localized('post__title'))
+
+    @admin.display(description='Post', ordering='post_title')
+    def post_title(self, obj):
+        return obj.post_title
+
+    @admin.display(description='Body')
+    def body_preview(self, obj):
+        return self.preview(obj, 'body')
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)  # one query per comment
+        return actions
+
+    def published(self, slugs):
+        # Bulk updates send no signals and bulk deletes batch theirs: refresh
+        # once what invalidate_comment would for each row.
+        bump_version(Comment)
+        mark_dirty(post_paths(*slugs))
+
+    def post_slugs(self, queryset):
+        return list(Post.objects.filter(pk__in=queryset.values('post_id')).values_list('slug', flat=True))
+
+    @admin.action(description='Approve selected comments')
+    def approve(self, request, queryset):
+        count = queryset.filter(is_approved=False).update(is_approved=True)
+        self.published(self.post_slugs(queryset))
+        self.message_user(request, f'{count} comments approved.')
+
+    @admin.action(description='Reject selected comments')
+    def reject(self, request, queryset):
+        count = queryset.filter(is_approved=True).update(is_approved=False)
+        self.published(self.post_slugs(queryset))
+        self.message_user(request, f'{count} comments rejected.')
+
+    @admin.action(description='Delete selected comments', permissions=['delete'])
+    def delete_comments(self, request, queryset):
+        slugs = self.post_slugs(queryset)
+        with batched_comment_changes():
+            count, _ = queryset.only('pk', 'post_id', 'is_approved').delete()
+        self.published(slugs)
+        self.message_user(request, f'{count} comments deleted.')
 
 class TimelineEventAdmin(TranslationAdmin):
     list_display = ('year', 'title', 'description', 'order')
 
+class JobAdmin(LargeTableAdmin):
+    list_display = ('name', 'status', 'attempts', 'run_at', 'created_at', 'finished_at')
+    list_filter = ('status', 'name')
+    readonly_fields = ('locked_at', 'last_error', 'created_at', 'finished_at')
+
+# Read-only: rows are written in batches by core/analytics.py.
+class DailyViewAdmin(LargeTableAdmin):
+    list_display = ('day', 'kind', 'object_id', 'referrer', 'views')
+    list_filter = ('kind', 'day')
+    search_fields = ('referrer',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
 admin.site.register(Tag, TagAdmin)
 admin.site.register(TimelineEvent, TimelineEventAdmin)
 admin.site.register(Skill, SkillAdmin)
@@ -36,3 +194,5 @@ admin.site.register(ContactMessage, ContactMessageAdmin)
 admin.site.register(Project, ProjectAdmin)
 admin.site.register(Post, PostAdmin)
 admin.site.register(Comment, CommentAdmin)
+admin.site.register(Job, JobAdmin)
+admin.site.register(DailyView, DailyViewAdmin)
@@ -0,0 +1,179 @@
+"""
+View counting without a database write per view.
+
+The frontend reports each post or project page view to ``POST /api/views/``
+(a beacon, so it works when pages are read from the static snapshot too).
+A view is dropped if the same visitor (a hash of client address, user
+agent, item and day, remembered in the ANALYTICS_CACHE_ALIAS cache for
+ANALYTICS_DEDUP_SECONDS) already counted. Otherwise it is added to an
+in-process buffer keyed by item, day and referring site.
+
+A daemon thread writes the buffer every ANALYTICS_FLUSH_SECONDS as one
+transaction: missing DailyView rollup rows are inserted in bulk, then
+every row is incremented with one ``F()`` UPDATE per distinct count. The buffer
+is also written when it reaches ANALYTICS_MAX_BUFFERED keys and when the
+process exits, so a crashed worker loses at most one flush interval.
+"""
+import atexit
+import datetime
+import hashlib
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+from rest_framework.throttling import BaseThrottle
+
+from .cache import bump_version
+from .models import DailyView, Post, Project
+
+logger = logging.getLogger(__name__)
+
+# kind -> published items
+KINDS = {
+    'post': lambda: Post.objects.filter(is_active=True),
+    'project': lambda: Project.objects.all(),
+}
+SEEN_KEY = 'analytics:seen:{}'
+BOTS = ('bot', 'crawl', 'spider', 'slurp', 'preview', 'headless')
+
+
+def referrer_host(url):
+    host = (urlsplit(url or '').hostname or '').lower()
+    return host.removeprefix('www.')[:100]
+
+
+def fingerprint(request, kind, slug, day):
+    parts = [BaseThrottle().get_ident(request), request.headers.get('User-Agent', ''), kind, slug, day.isoformat()]
+    return hashlib.sha256('|'.join(parts).encode()).hexdigest()[:32]
+
+
+class Buffer:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.hits = Counter()  # (kind, slug, day, referrer) -> views
+        self.started = False
+
+    def add(self, kind, slug, day, referrer):
+        with self.lock:
+            self.hits[kind, slug, day, referrer] += 1
+            full = len(self.hits) >= settings.ANALYTICS_MAX_BUFFERED
+            if not self.started:
+                self.start()
+        if full:
+            flush()
+
+    def drain(self):
+        with self.lock:
+            hits, self.hits = self.hits, Counter()
+        return hits
+
+    def restore(self, hits):
+        with self.lock:
+            self.hits.update(hits)
+
+    def start(self):
+        # Started in the process that serves the views (after gunicorn forks).
+        self.started = True
+        atexit.register(flush)
+        interval = settings.ANALYTICS_FLUSH_SECONDS
+        if interval > 0:
+            threading.Thread(target=_flush_every, args=(interval,), name='analytics-flush', daemon=True).start()
+
+
+buffer = Buffer()
+
+
+def _flush_every(interval):
+    while True:
+        time.sleep(interval)
+        try:
+            flush()
+        except Exception:
+            logger.exception('Could not write buffered views')
+        finally:
+            connections.close_all()  # this thread's own connections
+
+
+def record(request, kind, slug, referrer=''):
+    """Count a view of ``slug`` unless the visitor already counted. Returns
+    whether it was counted; touches the analytics cache only, never the
+    database."""
+    user_agent = request.headers.get('User-Agent', '').lower()
+    if not settings.ANALYTICS_ENABLED or not user_agent or any(bot in user_agent for bot in BOTS):
+        return False
+    day = timezone.localdate()
+    if not caches[settings.ANALYTICS_CACHE_ALIAS].add(SEEN_KEY.format(fingerprint(request, kind, slug, day)), 1, settings.ANALYTICS_DEDUP_SECONDS):
+        return False
+    host = referrer_host(referrer)
+    if host == referrer_host(request.headers.get('Origin')):
+        host = ''  # navigation within the site
+    buffer.add(kind, slug, day, host)
+    return True
+
+
+def flush():
+    """Write the buffered views; returns how many were written. Slugs are
+    resolved here, so unknown ones are dropped at this point."""
+    hits = buffer.drain()
+    if not hits:
+        return 0
+    try:
+        written = _write(hits)
+    except Exception:
+        buffer.restore(hits)  # retried with the next flush
+        raise
+    bump_version(DailyView, pin_reads=False)
+    return written
+
+
+def _write(hits):
+    slugs = defaultdict(set)
+    for kind, slug, _, _ in hits:
+        slugs[kind].add(slug)
+    ids = {
+        (kind, slug): pk
+        for kind, names in slugs.items()
+        for slug, pk in KINDS[kind]().filter(slug__in=names).values_list('slug', 'pk')
+    }
+    rows = Counter()
+    for (kind, slug, day, referrer), views in hits.items():
+        if (kind, slug) in ids:
+            rows[kind, ids[kind, slug], day, referrer] += views
+    if not rows:
+        return 0
+    with transaction.atomic():
+        # Create missing rows, then add to all of them: concurrent flushes
+        # from other workers only ever increment.
+        DailyView.objects.bulk_create([
+            DailyView(kind=kind, object_id=pk, day=day, referrer=referrer)
+            for kind, pk, day, referrer in rows
+        ], ignore_conflicts=True)
+        existing = DailyView.objects.filter(
+            kind__in={kind for kind, _, _, _ in rows},
+            object_id__in={pk for _, pk, _, _ in rows},
+            day__in={day for _, _, day, _ in rows},
+        ).values_list('pk', 'kind', 'object_id', 'day', 'referrer')
+        increments = defaultdict(list)  # views to add -> row pks
+        for row_pk, *key in existing:
+            if views := rows.get(tuple(key)):
+                increments[views].append(row_pk)
+        for views, pks in increments.items():
+            DailyView.objects.filter(pk__in=pks).update(views=F('views') + views)
+    return sum(rows.values())
+
+
+def popular(kind, days, limit):
+    """[(pk, views)] of the most viewed items over the last ``days`` days."""
+    since = timezone.localdate() - datetime.timedelta(days=days - 1)
+    return list(
+        DailyView.objects.filter(kind=kind, day__gte=since)
+        .values('object_id').annotate(total=Sum('views'))
+        .order_by('-total', '-object_id').values_list('object_id', 'total')[:limit]
+    )
@@ -1,5 +1,17 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def ensure_search_index(sender, using, **kwargs):
+    # SQLite drops triggers whenever a migration rebuilds a table.
+    from django.db import connections
+    from .search import install_search_index
+    install_search_index(connections[using])
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from . import signals, tasks  # noqa: F401
+        post_migrate.connect(ensure_search_index, sender=self)
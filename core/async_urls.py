@@ -0,0 +1,11 @@
+from django.urls import path
+from . import async_views
+
+urlpatterns = [
+    path('skills/', async_views.skill_list, name='async-skill-list'),
+    path('projects/', async_views.project_list, name='async-project-list'),
+    path('projects/<slug:slug>/', async_views.project_detail, name='async-project-detail'),
+    path('posts/', async_views.post_list, name='async-post-list'),
+    path('posts/<slug:slug>/', async_views.post_detail, name='async-post-detail'),
+    path('timeline/', async_views.timeline_list, name='async-timeline-list'),
+]
@@ -0,0 +1,100 @@
+"""
+Async-native versions of the public read endpoints, mounted under
+``/api/async/`` and meant to be served by an ASGI server (uvicorn).
+
+Rows are loaded with the async ORM (``async for`` / ``aget``) using the
+same querysets, serializers and renderer as the DRF views in core.views,
+so the JSON bodies are byte-identical. Serializers only touch prefetched
+data, which keeps them safe to run on the event loop.
+
+Unlike the DRF views, these skip the response cache (core.cache), the
+ETag/Last-Modified validators (core.conditional) and NDJSON streaming
+(core.streaming): every request queries the database and answers 200.
+"""
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.views.decorators.http import require_safe
+from rest_framework.exceptions import APIException
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from .i18n import active_translations
+from .models import Project, Skill, Post, TimelineEvent
+from .pagination import CommentPagination, KeysetPagination
+from .serializers import (
+    ProjectSerializer,
+    ProjectSummarySerializer,
+    SkillSerializer,
+    PostSerializer,
+    PostSummarySerializer,
+    TimelineEventSerializer,
+)
+from .views import post_list_queryset, project_list_queryset
+
+renderer = JSONRenderer()
+
+
+def _render(data, status=200):
+    return HttpResponse(renderer.render(data), status=status, content_type='application/json')
+
+
+def _not_found(model):
+    # Same body DRF produces for get_object_or_404() misses.
+    return _render({'detail': f'No {model._meta.object_name} matches the given query.'}, status=404)
+
+
+async def _list(request, queryset, serializer_class, pagination_class=None):
+    queryset = active_translations(queryset)
+    drf_request = Request(request)
+    context = {'request': drf_request}
+    if pagination_class is not None:
+        paginator = pagination_class()
+        try:
+            page = await sync_to_async(paginator.paginate_queryset)(queryset, drf_request)
+        except APIException as exc:
+            return _render({'detail': exc.detail}, status=exc.status_code)
+        if page is not None:
+            data = serializer_class(page, many=True, context=context).data
+            return _render(paginator.get_paginated_response(data).data)
+    objects = [obj async for obj in queryset]
+    return _render(serializer_class(objects, many=True, context=context).data)
+
+
+async def _detail(request, queryset, serializer_class, **lookup):
+    queryset = active_translations(queryset)
+    try:
+        obj = await queryset.aget(**lookup)
+    except queryset.model.DoesNotExist:
+        return _not_found(queryset.model)
+    return _render(serializer_class(obj, context={'request': Request(request)}).data)
+
+
+@require_safe
+async def skill_list(request):
+    return await _list(request, Skill.objects.all(), SkillSerializer)
+
+
+@require_safe
+async def project_list(request):
+    return await _list(request, project_list_queryset(request.GET), ProjectSummarySerializer, KeysetPagination)
+
+
+@require_safe
+async def project_detail(request, slug):
+    return await _detail(request, Project.objects.prefetch_related('tags'), ProjectSerializer, slug=slug)
+
+
+@require_safe
+async def post_list(request):
+    return await _list(request, post_list_queryset(request.GET), PostSummarySerializer, KeysetPagination)
+
+
+@require_safe
+async def post_detail(request, slug):
+    queryset = Post.objects.filter(is_active=True).with_approved_comments(limit=CommentPagination.page_size)
+    return await _detail(request, queryset, PostSerializer, slug=slug)
+
+
+@require_safe
+async def timeline_list(request):
+    return await _list(request, TimelineEvent.objects.all(), TimelineEventSerializer)
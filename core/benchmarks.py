@@ -0,0 +1,309 @@
+"""
+Helpers shared by the ``bench_*``, ``benchmark`` and ``loadtest``
+management commands.
+
+Benchmarks always run against a throwaway database, never the configured
+one: an in-process test database, or a temporary SQLite file for tests
+that go through a real server.
+"""
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+
+from .models import Tag, TagCount, Project, Post, Comment, Skill, TimelineEvent
+
+
+@contextmanager
+def benchmark_database():
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+# Words used to build bodies in each language.
+VOCABULARY = {
+    'en': 'the quick brown fox jumps over a lazy dog while django serves json',
+    'fr': 'le renard brun rapide saute par-dessus un chien paresseux pendant que django répond',
+    'ar': 'الثعلب البني السريع يقفز فوق الكلب الكسول بينما يخدم جانغو البيانات',
+}
+
+# Named dataset sizes for the benchmark command.
+DATASETS = {
+    'small': dict(posts=20, projects=5, tags=5, tags_per_item=2, comments_per_post=5, body_words=300),
+    'medium': dict(posts=200, projects=20, tags=20, tags_per_item=5, comments_per_post=20, body_words=800),
+    'large': dict(posts=1000, projects=60, tags=50, tags_per_item=10, comments_per_post=50, body_words=2000),
+}
+
+
+def markdown_body(words, lang='en'):
+    """About ``words`` words of Markdown: sections with a heading, two
+    paragraphs and a short list."""
+    vocabulary = VOCABULARY[lang].split()
+    sections, written = [], 0
+    while written < words:
+        section = len(sections) + 1
+        paragraph = ' '.join(vocabulary[(section + i) % len(vocabulary)] for i in range(60))
+        text = (
+            f'## {vocabulary[section % len(vocabulary)].title()} {section}\n\n'
+            f'{paragraph} **{vocabulary[0]}**.\n\n{paragraph} `{vocabulary[1]}`.\n\n'
+            + '\n'.join(f'- {vocabulary[(section + i) % len(vocabulary)]}' for i in range(5))
+        )
+        sections.append(text)
+        written += len(text.split())
+    return '\n\n'.join(sections)
+
+
+def create_dataset(posts=100, projects=20, tags=10, comments_per_post=5, body_words=800,
+                   tags_per_item=3, skills=12, events=8, render=False):
+    """
+    Bulk-creates translated posts and projects (``_en``/``_fr``/``_ar``),
+    tags, comments, skills and timeline events. ``render=True`` also fills
+    the rendered HTML columns, as saving through the admin would.
+    """
+    body = {lang: markdown_body(body_words, lang) for lang in VOCABULARY}
+    tag_objs = Tag.objects.bulk_create(
+        [Tag(name=f'Tag {i}', slug=f'tag-{i}') for i in range(tags)]
+    )
+    post_objs = Post.objects.bulk_create([
+        Post(
+            title_en=f'Post {i}', title_fr=f'Article {i}', title_ar=f'مقال {i}',
+            content_en=body['en'], content_fr=body['fr'], content_ar=body['ar'],
+            slug=f'post-{i}', is_active=True,
+        )
+        for i in range(posts)
+    ])
+    project_objs = Project.objects.bulk_create([
+        Project(
+            title_en=f'Project {i}', title_fr=f'Projet {i}', title_ar=f'مشروع {i}',
+            short_description_en='Short', short_description_fr='Court', short_description_ar='قصير',
+            full_description_en=body['en'], full_description_fr=body['fr'], full_description_ar=body['ar'],
+            slug=f'project-{i}', thumbnail=f'projects/{i}.png', is_featured=i % 4 == 0,
+        )
+        for i in range(projects)
+    ])
+    per_item = min(tags_per_item, tags)
+    Post.tags.through.objects.bulk_create([
+        Post.tags.through(post_id=post.pk, tag_id=tag_objs[(i + k) % tags].pk)
+        for i, post in enumerate(post_objs) for k in range(per_item)
+    ])
+    Project.tags.through.objects.bulk_create([
+        Project.tags.through(project_id=project.pk, tag_id=tag_objs[(i + k) % tags].pk)
+        for i, project in enumerate(project_objs) for k in range(per_item)
+    ])
+    TagCount.objects.refresh([tag.pk for tag in tag_objs])  # bulk_create sends no signals
+    Comment.objects.bulk_create([
+        Comment(post=post, author_name=f'Reader {i}', body='Thanks for writing this.', is_approved=i % 3 != 0)
+        for post in post_objs for i in range(comments_per_post)
+    ], batch_size=1000)
+    Skill.objects.bulk_create([
+        Skill(
+            name=f'Skill {i}', logo=f'skills/{i}.png', is_key_skill=i % 2 == 0,
+            category=Skill.CATEGORY_CHOICES[i % len(Skill.CATEGORY_CHOICES)][0],
+        )
+        for i in range(skills)
+    ])
+    TimelineEvent.objects.bulk_create([
+        TimelineEvent(
+            year=str(2010 + i), order=i,
+            title_en=f'Event {i}', title_fr=f'Événement {i}', title_ar=f'حدث {i}',
+            description_en='Something happened', description_fr="Quelque chose s'est passé",
+            description_ar='حدث شيء ما',
+        )
+        for i in range(events)
+    ])
+    if render:
+        call_command('render_markdown', stdout=StringIO())
+
+
+def requests_per_second(client, url, requests, **headers):
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = client.get(url, **headers)
+        assert response.status_code == 200, (url, response.status_code)
+    return requests / (time.perf_counter() - start)
+
+
+def percentile_ms(latencies, pct):
+    return statistics.quantiles(latencies, n=100, method='inclusive')[pct - 1] * 1000
+
+
+def measure(client, path, requests, method='get', data=None, languages=('en',)):
+    """
+    Query count, response size and peak traced memory of one request,
+    then throughput and latency percentiles over ``requests`` more. The
+    requests cycle through ``languages``.
+    """
+    send = getattr(client, method)
+    headers = [{'HTTP_ACCEPT_LANGUAGE': lang} for lang in languages]
+    with CaptureQueriesContext(connection) as queries:
+        response = send(path, data, **headers[0])
+    query_count = len(queries)
+    assert response.status_code < 400, (path, response.status_code)
+
+    tracemalloc.start()
+    try:
+        send(path, data, **headers[0])
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    latencies = []
+    for i in range(requests):
+        start = time.perf_counter()
+        send(path, data, **headers[i % len(headers)])
+        latencies.append(time.perf_counter() - start)
+    return {
+        'rps': round(requests / sum(latencies), 1),
+        'p50_ms': round(percentile_ms(latencies, 50), 3),
+        'p95_ms': round(percentile_ms(latencies, 95), 3),
+        'p99_ms': round(percentile_ms(latencies, 99), 3),
+        'queries': query_count,
+        'bytes': len(response.content),
+        'peak_kib': round(peak / 1024, 1),
+    }
+
+
+# metric -> True when higher is better
+COMPARED = {'rps': True, 'p95_ms': False, 'queries': False, 'peak_kib': False}
+
+
+def compare(results, baseline, tolerance):
+    """
+    Regressions of ``results`` against ``baseline`` (both shaped
+    ``{dataset: {endpoint: {metric: value}}}``), as readable strings.
+    Query counts must not grow at all; timings and memory may move by
+    ``tolerance`` (a fraction) before they count.
+    """
+    regressions = []
+    for dataset, endpoints in results.items():
+        for endpoint, metrics in endpoints.items():
+            old = baseline.get(dataset, {}).get(endpoint)
+            if not old:
+                continue
+            for metric, higher_is_better in COMPARED.items():
+                if metric not in metrics or metric not in old:
+                    continue
+                allowed = 0 if metric == 'queries' else tolerance
+                if higher_is_better:
+                    regressed = metrics[metric] < old[metric] * (1 - allowed)
+                else:
+                    regressed = metrics[metric] > old[metric] * (1 + allowed)
+                if regressed:
+                    regressions.append(f'{dataset} {endpoint} {metric}: {old[metric]} -> {metrics[metric]}')
+    return regressions
+
+
+# -----------------
+# REAL SERVERS
+# -----------------
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def seed_database(directory, **dataset):
+    """Migrates and fills a SQLite file in ``directory``; returns the
+    environment that points a server process at it."""
+    env = {
+        **os.environ,
+        'DATABASE_URL': f"sqlite:///{os.path.join(directory, 'db.sqlite3')}",
+        # Measure the read path itself, not the response cache.
+        'API_CACHE_ENABLED': 'False',
+        'METRICS_ENABLED': 'False',
+    }
+    manage = [sys.executable, os.path.join(settings.BASE_DIR, 'manage.py')]
+    subprocess.run([*manage, 'migrate', '--verbosity', '0'], env=env, check=True)
+    subprocess.run(
+        [*manage, 'shell', '--verbosity', '0', '-c', f'from core.benchmarks import create_dataset; create_dataset(**{dataset!r})'],
+        env=env, check=True,
+    )
+    return env
+
+
+async def http_get(port, path, trickle=0):
+    """One HTTP/1.1 request over a fresh connection; returns (status, seconds)."""
+    start = time.perf_counter()
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    payload = (
+        f'GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nAccept: application/json\r\n'
+        f'Accept-Language: en\r\nConnection: close\r\n\r\n'
+    ).encode()
+    if trickle:
+        # A slow client: the request arrives a few bytes at a time.
+        for offset in range(0, len(payload), 16):
+            writer.write(payload[offset:offset + 16])
+            await writer.drain()
+            await asyncio.sleep(trickle)
+    else:
+        writer.write(payload)
+        await writer.drain()
+    status_line = await reader.readline()
+    await reader.read()
+    writer.close()
+    await writer.wait_closed()
+    return int(status_line.split()[1]), time.perf_counter() - start
+
+
+async def run_load(port, path, total, concurrency, trickle=0):
+    """Returns (latencies of successful requests, error count, wall time)."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            try:
+                status, elapsed = await http_get(port, path, trickle)
+            except OSError:
+                errors += 1
+                return
+            if status == 200:
+                latencies.append(elapsed)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return latencies, errors, time.perf_counter() - start
+
+
+@contextmanager
+def serve(command, env, port, ready_path, timeout=30):
+    """Runs a server process until the block exits, once ``ready_path``
+    answers 200."""
+    process = subprocess.Popen(
+        command, env=env, cwd=settings.BASE_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if asyncio.run(http_get(port, ready_path))[0] == 200:
+                    break
+            except OSError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f'Server on port {port} did not become ready.')
+            time.sleep(0.2)
+        yield process
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
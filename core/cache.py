@@ -0,0 +1,130 @@
+import hashlib
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from modeltranslation.utils import get_language
+
+# Every cached response embeds the current version of the models it was
+# built from. Signals bump those versions (see core.signals), which makes
+# stale entries unreachable without having to know their keys.
+VERSION_KEY = 'api:version:{}'
+# Set on every change; while present, reads skip the replica (core.routers).
+RECENT_WRITE_KEY = 'api:recent-write'
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def model_label(model):
+    return model._meta.label_lower
+
+
+def get_versions(models):
+    """
+    Versions are the time (in ns) a model last changed, so they double as
+    Last-Modified candidates. A missing version is seeded with the current
+    time, which means a flushed cache can never resurrect an old version.
+    """
+    return get_named_versions([model_label(model) for model in models])
+
+
+def get_named_versions(names):
+    # Same as get_versions() for anything finer-grained than a model
+    # (e.g. one sitemap shard, see core/sitemaps.py).
+    cache = get_cache()
+    keys = [VERSION_KEY.format(name) for name in names]
+    versions = cache.get_many(keys)
+    for key in set(keys) - versions.keys():
+        cache.add(key, time.time_ns(), timeout=None)
+        versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_version(model, pin_reads=True):
+    # pin_reads=False for frequent background writes (analytics) that
+    # should not keep every read off the replica.
+    bump_named_version(model_label(model))
+    if pin_reads and settings.DATABASE_REPLICA_LAG:
+        get_cache().set(RECENT_WRITE_KEY, True, settings.DATABASE_REPLICA_LAG)
+
+
+def bump_named_version(*names):
+    now = time.time_ns()
+    get_cache().set_many({VERSION_KEY.format(name): now for name in names}, timeout=None)
+
+
+# Hits and misses of this process. They are kept in memory: a shared
+# counter would be a write to the cache on every request.
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def cache_stats():
+    return {'hits': _stats['hits'], 'misses': _stats['misses']}
+
+
+def reset_cache_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def view_versions(view):
+    """The versions of ``view.cache_dependencies``, read once per request."""
+    if not hasattr(view, '_dependency_versions'):
+        view._dependency_versions = get_versions(view.cache_dependencies)
+    return view._dependency_versions
+
+
+def response_cache_key(view, request, kwargs):
+    parts = [
+        type(view).__name__,
+        get_language(),
+        ','.join(f'{name}={value}' for name, value in sorted(kwargs.items())),
+        request.GET.urlencode(),
+        # e.g. application/json; indent=4
+        request.accepted_media_type,
+        ','.join(str(version) for version in view_versions(view)),
+    ]
+    digest = hashlib.sha256('|'.join(parts).encode()).hexdigest()
+    return f'api:response:{digest}'
+
+
+class CachedResponseMixin:
+    """
+    Serves GET requests from the cache, keyed by view, URL kwargs, query
+    string and active language. Only rendered JSON bodies are stored, so
+    the browsable API always bypasses the cache.
+    """
+    cache_dependencies = ()
+
+    def get(self, request, *args, **kwargs):
+        if not settings.API_CACHE_ENABLED or request.accepted_renderer.format != 'json':
+            return super().get(request, *args, **kwargs)
+
+        cache = get_cache()
+        key = response_cache_key(self, request, kwargs)
+        cached = cache.get(key)
+        if cached is not None:
+            _count('hits')
+            content, content_type = cached
+            response = HttpResponse(content, content_type=content_type)
+        else:
+            _count('misses')
+            response = super().get(request, *args, **kwargs)
+            if response.status_code == 200:
+                def store(rendered):
+                    cache.set(key, (rendered.content, rendered['Content-Type']), settings.API_CACHE_TIMEOUT)
+                response.add_post_render_callback(store)
+        # CompressionMiddleware keeps its encodings of the body next to it.
+        response.compression_cache_key = key
+        return response
@@ -0,0 +1,152 @@
+"""
+Compressed API responses.
+
+WhiteNoise serves precompressed static files, but JSON from the views left
+gunicorn as it was rendered. CompressionMiddleware encodes API responses
+of at least API_COMPRESSION_MIN_SIZE bytes with the best encoding the
+client accepts: Brotli and Zstandard when their packages are installed,
+gzip always. The ``Accept-Encoding`` q-values decide, and ties go to the
+order of ENCODINGS. Compressed responses get ``Vary: Accept-Encoding`` and
+a weak ETag, as Django's GZipMiddleware does, since the bytes differ from
+the identity body the strong ETag described. Streamed responses and bodies
+that are already encoded pass through.
+
+Responses served by CachedResponseMixin carry their cache key. The first
+time such a body is compressed for an encoding, the result is stored next
+to the cached body under ``<key>:<encoding>``, and later hits send it
+without compressing again. The key embeds the model versions, so the
+variants go stale together with the body.
+"""
+import gzip
+import re
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from .cache import get_cache
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+# JSON only: HTML pages (browsable API, admin) can carry CSRF tokens (BREACH).
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson')
+
+_ACCEPT_ENCODING = re.compile(r'^\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?\s*$')
+
+
+def _brotli(content, level):
+    return brotli.compress(content, quality=level)
+
+
+def _zstd(content, level):
+    return zstandard.ZstdCompressor(level=level).compress(content)
+
+
+def _gzip(content, level):
+    return gzip.compress(content, compresslevel=level, mtime=0)
+
+
+# Content-Encoding token -> compress(content, level), in order of preference
+ENCODINGS = {
+    name: compress
+    for name, compress, module in [('br', _brotli, brotli), ('zstd', _zstd, zstandard), ('gzip', _gzip, gzip)]
+    if module is not None
+}
+
+
+def compress(content, encoding, level=None):
+    if level is None:
+        level = settings.API_COMPRESSION_LEVELS[encoding]
+    return ENCODINGS[encoding](content, level)
+
+
+def negotiate(accept_encoding):
+    """The preferred encoding in ENCODINGS that ``accept_encoding`` allows,
+    or None for the identity body."""
+    weights = {}
+    for part in accept_encoding.split(','):
+        match = _ACCEPT_ENCODING.match(part)
+        if match:
+            try:
+                weights[match[1].lower()] = float(match[2] or 1)
+            except ValueError:
+                continue
+    best, best_weight = None, 0.0
+    for encoding in ENCODINGS:
+        weight = weights.get(encoding, weights.get('*', 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def variant_key(key, encoding):
+    return f'{key}:{encoding}'
+
+
+class CompressionMiddleware:
+    """Compresses API responses; see the module docstring. Under ASGI the
+    encoding runs on the event loop: API bodies are small enough that a
+    thread hop would cost more."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        if not self.compressible(request, response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = negotiate(request.headers.get('Accept-Encoding', ''))
+        if encoding is None:
+            return response
+
+        # Set by CachedResponseMixin; only 200 responses are cached.
+        key = getattr(response, 'compression_cache_key', None)
+        if key is not None and response.status_code == 200:
+            key = variant_key(key, encoding)
+            content = get_cache().get(key)
+            if content is None:
+                content = compress(response.content, encoding)
+                get_cache().set(key, content, settings.API_CACHE_TIMEOUT)
+        else:
+            content = compress(response.content, encoding)
+        if len(content) >= len(response.content):
+            return response
+
+        response.content = content
+        response['Content-Encoding'] = encoding
+        response['Content-Length'] = str(len(response.content))
+        if (etag := response.get('ETag')) and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
+
+    def compressible(self, request, response):
+        return (
+            settings.API_COMPRESSION_ENABLED
+            and request.path.startswith(settings.API_COMPRESSION_PREFIX)
+            and not response.streaming
+            and not response.has_header('Content-Encoding')
+            and 'no-transform' not in response.get('Cache-Control', '')
+            and response.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES)
+            and len(response.content) >= settings.API_COMPRESSION_MIN_SIZE
+        )
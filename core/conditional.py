@@ -0,0 +1,64 @@
+import datetime
+import hashlib
+
+from django.db.models import Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from modeltranslation.utils import get_language
+
+from .cache import view_versions
+
+EMPTY_LIST_UPDATED = datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+class ConditionalGetMixin:
+    """
+    Adds strong ETag and Last-Modified validators and answers conditional
+    GETs with 304 before any serialization happens.
+
+    Validators come from a single indexed lookup on ``updated_at`` for the
+    view's primary model (the first entry of ``cache_dependencies``) plus
+    the version timestamps that signals keep for every dependency, which
+    also covers deletions and changes to related models.
+    """
+    cache_dependencies = ()
+
+    def get_last_updated(self, **kwargs):
+        queryset = self.cache_dependencies[0]._default_manager.all()
+        if self.lookup_field in kwargs:
+            queryset = queryset.filter(**{self.lookup_field: kwargs[self.lookup_field]})
+        return queryset.aggregate(last_updated=Max('updated_at'))['last_updated']
+
+    def get(self, request, *args, **kwargs):
+        last_updated = self.get_last_updated(**kwargs)
+        if last_updated is None:
+            if self.lookup_field in kwargs:
+                # Missing object: let the view answer with its 404.
+                return super().get(request, *args, **kwargs)
+            last_updated = EMPTY_LIST_UPDATED
+
+        versions = view_versions(self)
+        # All of them: deleting the newest row lowers Max('updated_at'), and
+        # only the primary model's version records that.
+        changed_at = [
+            datetime.datetime.fromtimestamp(version / 1e9, tz=datetime.timezone.utc)
+            for version in versions
+        ]
+        last_modified = int(max([last_updated, *changed_at]).timestamp())
+        etag = quote_etag(hashlib.sha256('|'.join([
+            type(self).__name__,
+            get_language(),
+            ','.join(f'{name}={value}' for name, value in sorted(kwargs.items())),
+            request.GET.urlencode(),
+            request.accepted_media_type,
+            last_updated.isoformat(),
+            ','.join(str(version) for version in versions),
+        ]).encode()).hexdigest()[:32])
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        return response
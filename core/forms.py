@@ -0,0 +1,28 @@
+from collections import namedtuple
+from os import path
+
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from markdownx.forms import ImageForm
+from markdownx.settings import MARKDOWNX_MEDIA_PATH
+
+from .jobs import enqueue
+from .models import MarkdownImage
+
+ImageData = namedtuple('image_data', ['path', 'image'])
+
+
+class DerivativeImageForm(ImageForm):
+    """Markdownx upload form that records each upload and queues its
+    responsive derivatives (see core/images.py)."""
+
+    def _save(self, image, file_name, commit):
+        # MARKDOWNX_MEDIA_PATH is expanded per upload, like FileField.upload_to,
+        # so a long-running worker doesn't keep filing uploads under its start date.
+        name = path.join(timezone.now().strftime(MARKDOWNX_MEDIA_PATH), self.get_unique_file_name(file_name))
+        if not commit:
+            return ImageData(path=name, image=image)
+        name = default_storage.save(name, image)
+        upload = MarkdownImage.objects.create(image=name, url=default_storage.url(name))
+        enqueue('generate_image_derivatives', model='core.markdownimage', pk=upload.pk, field='image')
+        return upload.url
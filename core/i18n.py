@@ -0,0 +1,52 @@
+"""
+Loads only the translation columns a request can actually read.
+
+Every translated field has one column per language plus the original,
+untranslated column. modeltranslation's descriptors only read the active
+language and its fallbacks, so the other columns can be deferred. The
+original columns can be deferred too, since the descriptors never read
+them. For the large Markdown bodies this cuts most of each row.
+"""
+from functools import cache
+
+from modeltranslation.translator import NotRegistered, translator
+from modeltranslation.utils import get_language, resolution_order
+
+
+@cache
+def _inactive_columns(model, languages):
+    try:
+        options = translator.get_options_for_model(model)
+    except NotRegistered:
+        return ()
+    columns = []
+    for name, translations in options.all_fields.items():
+        columns.append(name)
+        columns += [field.name for field in translations if field.language not in languages]
+    return tuple(columns)
+
+
+def inactive_translation_columns(model):
+    return _inactive_columns(model, tuple(resolution_order(get_language())))
+
+
+def active_translations(queryset):
+    """``queryset`` with every translation column deferred except the
+    active language's and its fallbacks'."""
+    columns = inactive_translation_columns(queryset.model)
+    if not columns:
+        return queryset
+    clone = queryset.all()
+    # Not defer(): modeltranslation expands a field name like 'title' to
+    # every language's column.
+    clone.query.add_deferred_loading(columns)
+    return clone
+
+
+class ActiveTranslationsMixin:
+    """For generic views: list() and get_object() only load the request's
+    language. (Hooked on filter_queryset() so views that override
+    get_queryset() are covered too.)"""
+
+    def filter_queryset(self, queryset):
+        return active_translations(super().filter_queryset(queryset))
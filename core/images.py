@@ -0,0 +1,137 @@
+"""
+Responsive derivatives of uploaded images.
+
+Each raster upload is re-encoded as AVIF and WebP at the widths in
+DERIVATIVE_WIDTHS (never wider than the original), next to a tiny blurred
+WebP placeholder (LQIP) and the intrinsic dimensions. Files go through the
+default storage under ``derivatives/``; the metadata is stored as JSON on
+the owning row (``<field>_variants``) and serialized for ``srcset``.
+
+``build_derivatives`` only deals in bytes so it can run in a process pool
+(see the generate_image_derivatives command).
+"""
+import base64
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+# Pillow is imported where images are processed, not by the API views that
+# only serialize the stored metadata.
+
+DERIVATIVE_WIDTHS = (320, 640, 960, 1280, 1920)
+DERIVATIVE_DIR = 'derivatives'
+PLACEHOLDER_WIDTH = 16
+QUALITY = {'avif': 55, 'webp': 80}
+RASTER_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.gif', '.bmp', '.tiff', '.avif')
+
+
+def derivative_formats():
+    from PIL import features
+    return [fmt for fmt in ('avif', 'webp') if features.check(fmt)]
+
+
+def is_raster(name):
+    return os.path.splitext(name)[1].lower() in RASTER_EXTENSIONS
+
+
+def target_widths(width):
+    return [w for w in DERIVATIVE_WIDTHS if w < width] + [min(width, DERIVATIVE_WIDTHS[-1])]
+
+
+def _open(data):
+    from PIL import Image, ImageOps
+    image = Image.open(BytesIO(data))
+    image.seek(0)  # first frame of animations
+    image = ImageOps.exif_transpose(image)
+    return image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB')
+
+
+def _encode(image, fmt, **options):
+    buffer = BytesIO()
+    image.save(buffer, fmt.upper(), **options)
+    return buffer.getvalue()
+
+
+def build_derivatives(data):
+    """
+    Returns the intrinsic ``width``/``height``, a ``placeholder`` data URI
+    and ``files``: ``(format, width, height, bytes)`` for each derivative.
+    """
+    from PIL import Image
+    image = _open(data)
+    width, height = image.size
+    files = []
+    for target in target_widths(width):
+        resized = image if target == width else image.resize(
+            (target, max(1, round(height * target / width))), Image.LANCZOS,
+        )
+        for fmt in derivative_formats():
+            files.append((fmt, resized.width, resized.height, _encode(resized, fmt, quality=QUALITY[fmt])))
+    tiny = image.resize((PLACEHOLDER_WIDTH, max(1, round(height * PLACEHOLDER_WIDTH / width))), Image.LANCZOS)
+    placeholder = base64.b64encode(_encode(tiny, 'webp', quality=30)).decode()
+    return {
+        'width': width,
+        'height': height,
+        'placeholder': f'data:image/webp;base64,{placeholder}',
+        'files': files,
+    }
+
+
+def save_derivatives(name, built, storage=None):
+    """Store the output of build_derivatives() for the image ``name`` and
+    return the metadata kept in ``<field>_variants``."""
+    storage = storage or default_storage
+    stem = os.path.splitext(name)[0]
+    sources = {}
+    for fmt, width, height, content in built['files']:
+        path = f'{DERIVATIVE_DIR}/{stem}-{width}w.{fmt}'
+        if storage.exists(path):
+            storage.delete(path)
+        path = storage.save(path, ContentFile(content))
+        sources.setdefault(fmt, []).append({
+            'name': path, 'url': storage.url(path), 'width': width, 'height': height,
+        })
+    return {
+        'source': name,
+        'width': built['width'],
+        'height': built['height'],
+        'placeholder': built['placeholder'],
+        'sources': sources,
+    }
+
+
+def derivative_names(variants):
+    return {file['name'] for files in (variants or {}).get('sources', {}).values() for file in files}
+
+
+def delete_derivatives(variants, keep=(), storage=None):
+    storage = storage or default_storage
+    for name in derivative_names(variants) - set(keep):
+        storage.delete(name)
+
+
+def generate(name, storage=None):
+    storage = storage or default_storage
+    with storage.open(name, 'rb') as f:
+        data = f.read()
+    return save_derivatives(name, build_derivatives(data), storage)
+
+
+def srcset(variants, absolute=lambda url: url):
+    """The ``srcset``-ready form of stored variants, as the API returns it."""
+    if not variants:
+        return None
+    return {
+        'width': variants['width'],
+        'height': variants['height'],
+        'placeholder': variants['placeholder'],
+        'sources': [
+            {
+                'type': f'image/{fmt}',
+                'srcset': ', '.join(f"{absolute(file['url'])} {file['width']}w" for file in files),
+            }
+            for fmt, files in variants['sources'].items()
+        ],
+    }
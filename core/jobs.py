@@ -0,0 +1,108 @@
+"""
+A small durable job queue kept in the main database (core.models.Job),
+so it works the same on SQLite and PostgreSQL without a broker.
+
+Handlers are plain functions registered with ``@job('name')`` (see
+core/tasks.py) and queued with ``enqueue('name', **payload)``; the
+``run_jobs`` management command executes them. Failed jobs are retried
+with exponential backoff until ``max_attempts`` is reached.
+"""
+import datetime
+import logging
+import random
+import traceback
+
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+HANDLERS = {}
+
+BACKOFF_BASE = 30  # seconds before the first retry
+BACKOFF_MAX = 60 * 60
+STALE_AFTER = datetime.timedelta(minutes=10)
+
+
+def job(name):
+    def register(func):
+        HANDLERS[name] = func
+        return func
+    return register
+
+
+def enqueue(name, run_at=None, max_attempts=None, unique=False, **payload):
+    """Queue ``name`` to run with ``payload`` as keyword arguments, which
+    must be JSON-serializable. With ``unique``, nothing is queued while the
+    same job is pending (and that job is returned, unchanged)."""
+    if unique:
+        pending = Job.objects.filter(name=name, status='pending', payload=payload).first()
+        if pending is not None:
+            return pending
+    job = Job(name=name, payload=payload, run_at=run_at or timezone.now())
+    if max_attempts is not None:
+        job.max_attempts = max_attempts
+    job.save()
+    return job
+
+
+def backoff(attempts):
+    delay = min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+    # Jitter keeps retries of a burst of failures from lining up.
+    return datetime.timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def claim(limit=10, stale_after=STALE_AFTER):
+    """
+    Mark up to ``limit`` due jobs as running and return them. Jobs whose
+    worker died mid-run are picked up again once ``stale_after`` passes.
+    Each job is claimed with a conditional UPDATE, so concurrent workers
+    never run the same job twice.
+    """
+    now = timezone.now()
+    due = Job.objects.filter(
+        Q(status='pending', run_at__lte=now) | Q(status='running', locked_at__lt=now - stale_after)
+    ).order_by('run_at', 'pk').values_list('pk', 'status', 'locked_at')[:limit]
+    claimed = [
+        pk for pk, status, locked_at in due
+        if Job.objects.filter(pk=pk, status=status, locked_at=locked_at).update(
+            status='running', locked_at=now, attempts=F('attempts') + 1,
+        )
+    ]
+    return list(Job.objects.filter(pk__in=claimed).order_by('run_at', 'pk'))
+
+
+def run(job):
+    try:
+        handler = HANDLERS[job.name]
+        handler(**job.payload)
+    except Exception:
+        job.last_error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            job.status = 'failed'
+            job.finished_at = timezone.now()
+            logger.error('Job %s failed permanently', job, exc_info=True)
+        else:
+            job.status = 'pending'
+            job.run_at = timezone.now() + backoff(job.attempts)
+            logger.warning('Job %s failed, retrying at %s', job, job.run_at, exc_info=True)
+    else:
+        job.status = 'done'
+        job.finished_at = timezone.now()
+    job.locked_at = None
+    job.save(update_fields=['status', 'run_at', 'locked_at', 'last_error', 'finished_at'])
+
+
+def run_pending(limit=10):
+    """Run one batch of due jobs; returns how many were run."""
+    jobs = claim(limit)
+    for job in jobs:
+        run(job)
+    return len(jobs)
+
+
+def purge(older_than=datetime.timedelta(days=7)):
+    """Delete finished jobs, keeping failures around for inspection."""
+    return Job.objects.filter(status='done', finished_at__lt=timezone.now() - older_than).delete()[0]
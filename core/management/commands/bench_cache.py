@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from core.benchmarks import benchmark_database, create_dataset, requests_per_second
+from core.cache import cache_stats, get_cache, reset_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Compares requests per second of the public API with and without the response cache.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=200)
+        parser.add_argument('--requests', type=int, default=200)
+
+    def handle(self, *args, **options):
+        urls = [
+            reverse('skill-list'),
+            reverse('project-list'),
+            reverse('project-detail', args=['project-0']),
+            reverse('post-list'),
+            reverse('post-detail', args=['post-0']),
+            reverse('timeline-list'),
+        ]
+        with benchmark_database():
+            create_dataset(posts=options['posts'])
+            client = Client()
+            self.stdout.write(f"{'endpoint':<32}{'uncached rps':>14}{'cached rps':>14}{'speedup':>10}")
+            for url in urls:
+                with override_settings(API_CACHE_ENABLED=False):
+                    uncached = requests_per_second(client, url, options['requests'])
+                get_cache().clear()
+                reset_cache_stats()
+                cached = requests_per_second(client, url, options['requests'])
+                self.stdout.write(f'{url:<32}{uncached:>14.1f}{cached:>14.1f}{cached / uncached:>9.1f}x')
+            stats = cache_stats()
+            self.stdout.write(f"last endpoint: {stats['hits']} hits, {stats['misses']} misses")
@@ -0,0 +1,91 @@
+import gzip
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from core import compression
+from core.benchmarks import benchmark_database, create_dataset
+
+# Levels tried per Content-Encoding
+LEVELS = {
+    'br': [1, 4, 5, 6, 9, 11],
+    'zstd': [1, 3, 6, 12, 19],
+    'gzip': [1, 6, 9],
+}
+
+DECOMPRESS = {
+    'br': lambda content: compression.brotli.decompress(content),
+    'zstd': lambda content: compression.zstandard.ZstdDecompressor().decompress(content),
+    'gzip': gzip.decompress,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures bytes on the wire and CPU time per Content-Encoding and level for API payloads '
+        '(post and project details with rendered Markdown, list pages, the home bundle).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--body-words', type=int, default=1500)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            create_dataset(posts=50, projects=10, body_words=options['body_words'], render=True)
+            payloads = self.payloads()
+            self.stdout.write(f"{'payload':<16}{'lang':<6}{'bytes':>10}")
+            for (name, lang), content in payloads.items():
+                self.stdout.write(f'{name:<16}{lang:<6}{len(content):>10}')
+            total = sum(len(content) for content in payloads.values())
+
+            self.stdout.write('')
+            self.stdout.write(
+                f"{'encoding':<10}{'level':>6}{'bytes':>10}{'ratio':>8}{'compress ms':>13}"
+                f"{'MB/s':>8}{'decompress ms':>15}"
+            )
+            for encoding in compression.ENCODINGS:
+                for level in LEVELS[encoding]:
+                    size, compress_s, decompress_s = self.measure(payloads.values(), encoding, level, options['repeat'])
+                    self.stdout.write(
+                        f'{encoding:<10}{level:>6}{size:>10}{total / size:>8.2f}{compress_s * 1000:>13.2f}'
+                        f'{total / compress_s / 1e6:>8.1f}{decompress_s * 1000:>15.2f}'
+                    )
+            missing = set(LEVELS) - set(compression.ENCODINGS)
+            if missing:
+                self.stdout.write(f"Not installed: {', '.join(sorted(missing))}")
+
+    def payloads(self):
+        client = Client()
+        urls = {
+            'post-detail': reverse('post-detail', args=['post-0']),
+            'project-detail': reverse('project-detail', args=['project-0']),
+            'post-list': reverse('post-list') + '?page_size=20',
+            'home': reverse('home'),
+        }
+        payloads = {}
+        with override_settings(API_CACHE_ENABLED=False, API_COMPRESSION_ENABLED=False):
+            for lang in ('en', 'fr', 'ar'):
+                for name, url in urls.items():
+                    response = client.get(url, HTTP_ACCEPT_LANGUAGE=lang)
+                    assert response.status_code == 200, (url, response.status_code)
+                    payloads[name, lang] = response.content
+        return payloads
+
+    def measure(self, payloads, encoding, level, repeat):
+        """Compressed bytes of all payloads, then seconds to compress and to
+        decompress all of them once (best of ``repeat``)."""
+        compressed = [compression.compress(content, encoding, level) for content in payloads]
+        compress_times, decompress_times = [], []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for content in payloads:
+                compression.compress(content, encoding, level)
+            compress_times.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            for content in compressed:
+                DECOMPRESS[encoding](content)
+            decompress_times.append(time.perf_counter() - start)
+        return sum(map(len, compressed)), min(compress_times), min(decompress_times)
@@ -0,0 +1,75 @@
+import os
+import tempfile
+import time
+
+from django.db import close_old_connections, connection
+from django.db.backends.signals import connection_created
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+
+from core.benchmarks import benchmark_database, create_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures the per-request cost of opening database connections: a new '
+        'connection per request, persistent connections and (PostgreSQL only) the psycopg pool.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+
+    def handle(self, *args, **options):
+        if connection.vendor == 'sqlite':
+            # The default in-memory test database is never really closed.
+            connection.settings_dict['TEST']['NAME'] = os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')
+
+        modes = [('new per request', 0, None), ('persistent', 60, None)]
+        if connection.vendor == 'postgresql':
+            modes.append(('pool', 0, {'min_size': 1, 'max_size': 4}))
+
+        with benchmark_database():
+            create_dataset(posts=10)
+            client = Client()
+            url = reverse('skill-list')
+            client.get(url)  # warm the response cache; each request then runs one small query
+
+            self.stdout.write(f"{'mode':<20}{'ms/request':>12}{'connects':>10}{'saved ms':>10}")
+            baseline = None
+            for name, max_age, pool in modes:
+                connection.close()
+                connection.settings_dict['CONN_MAX_AGE'] = max_age
+                connection.settings_dict['OPTIONS'].pop('pool', None)
+                if pool:
+                    connection.settings_dict['OPTIONS']['pool'] = pool
+
+                connects = []
+
+                def count(sender, connection, **kwargs):
+                    connects.append(connection)
+
+                connection_created.connect(count)
+                try:
+                    elapsed = self.run_requests(client, url, options['requests'])
+                finally:
+                    connection_created.disconnect(count)
+                    connection.close()
+                    if pool:
+                        connection.close_pool()
+                        connection.settings_dict['OPTIONS'].pop('pool')
+
+                per_request = elapsed * 1000 / options['requests']
+                baseline = baseline or per_request
+                self.stdout.write(
+                    f'{name:<20}{per_request:>12.3f}{len(connects):>10}{baseline - per_request:>10.3f}'
+                )
+
+    def run_requests(self, client, url, requests):
+        start = time.perf_counter()
+        for _ in range(requests):
+            response = client.get(url)
+            assert response.status_code == 200, response.status_code
+            # The test client doesn't send request_finished to the db layer.
+            close_old_connections()
+        return time.perf_counter() - start
@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.benchmarks import benchmark_database, create_dataset
+
+
+class Command(BaseCommand):
+    help = 'Compares loading the home page through the separate list endpoints against /api/home/.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=200)
+        parser.add_argument('--loads', type=int, default=100)
+
+    def handle(self, *args, **options):
+        strategies = [
+            ('separate endpoints', [
+                reverse('timeline-list'), reverse('skill-list'), reverse('project-list'), reverse('post-list'),
+            ]),
+            ('home bundle', [reverse('home')]),
+        ]
+        with benchmark_database():
+            create_dataset(posts=options['posts'])
+            client = Client()
+            self.stdout.write(
+                f"{'strategy':<20}{'round trips':>12}{'queries':>9}{'bytes':>9}{'uncached ms':>13}{'cached ms':>11}"
+            )
+            for name, urls in strategies:
+                with override_settings(API_CACHE_ENABLED=False):
+                    with CaptureQueriesContext(connection) as queries:
+                        size = sum(len(client.get(url).content) for url in urls)
+                    query_count = len(queries)
+                    uncached = self.page_load_ms(client, urls, options['loads'])
+                cached = self.page_load_ms(client, urls, options['loads'])
+                self.stdout.write(
+                    f'{name:<20}{len(urls):>12}{query_count:>9}{size:>9}{uncached:>13.2f}{cached:>11.2f}'
+                )
+
+    def page_load_ms(self, client, urls, loads):
+        start = time.perf_counter()
+        for _ in range(loads):
+            for url in urls:
+                response = client.get(url)
+                assert response.status_code == 200, (url, response.status_code)
+        return (time.perf_counter() - start) / loads * 1000
@@ -0,0 +1,61 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from core import search
+from core.benchmarks import benchmark_database
+from core.models import Post
+
+VOCABULARY = (
+    'django react python deploy gunicorn postgres cache index query search rank '
+    'model view serializer frontend backend docker railway vercel markdown tag '
+    'performance latency throughput memory profile benchmark async worker queue'
+).split()
+
+
+class Command(BaseCommand):
+    help = 'Measures search latency over a synthetic set of posts (10k by default).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=10_000)
+        parser.add_argument('--words', type=int, default=300)
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        rng = random.Random(42)
+
+        def text(words):
+            return ' '.join(rng.choice(VOCABULARY) for _ in range(words))
+
+        with benchmark_database():
+            start = time.perf_counter()
+            for offset in range(0, options['posts'], 1000):
+                Post.objects.bulk_create([
+                    Post(
+                        title_en=text(6), title_fr=text(6), title_ar=text(6),
+                        content_en=text(options['words']), content_fr=text(options['words']),
+                        slug=f'post-{i}', is_active=True,
+                    )
+                    for i in range(offset, min(offset + 1000, options['posts']))
+                ])
+            self.stdout.write(
+                f"indexed {options['posts']} posts on {connection.vendor} "
+                f'in {time.perf_counter() - start:.2f}s'
+            )
+
+            self.stdout.write(f"{'query':<28}{'lang':>6}{'matches':>10}{'p50 ms':>10}{'p95 ms':>10}")
+            for query in ('django', 'deploy gunicorn', 'react frontend latency', 'nomatch'):
+                for lang in ('en', 'fr'):
+                    timings = []
+                    for _ in range(options['repeat']):
+                        begin = time.perf_counter()
+                        result = search.search(query, lang, kinds=('post',))
+                        timings.append((time.perf_counter() - begin) * 1000)
+                    p95 = statistics.quantiles(timings, n=20)[-1]
+                    self.stdout.write(
+                        f"{query:<28}{lang:>6}{result['count']:>10}"
+                        f'{statistics.median(timings):>10.1f}{p95:>10.1f}'
+                    )
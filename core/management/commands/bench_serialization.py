@@ -0,0 +1,82 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from django.utils import translation
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from core.benchmarks import benchmark_database, create_dataset
+from core.i18n import active_translations
+from core.models import Post, Project
+from core.renderers import FastJSONRenderer
+from core.rows import RowSerializer
+from core.serializers import PostSummarySerializer, ProjectSummarySerializer
+
+# name -> (queryset factory, serializer), built the way the list views build them
+CASES = {
+    'post-list': (
+        lambda: Post.objects.filter(is_active=True).summaries().order_by('-created_at', '-id'),
+        PostSummarySerializer,
+    ),
+    'project-list': (lambda: Project.objects.summaries().order_by('-created_at', '-id'), ProjectSummarySerializer),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares building and rendering list responses through model instances, DRF serializers and '
+        'JSONRenderer against .values() rows, RowSerializer and FastJSONRenderer (core/rows.py).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000])
+        parser.add_argument('--repeat', type=int, default=3, help='Best of this many runs is reported.')
+
+    def handle(self, *args, **options):
+        request = Request(RequestFactory().get('/'))
+        context = {'request': request}
+        with benchmark_database():
+            largest = max(options['rows'])
+            create_dataset(posts=largest, projects=largest, tags=50, comments_per_post=1, body_words=100)
+            self.stdout.write(
+                f"{'endpoint':<14}{'rows':>7}{'lang':>6}{'build ms':>10}{'render ms':>11}"
+                f"{'rows build':>12}{'rows render':>13}{'speedup':>9}"
+            )
+            for lang in ('en', 'fr'):
+                with translation.override(lang):
+                    for name, (build, serializer_class) in CASES.items():
+                        for count in options['rows']:
+                            queryset = lambda: active_translations(build())[:count]  # noqa: E731
+                            serializers = self.best(options['repeat'], lambda: self.serializers(
+                                queryset(), serializer_class, context,
+                            ))
+                            rows = self.best(options['repeat'], lambda: self.rows(
+                                queryset(), serializer_class, context,
+                            ))
+                            if serializers[2] != rows[2]:
+                                self.stderr.write(f'{name} ({lang}, {count} rows): output differs')
+                            before, after = sum(serializers[:2]), sum(rows[:2])
+                            self.stdout.write(
+                                f'{name:<14}{count:>7}{lang:>6}{serializers[0]:>10.1f}{serializers[1]:>11.1f}'
+                                f'{rows[0]:>12.1f}{rows[1]:>13.1f}{before / after:>8.1f}x'
+                            )
+
+    def best(self, repeat, run):
+        results = [run() for _ in range(repeat)]
+        return min(results, key=lambda result: result[0] + result[1])
+
+    def serializers(self, queryset, serializer_class, context):
+        start = time.perf_counter()
+        data = serializer_class(list(queryset), many=True, context=context).data
+        built = time.perf_counter()
+        content = JSONRenderer().render(data)
+        return (built - start) * 1000, (time.perf_counter() - built) * 1000, content
+
+    def rows(self, queryset, serializer_class, context):
+        start = time.perf_counter()
+        rows = RowSerializer(serializer_class(context=context))
+        data = rows.to_representation(rows.values(queryset))
+        built = time.perf_counter()
+        content = FastJSONRenderer().render(data)
+        return (built - start) * 1000, (time.perf_counter() - built) * 1000, content
@@ -0,0 +1,101 @@
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory
+from django.utils import translation
+from rest_framework.request import Request
+
+from core.benchmarks import benchmark_database, create_dataset
+from core.i18n import active_translations
+from core.models import Post, Project
+from core.pagination import CommentPagination, KeysetPagination
+from core.serializers import PostSerializer, PostSummarySerializer, ProjectSerializer, ProjectSummarySerializer
+
+# name -> (queryset factory, serializer, many), built the way the views build them
+CASES = {
+    'post-detail': (
+        lambda: Post.objects.filter(is_active=True, slug='post-0').with_approved_comments(
+            limit=CommentPagination.page_size),
+        PostSerializer, False,
+    ),
+    'post-list': (
+        lambda: Post.objects.filter(is_active=True).summaries().order_by('-created_at', '-id')[:KeysetPagination.page_size],
+        PostSummarySerializer, True,
+    ),
+    'project-detail': (lambda: Project.objects.filter(slug='project-0').prefetch_related('tags'), ProjectSerializer, False),
+    'project-list': (
+        lambda: Project.objects.summaries().order_by('-created_at', '-id')[:KeysetPagination.page_size],
+        ProjectSummarySerializer, True,
+    ),
+}
+
+
+def _size(value):
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return len(value.encode())
+    if isinstance(value, (bytes, memoryview)):
+        return len(value)
+    return 8
+
+
+class QueryLog:
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append((sql, params))
+        return execute(sql, params, many, context)
+
+    def result_bytes(self):
+        # Re-run each query to size what the database sent back.
+        total = 0
+        with connection.cursor() as cursor:
+            for sql, params in self.queries:
+                cursor.execute(sql, params)
+                total += sum(_size(value) for row in cursor.fetchall() for value in row)
+        return total
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares bytes read from the database and peak memory per request with every '
+        'translation column loaded against only the active language\'s (core/i18n.py).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=100)
+        parser.add_argument('--body-words', type=int, default=3000)
+
+    def handle(self, *args, **options):
+        request = Request(RequestFactory().get('/'))
+        with benchmark_database():
+            create_dataset(posts=options['posts'], projects=20, body_words=options['body_words'], render=True)
+            for build, serializer, many in CASES.values():
+                self.measure(build(), serializer, many, request)  # warm up imports and caches
+            self.stdout.write(
+                f"{'endpoint':<16}{'lang':<6}{'all KiB':>10}{'active KiB':>12}{'all peak':>10}{'active peak':>13}"
+            )
+            for lang in ('en', 'fr', 'ar'):
+                with translation.override(lang):
+                    for name, (build, serializer, many) in CASES.items():
+                        before = self.measure(build(), serializer, many, request)
+                        after = self.measure(active_translations(build()), serializer, many, request)
+                        self.stdout.write(
+                            f'{name:<16}{lang:<6}{before[0] / 1024:>10.1f}{after[0] / 1024:>12.1f}'
+                            f'{before[1] / 1024:>10.1f}{after[1] / 1024:>13.1f}'
+                        )
+
+    def measure(self, queryset, serializer, many, request):
+        log = QueryLog()
+        tracemalloc.start()
+        try:
+            with connection.execute_wrapper(log):
+                objects = list(queryset) if many else queryset.get()
+                serializer(objects, many=many, context={'request': request}).data
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        return log.result_bytes(), peak
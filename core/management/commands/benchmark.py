@@ -0,0 +1,167 @@
+import asyncio
+import datetime
+import json
+import platform
+import shutil
+import statistics
+import tempfile
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from core.benchmarks import (
+    DATASETS, benchmark_database, compare, create_dataset, free_port, measure, percentile_ms,
+    run_load, seed_database, serve,
+)
+from core.models import Post
+
+LANGUAGES = ('en', 'fr', 'ar')
+
+
+def endpoints(post_pk=None):
+    """name -> (method, path, data) for every route in core/urls.py."""
+    return {
+        'skill-list': ('get', reverse('skill-list'), None),
+        'tag-list': ('get', reverse('tag-list'), None),
+        'project-list': ('get', reverse('project-list'), None),
+        'project-list-tag': ('get', f"{reverse('project-list')}?tag=tag-0", None),
+        'project-detail': ('get', reverse('project-detail', args=['project-0']), None),
+        'post-list': ('get', reverse('post-list'), None),
+        'post-list-tag': ('get', f"{reverse('post-list')}?tag=tag-0", None),
+        'post-detail': ('get', reverse('post-detail', args=['post-0']), None),
+        'post-comment-list': ('get', reverse('post-comment-list', args=['post-0']), None),
+        'timeline-list': ('get', reverse('timeline-list'), None),
+        'home': ('get', reverse('home'), None),
+        'search': ('get', f"{reverse('search')}?q=fox", None),
+        'popular': ('get', reverse('popular'), None),
+        'contact-create': ('post', reverse('contact-create'), {
+            'name': 'Benchmark', 'email': 'bench@example.com', 'message': 'Hello there.',
+        }),
+        'comment-create': ('post', reverse('comment-create'), {
+            'post': post_pk, 'author_name': 'Benchmark', 'body': 'Nice post.',
+        }),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmarks every endpoint in core/urls.py on synthetic datasets: throughput, latency '
+        'percentiles, queries and peak memory through the test client, and optionally '
+        'throughput under gunicorn. Writes JSON and can fail on regressions against a baseline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--datasets', default='small,medium',
+            help=f"Comma-separated dataset sizes: {', '.join(DATASETS)}.",
+        )
+        parser.add_argument('--requests', type=int, default=50, help='Timed requests per endpoint.')
+        parser.add_argument('--output', default='benchmark.json')
+        parser.add_argument('--baseline', help='Earlier --output file to compare against.')
+        parser.add_argument(
+            '--tolerance', type=float, default=0.25,
+            help='Allowed slowdown or memory growth against the baseline, as a fraction.',
+        )
+        parser.add_argument('--cached', action='store_true', help='Keep the response cache enabled.')
+        parser.add_argument('--server', action='store_true', help='Also load-test GET endpoints under gunicorn.')
+        parser.add_argument('--concurrency', type=int, default=10)
+        parser.add_argument('--workers', type=int, default=2)
+
+    def handle(self, *args, **options):
+        datasets = [name.strip() for name in options['datasets'].split(',')]
+        unknown = set(datasets) - DATASETS.keys()
+        if unknown:
+            raise CommandError(f"Unknown dataset(s): {', '.join(sorted(unknown))}.")
+        if options['requests'] < 2:
+            raise CommandError('--requests must be at least 2.')
+        if options['server'] and shutil.which('gunicorn') is None:
+            raise CommandError('gunicorn is not installed.')
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)['results']
+
+        results = {}
+        for dataset in datasets:
+            results[dataset] = self.run_client(dataset, options)
+            if options['server']:
+                self.run_server(dataset, results[dataset], options)
+
+        with open(options['output'], 'w') as f:
+            json.dump({
+                'meta': {
+                    'created': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                    'python': platform.python_version(),
+                    'django': django.get_version(),
+                    'database': connection.vendor,
+                    'requests': options['requests'],
+                    'cached': options['cached'],
+                },
+                'results': results,
+            }, f, indent=2)
+        self.stdout.write(f"Results written to {options['output']}.")
+
+        if baseline is not None:
+            regressions = compare(results, baseline, options['tolerance'])
+            if regressions:
+                raise CommandError('Regressions against the baseline:\n  ' + '\n  '.join(regressions))
+            self.stdout.write('No regressions against the baseline.')
+
+    def run_client(self, dataset, options):
+        self.stdout.write(f'\n{dataset}: test client')
+        self.stdout.write(
+            f"{'endpoint':<20}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+            f"{'queries':>9}{'bytes':>9}{'peak KiB':>10}"
+        )
+        results = {}
+        with benchmark_database(), override_settings(
+            API_CACHE_ENABLED=options['cached'], WRITE_THROTTLE_BURST=10 ** 9,
+        ):
+            create_dataset(**DATASETS[dataset], render=True)
+            client = Client()
+            post_pk = Post.objects.order_by('pk').values_list('pk', flat=True).first()
+            for name, (method, path, data) in endpoints(post_pk).items():
+                result = results[name] = measure(client, path, options['requests'], method, data, LANGUAGES)
+                self.stdout.write(
+                    f"{name:<20}{result['rps']:>9.1f}{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}"
+                    f"{result['p99_ms']:>9.2f}{result['queries']:>9}{result['bytes']:>9}{result['peak_kib']:>10.1f}"
+                )
+        return results
+
+    def run_server(self, dataset, results, options):
+        self.stdout.write(f'\n{dataset}: gunicorn, {options["workers"]} workers, concurrency {options["concurrency"]}')
+        self.stdout.write(f"{'endpoint':<20}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'errors':>8}")
+        workdir = tempfile.mkdtemp(prefix='benchmark-')
+        try:
+            env = seed_database(workdir, **DATASETS[dataset])
+            port = free_port()
+            command = [
+                'gunicorn', 'portfolio.wsgi:application',
+                '--workers', str(options['workers']), '--bind', f'127.0.0.1:{port}',
+            ]
+            with serve(command, env, port, reverse('skill-list')):
+                for name, (method, path, _) in endpoints().items():
+                    if method != 'get':
+                        continue  # writes are throttled per client
+                    latencies, errors, elapsed = asyncio.run(
+                        run_load(port, path, options['requests'], options['concurrency'])
+                    )
+                    if len(latencies) < 2:
+                        raise CommandError(f'{name}: too few successful requests ({errors} errors).')
+                    server = results[name]['server'] = {
+                        'rps': round(len(latencies) / elapsed, 1),
+                        'p50_ms': round(statistics.median(latencies) * 1000, 3),
+                        'p99_ms': round(percentile_ms(latencies, 99), 3),
+                        'errors': errors,
+                    }
+                    self.stdout.write(
+                        f"{name:<20}{server['rps']:>9.1f}{server['p50_ms']:>9.2f}"
+                        f"{server['p99_ms']:>9.2f}{errors:>8}"
+                    )
+        except RuntimeError as exc:
+            raise CommandError(str(exc))
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
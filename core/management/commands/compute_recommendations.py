@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import recommendations
+
+
+class Command(BaseCommand):
+    help = (
+        'Recomputes the related posts and projects of every item (core/recommendations.py). '
+        'Edits refresh them incrementally; run this periodically to re-weight every list.'
+    )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        rows, changed = recommendations.rebuild()
+        self.stdout.write(
+            f'Stored {rows} recommendations, {changed} items changed, in {time.perf_counter() - start:.2f}s.'
+        )
@@ -0,0 +1,47 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max
+
+from core.models import SnapshotChange
+from core.snapshot import SnapshotError, SnapshotWriter, all_paths, brotli
+
+
+class Command(BaseCommand):
+    help = (
+        'Writes every public list and detail endpoint, in every language, as static '
+        'JSON (plus .gz and .br copies) with a manifest of content hashes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=os.path.join(settings.BASE_DIR, 'snapshot'))
+        parser.add_argument(
+            '--base-url', default='http://localhost:8000',
+            help='Origin used for absolute links inside the responses (its host must be in ALLOWED_HOSTS).',
+        )
+        parser.add_argument(
+            '--incremental', action='store_true',
+            help='Only re-export endpoints touched by edits since the last export.',
+        )
+
+    def handle(self, *args, **options):
+        if brotli is None:
+            self.stderr.write('Brotli is not installed; skipping .br files.')
+        writer = SnapshotWriter(options['output'], options['base_url'])
+        # Changes recorded while exporting are kept for the next run.
+        last_change = SnapshotChange.objects.aggregate(last=Max('pk'))['last'] or 0
+
+        try:
+            if options['incremental'] and writer.manifest is not None:
+                paths = SnapshotChange.objects.filter(pk__lte=last_change).values_list('path', flat=True).distinct()
+                written, unchanged, removed = writer.export(list(paths))
+            else:
+                written, unchanged, removed = writer.export(all_paths(), prune=True)
+        except SnapshotError as exc:
+            raise CommandError(str(exc))
+
+        SnapshotChange.objects.filter(pk__lte=last_change).delete()
+        self.stdout.write(
+            f"Snapshot in {options['output']}: {written} written, {unchanged} unchanged, {removed} removed."
+        )
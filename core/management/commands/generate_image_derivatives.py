@@ -0,0 +1,65 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from core import images
+from core.models import MarkdownImage, Project, Skill
+from core.tasks import store_variants
+
+# model -> image field
+TARGETS = {Skill: 'logo', Project: 'thumbnail', MarkdownImage: 'image'}
+MARKDOWNX_ROOT = 'markdownx'
+
+
+def _walk(storage, directory):
+    directories, files = storage.listdir(directory)
+    for name in files:
+        yield f'{directory}/{name}'
+    for sub in directories:
+        yield from _walk(storage, f'{directory}/{sub}')
+
+
+class Command(BaseCommand):
+    help = 'Generates responsive image derivatives for existing skill logos, project thumbnails and Markdown uploads.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count())
+        parser.add_argument('--force', action='store_true', help='Regenerate images that already have derivatives.')
+
+    def handle(self, *args, **options):
+        self.register_markdown_uploads()
+
+        pending = []
+        for model, field in TARGETS.items():
+            for obj in model.objects.all():
+                name = getattr(obj, field).name
+                done = getattr(obj, f'{field}_variants').get('source') == name
+                if name and images.is_raster(name) and (options['force'] or not done):
+                    pending.append((obj, field, name))
+
+        # Images are read here and written back here; workers only encode.
+        batch = max(1, options['workers']) * 2
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            for start in range(0, len(pending), batch):
+                chunk = pending[start:start + batch]
+                sources = [self.read(name) for _, _, name in chunk]
+                for (obj, field, name), built in zip(chunk, pool.map(images.build_derivatives, sources)):
+                    store_variants(obj, field, images.save_derivatives(name, built))
+        self.stdout.write(f'Generated derivatives for {len(pending)} image(s).')
+
+    def read(self, name):
+        with default_storage.open(name, 'rb') as f:
+            return f.read()
+
+    def register_markdown_uploads(self):
+        # Uploads made before MarkdownImage existed have no row yet.
+        try:
+            names = [name for name in _walk(default_storage, MARKDOWNX_ROOT) if images.is_raster(name)]
+        except (NotImplementedError, FileNotFoundError):
+            return
+        known = set(MarkdownImage.objects.values_list('image', flat=True))
+        MarkdownImage.objects.bulk_create([
+            MarkdownImage(image=name, url=default_storage.url(name)) for name in names if name not in known
+        ])
@@ -0,0 +1,65 @@
+import asyncio
+import shutil
+import statistics
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks import free_port, run_load, seed_database, serve
+
+
+class Command(BaseCommand):
+    help = (
+        'Load-tests the sync DRF views under gunicorn against the async views '
+        'under uvicorn, on a freshly seeded SQLite database, and reports latency percentiles.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='posts/', help='Endpoint below /api/ (and /api/async/).')
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument('--posts', type=int, default=200)
+        parser.add_argument(
+            '--slow-client-ms', type=float, default=0,
+            help='Delay between 16-byte chunks of each request, to simulate slow clients.',
+        )
+
+    def handle(self, *args, **options):
+        for binary in ('gunicorn', 'uvicorn'):
+            if shutil.which(binary) is None:
+                raise CommandError(f'{binary} is not installed.')
+
+        workdir = tempfile.mkdtemp(prefix='loadtest-')
+        try:
+            env = seed_database(workdir, posts=options['posts'])
+            servers = [
+                ('gunicorn (sync)', ['gunicorn', 'portfolio.wsgi:application',
+                                     '--workers', str(options['workers']), '--bind', '127.0.0.1:{port}'],
+                 f"/api/{options['path']}"),
+                ('uvicorn (async)', ['uvicorn', 'portfolio.asgi:application',
+                                     '--workers', str(options['workers']), '--port', '{port}', '--log-level', 'warning'],
+                 f"/api/async/{options['path']}"),
+            ]
+            self.stdout.write(f"{'server':<18}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+            for name, command, path in servers:
+                self._benchmark(name, command, path, env, options)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def _benchmark(self, name, command, path, env, options):
+        port = free_port()
+        try:
+            with serve([part.format(port=port) for part in command], env, port, path):
+                latencies, errors, elapsed = asyncio.run(run_load(
+                    port, path, options['requests'], options['concurrency'], options['slow_client_ms'] / 1000,
+                ))
+        except RuntimeError as exc:
+            raise CommandError(str(exc))
+        if len(latencies) < 2:
+            raise CommandError(f'{name}: too few successful requests ({errors} errors).')
+        percentiles = statistics.quantiles(latencies, n=100)
+        self.stdout.write(
+            f'{name:<18}{len(latencies) / elapsed:>10.1f}{percentiles[49] * 1000:>10.1f}'
+            f'{percentiles[98] * 1000:>10.1f}{errors:>8}'
+        )
@@ -0,0 +1,84 @@
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+# Run in a fresh interpreter: this process has imported everything already.
+SCRIPT = '''
+import json, sys, time
+start = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+wsgi = time.perf_counter()
+phases = {"django.setup()": setup - start, "WSGI handler": wsgi - setup}
+if sys.argv[1] == "warm":
+    from core.startup import preload, warm_up
+    phases.update({f"preload: {name}": seconds for name, seconds in preload().items()})
+    phases.update({f"warm-up: {name}": seconds for name, seconds in warm_up().items()})
+print(json.dumps(phases))
+'''
+
+# "import time: <self us> | <cumulative us> | <indent><module>"
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+class Command(BaseCommand):
+    help = (
+        'Starts the application the way a gunicorn worker does in a fresh interpreter and reports '
+        'import time per module (python -X importtime) and per startup phase.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=25, help='Modules to list.')
+        parser.add_argument(
+            '--sort', choices=['self', 'cumulative'], default='cumulative',
+            help='cumulative lists the modules imported directly by the application and Django.',
+        )
+        parser.add_argument('--no-warm-up', action='store_true', help='Stop before core.startup.preload() and warm_up().')
+
+    def handle(self, *args, **options):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', SCRIPT, 'cold' if options['no_warm_up'] else 'warm'],
+            capture_output=True, text=True, env=os.environ.copy(),
+        )
+        if result.returncode:
+            raise CommandError(result.stderr[-2000:])
+        phases = json.loads(result.stdout.strip().splitlines()[-1])
+        # (self us, cumulative us, depth, module); depth 0 is a top-level import
+        imports = [
+            (int(own), int(cumulative), (len(indent) - 1) // 2, module)
+            for own, cumulative, indent, module in (
+                match.groups() for match in map(IMPORT_LINE.match, result.stderr.splitlines()) if match
+            )
+        ]
+
+        self.stdout.write(f"{'phase':<28}{'ms':>9}")
+        for name, seconds in phases.items():
+            self.stdout.write(f'{name:<28}{seconds * 1000:>9.1f}')
+
+        total = sum(own for own, *_ in imports)
+        self.stdout.write(f'\n{len(imports)} modules imported in {total / 1000:.1f} ms\n')
+
+        packages = defaultdict(int)
+        for own, _, _, module in imports:
+            packages[module.split('.')[0]] += own
+        self.stdout.write(f"{'package':<40}{'ms':>9}")
+        for package, own in sorted(packages.items(), key=lambda item: -item[1])[:options['limit']]:
+            self.stdout.write(f'{package:<40}{own / 1000:>9.1f}')
+
+        if options['sort'] == 'cumulative':
+            # Top-level imports only, or every module would be counted again
+            # under each of its importers.
+            rows = sorted((row for row in imports if row[2] == 0), key=lambda row: -row[1])
+        else:
+            rows = sorted(imports, key=lambda row: -row[0])
+        self.stdout.write(f"\n{'module':<50}{'self ms':>9}{'cumulative ms':>15}")
+        for own, cumulative, _, module in rows[:options['limit']]:
+            self.stdout.write(f'{module:<50}{own / 1000:>9.1f}{cumulative / 1000:>15.1f}')
@@ -0,0 +1,64 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from modeltranslation.settings import AVAILABLE_LANGUAGES
+from modeltranslation.utils import build_localized_fieldname
+
+from core.cache import bump_version
+from core.models import MarkdownImage, Project, Post
+from core.rendering import image_urls, render_markdown
+from core.snapshot import mark_dirty, post_paths, project_paths
+
+# model -> (source field, html field, toc field)
+TARGETS = {
+    Post: ('content', 'content_html', 'content_toc'),
+    Project: ('full_description', 'full_description_html', 'full_description_toc'),
+}
+SNAPSHOT_PATHS = {Post: post_paths, Project: project_paths}
+
+
+def _render(text, images=None):
+    # Runs in a worker process; only plain data crosses the process boundary.
+    if not text:
+        return {'html': '', 'toc': [], 'word_count': 0, 'reading_time': 0}
+    return render_markdown(text, images)
+
+
+class Command(BaseCommand):
+    help = 'Re-renders the stored HTML, TOC and reading time of every post and project.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count())
+        parser.add_argument('--batch-size', type=int, default=200)
+
+    def handle(self, *args, **options):
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            for model, (source, html, toc) in TARGETS.items():
+                sources = [build_localized_fieldname(source, lang) for lang in AVAILABLE_LANGUAGES]
+                fields = ['updated_at'] + [
+                    build_localized_fieldname(name, lang)
+                    for name in (html, toc, 'word_count', 'reading_time')
+                    for lang in AVAILABLE_LANGUAGES
+                ]
+                objects = list(model.objects.only('pk', *sources))
+                texts = [getattr(obj, column) for obj in objects for column in sources]
+                images = MarkdownImage.objects.variants_for(image_urls(*texts))
+                results = iter(pool.map(partial(_render, images=images), texts, chunksize=16))
+
+                now = timezone.now()
+                for obj in objects:
+                    obj.updated_at = now
+                    for lang in AVAILABLE_LANGUAGES:
+                        rendered = next(results)
+                        setattr(obj, build_localized_fieldname(html, lang), rendered['html'])
+                        setattr(obj, build_localized_fieldname(toc, lang), rendered['toc'])
+                        setattr(obj, build_localized_fieldname('word_count', lang), rendered['word_count'])
+                        setattr(obj, build_localized_fieldname('reading_time', lang), rendered['reading_time'])
+                model.objects.bulk_update(objects, fields, batch_size=options['batch_size'])
+                # bulk_update() sends no signals.
+                bump_version(model)
+                mark_dirty(SNAPSHOT_PATHS[model](*model.objects.values_list('slug', flat=True)))
+                self.stdout.write(f'Rendered {len(objects)} {model._meta.verbose_name_plural}.')
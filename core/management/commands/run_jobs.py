@@ -0,0 +1,39 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core import jobs
+
+
+class Command(BaseCommand):
+    help = 'Runs queued background jobs (spam screening, notifications) until stopped.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit once no job is due.')
+        parser.add_argument('--batch', type=int, default=10, help='Jobs claimed per round.')
+        parser.add_argument('--poll', type=float, default=2.0, help='Seconds to sleep when idle.')
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        if not options['once']:
+            # Finish the job in hand, then exit.
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+
+        processed = 0
+        jobs.purge()
+        while not self.stopping:
+            close_old_connections()
+            ran = jobs.run_pending(options['batch'])
+            processed += ran
+            if ran:
+                continue
+            if options['once']:
+                break
+            time.sleep(options['poll'])
+        self.stdout.write(f'Ran {processed} job(s).')
+
+    def stop(self, signum, frame):
+        self.stopping = True
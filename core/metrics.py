@@ -0,0 +1,143 @@
+"""
+Per-view request metrics (see core.middleware.InstrumentationMiddleware),
+exposed in the Prometheus text format on ``/metrics``.
+
+Each process aggregates in memory. With ``METRICS_DIR`` set, a process
+also writes its totals to ``<METRICS_DIR>/metrics-<pid>.json`` (at most
+every ``FLUSH_INTERVAL`` seconds), and ``/metrics`` adds up every file in
+the directory. That is how a scrape that lands on one gunicorn worker
+still reports all of them. Empty the directory when the server restarts.
+"""
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+
+FLUSH_INTERVAL = 1.0
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+
+# name -> (type, help, label names, buckets)
+METRICS = {
+    'api_requests_total': ('counter', 'Requests handled, by view, method and status.', ('view', 'method', 'status'), None),
+    'api_request_duration_seconds': ('histogram', 'Total time spent handling the request.', ('view',), DURATION_BUCKETS),
+    'api_db_duration_seconds': ('histogram', 'Time spent in SQL queries per request.', ('view',), DURATION_BUCKETS),
+    'api_serialize_duration_seconds': ('histogram', 'Time spent in the view outside SQL per request.', ('view',), DURATION_BUCKETS),
+    'api_render_duration_seconds': ('histogram', 'Time spent rendering the response body.', ('view',), DURATION_BUCKETS),
+    'api_db_queries': ('histogram', 'SQL queries per request.', ('view',), QUERY_BUCKETS),
+}
+
+
+class Registry:
+    """Counters are ``{labels: value}``; histograms are ``{labels: [bucket
+    counts..., sum, count]}`` with non-cumulative bucket counts."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.values = {name: {} for name in METRICS}
+        self.last_flush = 0.0
+
+    def inc(self, name, labels):
+        with self.lock:
+            values = self.values[name]
+            values[labels] = values.get(labels, 0) + 1
+
+    def observe(self, name, labels, value):
+        buckets = METRICS[name][3]
+        with self.lock:
+            series = self.values[name].setdefault(labels, [0] * (len(buckets) + 3))
+            index = next((i for i, bound in enumerate(buckets) if value <= bound), len(buckets))
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                name: [[list(labels), value if isinstance(value, (int, float)) else list(value)]
+                       for labels, value in values.items()]
+                for name, values in self.values.items()
+            }
+
+    def reset(self):
+        with self.lock:
+            self.values = {name: {} for name in METRICS}
+
+
+registry = Registry()
+
+
+def _path(directory, pid=None):
+    return os.path.join(directory, f'metrics-{pid or os.getpid()}.json')
+
+
+def flush(force=False):
+    directory = settings.METRICS_DIR
+    now = time.monotonic()
+    if not directory or (not force and now - registry.last_flush < FLUSH_INTERVAL):
+        return
+    registry.last_flush = now
+    os.makedirs(directory, exist_ok=True)
+    path = _path(directory)
+    temp = f'{path}.{threading.get_ident()}.tmp'
+    with open(temp, 'w') as f:
+        json.dump(registry.snapshot(), f)
+    os.replace(temp, path)
+
+
+def collect():
+    """Every process's values added together, keyed like Registry.values."""
+    snapshots = [registry.snapshot()]
+    directory = settings.METRICS_DIR
+    if directory:
+        flush(force=True)
+        own = os.path.basename(_path(directory))
+        for name in os.listdir(directory) if os.path.isdir(directory) else ():
+            if name.startswith('metrics-') and name.endswith('.json') and name != own:
+                try:
+                    with open(os.path.join(directory, name)) as f:
+                        snapshots.append(json.load(f))
+                except (OSError, ValueError):
+                    continue  # a worker that died mid-write
+
+    totals = {name: defaultdict(lambda: None) for name in METRICS}
+    for snapshot in snapshots:
+        for name, series in snapshot.items():
+            if name not in METRICS:
+                continue
+            for labels, value in series:
+                key = tuple(labels)
+                current = totals[name][key]
+                if isinstance(value, list):
+                    totals[name][key] = value if current is None else [a + b for a, b in zip(current, value)]
+                else:
+                    totals[name][key] = value + (current or 0)
+    return totals
+
+
+def _labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    escaped = (str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def render_text():
+    lines = []
+    for name, series in collect().items():
+        kind, help_text, label_names, buckets = METRICS[name]
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+        for labels, value in sorted(series.items()):
+            if kind == 'counter':
+                lines.append(f'{name}{_labels(label_names, labels)} {value}')
+                continue
+            cumulative = 0
+            for bound, count in zip([*buckets, '+Inf'], value):
+                cumulative += count
+                lines.append(f'{name}_bucket{_labels(label_names, labels, [("le", bound)])} {cumulative}')
+            lines.append(f'{name}_sum{_labels(label_names, labels)} {value[-2]}')
+            lines.append(f'{name}_count{_labels(label_names, labels)} {value[-1]}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,143 @@
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from . import metrics
+
+logger = logging.getLogger('core.metrics')
+
+
+def _coroutine(method):
+    async def wrapper(*args):
+        return method(*args)
+    return wrapper
+
+
+class RequestTimings:
+    def __init__(self):
+        self.queries = []  # (sql, seconds)
+        self.view = None
+        self.view_started = self.view_finished = None
+        self.render_started = self.render_finished = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - start))
+
+    def db_time(self):
+        return sum(seconds for _, seconds in self.queries)
+
+
+class InstrumentationMiddleware:
+    """
+    Records query count, SQL time, view time outside SQL ("serialize":
+    the read views do little else), render time and total latency for
+    every request that resolves to a view. Results go into the
+    ``Server-Timing`` header and the histograms in core.metrics. Single
+    slow queries and repeated identical queries (N+1) are logged as
+    warnings.
+
+    Removed from the stack entirely when METRICS_ENABLED is False. Runs
+    natively under ASGI as well, hooks included, so it adds no thread hop.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+            # The handler runs sync hooks through sync_to_async; these never block.
+            self.process_view = _coroutine(self.process_view)
+            self.process_template_response = _coroutine(self.process_template_response)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        start = time.perf_counter()
+        timings = request._timings = RequestTimings()
+        with self.instrumented(timings):
+            response = self.get_response(request)
+        return self.finish(request, response, timings, start)
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        timings = request._timings = RequestTimings()
+        with self.instrumented(timings):
+            response = await self.get_response(request)
+        return self.finish(request, response, timings, start)
+
+    def instrumented(self, timings):
+        stack = ExitStack()
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(timings))
+        return stack
+
+    def finish(self, request, response, timings, start):
+        if timings.view is None:
+            return response  # static files, unknown URLs, /metrics itself
+        self.record(request, response, timings, time.perf_counter() - start)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view = getattr(view_func, 'view_class', view_func).__name__
+        if view != 'metrics_view':
+            request._timings.view = view
+            request._timings.view_started = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after the view returns and before the
+        # response comes back through the middleware.
+        timings = request._timings
+        timings.view_finished = timings.render_started = time.perf_counter()
+
+        def finished(rendered):
+            timings.render_finished = time.perf_counter()
+        response.add_post_render_callback(finished)
+        return response
+
+    def record(self, request, response, timings, total):
+        db = timings.db_time()
+        view_finished = timings.view_finished or time.perf_counter()
+        serialize = max(0.0, view_finished - (timings.view_started or view_finished) - db)
+        render = (timings.render_finished or 0) - (timings.render_started or 0)
+
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={db * 1000:.2f};desc="{len(timings.queries)} queries"',
+            f'serialize;dur={serialize * 1000:.2f}',
+            f'render;dur={render * 1000:.2f}',
+            f'total;dur={total * 1000:.2f}',
+        ])
+
+        view = (timings.view,)
+        metrics.registry.inc('api_requests_total', (timings.view, request.method, str(response.status_code)))
+        metrics.registry.observe('api_request_duration_seconds', view, total)
+        metrics.registry.observe('api_db_duration_seconds', view, db)
+        metrics.registry.observe('api_serialize_duration_seconds', view, serialize)
+        metrics.registry.observe('api_render_duration_seconds', view, render)
+        metrics.registry.observe('api_db_queries', view, len(timings.queries))
+        metrics.flush()
+
+        self.warn(request, timings)
+
+    def warn(self, request, timings):
+        slow = settings.METRICS_SLOW_QUERY_MS / 1000
+        for sql, seconds in timings.queries:
+            if seconds >= slow:
+                logger.warning('Slow query (%.1f ms) in %s %s: %s', seconds * 1000, timings.view, request.path, sql[:500])
+        repeated = Counter(sql for sql, _ in timings.queries)
+        for sql, count in repeated.items():
+            if count >= settings.METRICS_N_PLUS_ONE_THRESHOLD:
+                logger.warning('Possible N+1: %d identical queries in %s %s: %s', count, timings.view, request.path, sql[:500])
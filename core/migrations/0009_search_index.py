@@ -0,0 +1,116 @@
+# Generated by Django 6.0.1 on 2026-10-18 10:03
+
+from django.db import migrations
+
+# The index structures as of this migration, frozen here so later changes to
+# core.search can't alter what it creates. core.search re-checks them after
+# every migrate.
+
+POSTGRES_INSTALL = [
+    "CREATE INDEX IF NOT EXISTS core_post_search_en ON core_post USING gin (("
+    "setweight(to_tsvector('english', coalesce(title_en, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(content_en, '')), 'B')))",
+    "CREATE INDEX IF NOT EXISTS core_post_search_fr ON core_post USING gin (("
+    "setweight(to_tsvector('french', coalesce(title_fr, '')), 'A') || "
+    "setweight(to_tsvector('french', coalesce(content_fr, '')), 'B')))",
+    "CREATE INDEX IF NOT EXISTS core_post_search_ar ON core_post USING gin (("
+    "setweight(to_tsvector('arabic', coalesce(title_ar, '')), 'A') || "
+    "setweight(to_tsvector('arabic', coalesce(content_ar, '')), 'B')))",
+    "CREATE INDEX IF NOT EXISTS core_project_search_en ON core_project USING gin (("
+    "setweight(to_tsvector('english', coalesce(title_en, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(short_description_en, '') || ' ' || "
+    "coalesce(full_description_en, '')), 'B')))",
+    "CREATE INDEX IF NOT EXISTS core_project_search_fr ON core_project USING gin (("
+    "setweight(to_tsvector('french', coalesce(title_fr, '')), 'A') || "
+    "setweight(to_tsvector('french', coalesce(short_description_fr, '') || ' ' || "
+    "coalesce(full_description_fr, '')), 'B')))",
+    "CREATE INDEX IF NOT EXISTS core_project_search_ar ON core_project USING gin (("
+    "setweight(to_tsvector('arabic', coalesce(title_ar, '')), 'A') || "
+    "setweight(to_tsvector('arabic', coalesce(short_description_ar, '') || ' ' || "
+    "coalesce(full_description_ar, '')), 'B')))",
+]
+
+POSTGRES_UNINSTALL = [
+    'DROP INDEX IF EXISTS core_post_search_en',
+    'DROP INDEX IF EXISTS core_post_search_fr',
+    'DROP INDEX IF EXISTS core_post_search_ar',
+    'DROP INDEX IF EXISTS core_project_search_en',
+    'DROP INDEX IF EXISTS core_project_search_fr',
+    'DROP INDEX IF EXISTS core_project_search_ar',
+]
+
+POST_COLUMNS = 'title_en, content_en, title_fr, content_fr, title_ar, content_ar'
+POST_NEW = 'new.title_en, new.content_en, new.title_fr, new.content_fr, new.title_ar, new.content_ar'
+POST_OLD = 'old.title_en, old.content_en, old.title_fr, old.content_fr, old.title_ar, old.content_ar'
+PROJECT_COLUMNS = (
+    'title_en, short_description_en, full_description_en, '
+    'title_fr, short_description_fr, full_description_fr, '
+    'title_ar, short_description_ar, full_description_ar'
+)
+PROJECT_NEW = (
+    'new.title_en, new.short_description_en, new.full_description_en, '
+    'new.title_fr, new.short_description_fr, new.full_description_fr, '
+    'new.title_ar, new.short_description_ar, new.full_description_ar'
+)
+PROJECT_OLD = (
+    'old.title_en, old.short_description_en, old.full_description_en, '
+    'old.title_fr, old.short_description_fr, old.full_description_fr, '
+    'old.title_ar, old.short_description_ar, old.full_description_ar'
+)
+
+SQLITE_INSTALL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS core_post_fts USING fts5({POST_COLUMNS}, content='core_post', "
+    "content_rowid='id', tokenize='porter unicode61 remove_diacritics 2')",
+    'CREATE TRIGGER IF NOT EXISTS core_post_fts_ai AFTER INSERT ON core_post BEGIN '
+    f'INSERT INTO core_post_fts(rowid, {POST_COLUMNS}) VALUES (new.id, {POST_NEW}); END',
+    'CREATE TRIGGER IF NOT EXISTS core_post_fts_ad AFTER DELETE ON core_post BEGIN '
+    f"INSERT INTO core_post_fts(core_post_fts, rowid, {POST_COLUMNS}) VALUES ('delete', old.id, {POST_OLD}); END",
+    'CREATE TRIGGER IF NOT EXISTS core_post_fts_au AFTER UPDATE ON core_post BEGIN '
+    f"INSERT INTO core_post_fts(core_post_fts, rowid, {POST_COLUMNS}) VALUES ('delete', old.id, {POST_OLD}); "
+    f'INSERT INTO core_post_fts(rowid, {POST_COLUMNS}) VALUES (new.id, {POST_NEW}); END',
+    "INSERT INTO core_post_fts(core_post_fts) VALUES ('rebuild')",
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS core_project_fts USING fts5({PROJECT_COLUMNS}, content='core_project', "
+    "content_rowid='id', tokenize='porter unicode61 remove_diacritics 2')",
+    'CREATE TRIGGER IF NOT EXISTS core_project_fts_ai AFTER INSERT ON core_project BEGIN '
+    f'INSERT INTO core_project_fts(rowid, {PROJECT_COLUMNS}) VALUES (new.id, {PROJECT_NEW}); END',
+    'CREATE TRIGGER IF NOT EXISTS core_project_fts_ad AFTER DELETE ON core_project BEGIN '
+    f'INSERT INTO core_project_fts(core_project_fts, rowid, {PROJECT_COLUMNS}) '
+    f"VALUES ('delete', old.id, {PROJECT_OLD}); END",
+    'CREATE TRIGGER IF NOT EXISTS core_project_fts_au AFTER UPDATE ON core_project BEGIN '
+    f'INSERT INTO core_project_fts(core_project_fts, rowid, {PROJECT_COLUMNS}) '
+    f"VALUES ('delete', old.id, {PROJECT_OLD}); "
+    f'INSERT INTO core_project_fts(rowid, {PROJECT_COLUMNS}) VALUES (new.id, {PROJECT_NEW}); END',
+    "INSERT INTO core_project_fts(core_project_fts) VALUES ('rebuild')",
+]
+
+SQLITE_UNINSTALL = [
+    'DROP TRIGGER IF EXISTS core_post_fts_ai',
+    'DROP TRIGGER IF EXISTS core_post_fts_ad',
+    'DROP TRIGGER IF EXISTS core_post_fts_au',
+    'DROP TABLE IF EXISTS core_post_fts',
+    'DROP TRIGGER IF EXISTS core_project_fts_ai',
+    'DROP TRIGGER IF EXISTS core_project_fts_ad',
+    'DROP TRIGGER IF EXISTS core_project_fts_au',
+    'DROP TABLE IF EXISTS core_project_fts',
+]
+
+
+def run(statements):
+    def operation(apps, schema_editor):
+        for sql in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql, params=None)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run({'postgresql': POSTGRES_INSTALL, 'sqlite': SQLITE_INSTALL}),
+            run({'postgresql': POSTGRES_UNINSTALL, 'sqlite': SQLITE_UNINSTALL}),
+        ),
+    ]
@@ -0,0 +1,196 @@
+# Generated by Django 6.0.1 on 2026-10-18 12:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def render_existing(apps, schema_editor):
+    from core.rendering import render_markdown
+
+    for model_name, source, html, toc in (
+        ('Post', 'content', 'content_html', 'content_toc'),
+        ('Project', 'full_description', 'full_description_html', 'full_description_toc'),
+    ):
+        model = apps.get_model('core', model_name)
+        for obj in model.objects.all():
+            for lang, _ in settings.LANGUAGES:
+                text = getattr(obj, f'{source}_{lang}')
+                if not text:
+                    continue
+                rendered = render_markdown(text)
+                setattr(obj, f'{html}_{lang}', rendered['html'])
+                setattr(obj, f'{toc}_{lang}', rendered['toc'])
+                setattr(obj, f'word_count_{lang}', rendered['word_count'])
+                setattr(obj, f'reading_time_{lang}', rendered['reading_time'])
+            obj.save()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='content_html',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='content_html_ar',
+            field=models.TextField(blank=True, default='', editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='content_html_en',
+            field=models.TextField(blank=True, default='', editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='content_html_fr',
+            field=models.TextField(blank=True, default='', editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='content_toc',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='content_toc_ar',
+            field=models.JSONField(blank=True, default=list, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='content_toc_en',
+            field=models.JSONField(blank=True, default=list, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='content_toc_fr',
+            field=models.JSONField(blank=True, default=list, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='reading_time',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='reading_time_ar',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='reading_time_en',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='reading_time_fr',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='word_count_ar',
+            field=models.PositiveIntegerField(default=0, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='word_count_en',
+            field=models.PositiveIntegerField(default=0, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='word_count_fr',
+            field=models.PositiveIntegerField(default=0, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='full_description_html',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='full_description_html_ar',
+            field=models.TextField(blank=True, default='', editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='full_description_html_en',
+            field=models.TextField(blank=True, default='', editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='full_description_html_fr',
+            field=models.TextField(blank=True, default='', editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='full_description_toc',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='full_description_toc_ar',
+            field=models.JSONField(blank=True, default=list, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='full_description_toc_en',
+            field=models.JSONField(blank=True, default=list, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='full_description_toc_fr',
+            field=models.JSONField(blank=True, default=list, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='reading_time',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='reading_time_ar',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='reading_time_en',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='reading_time_fr',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='word_count_ar',
+            field=models.PositiveIntegerField(default=0, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='word_count_en',
+            field=models.PositiveIntegerField(default=0, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='word_count_fr',
+            field=models.PositiveIntegerField(default=0, editable=False, null=True),
+        ),
+        migrations.RunPython(render_existing, migrations.RunPython.noop),
+    ]
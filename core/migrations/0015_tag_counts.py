@@ -0,0 +1,56 @@
+# Generated by Django 6.0.1 on 2026-10-18 03:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def count_existing(apps, schema_editor):
+    Tag = apps.get_model('core', 'Tag')
+    TagCount = apps.get_model('core', 'TagCount')
+    tags = Tag.objects.annotate(
+        active_posts=models.Count('posts', filter=models.Q(posts__is_active=True), distinct=True),
+        projects_count=models.Count('projects', distinct=True),
+    ).values_list('pk', 'active_posts', 'projects_count')
+    TagCount.objects.bulk_create([
+        TagCount(tag_id=pk, post_count=posts, project_count=projects) for pk, posts, projects in tags
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_image_derivatives'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TagCount',
+            fields=[
+                ('tag', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='counts', serialize=False, to='core.tag')),
+                ('post_count', models.PositiveIntegerField(default=0)),
+                ('project_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['is_active', '-created_at', '-id'], name='post_active_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['category', '-created_at', '-id'], name='project_category_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['is_featured', '-created_at', '-id'], name='project_featured_created_idx'),
+        ),
+        # ?tag= filters start from the tag: lead the M2M indexes with tag_id.
+        migrations.RunSQL(
+            'CREATE INDEX core_post_tags_tag_post_idx ON core_post_tags (tag_id, post_id)',
+            'DROP INDEX core_post_tags_tag_post_idx',
+        ),
+        migrations.RunSQL(
+            'CREATE INDEX core_project_tags_tag_project_idx ON core_project_tags (tag_id, project_id)',
+            'DROP INDEX core_project_tags_tag_project_idx',
+        ),
+        migrations.RunPython(count_existing, migrations.RunPython.noop),
+    ]
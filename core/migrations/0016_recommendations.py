@@ -0,0 +1,37 @@
+# Generated by Django 6.0.1 on 2026-10-18 03:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_tag_counts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='related',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='related',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.CreateModel(
+            name='Recommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_kind', models.CharField(choices=[('post', 'Post'), ('project', 'Project')], max_length=10)),
+                ('source_id', models.PositiveIntegerField()),
+                ('target_kind', models.CharField(choices=[('post', 'Post'), ('project', 'Project')], max_length=10)),
+                ('target_id', models.PositiveIntegerField()),
+                ('score', models.FloatField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['source_kind', 'source_id'], name='recommendation_source_idx'), models.Index(fields=['target_kind', 'target_id'], name='recommendation_target_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 6.0.1 on 2026-10-18 03:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_recommendations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyView',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('post', 'Post'), ('project', 'Project')], max_length=10)),
+                ('object_id', models.PositiveIntegerField()),
+                ('day', models.DateField()),
+                ('referrer', models.CharField(blank=True, max_length=100)),
+                ('views', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'day'], name='dailyview_kind_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id', 'day', 'referrer'), name='dailyview_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 6.0.1 on 2026-10-18 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_cache_table'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TermPosting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=100)),
+                ('kind', models.CharField(choices=[('post', 'Post'), ('project', 'Project')], max_length=10)),
+                ('object_id', models.PositiveIntegerField()),
+                ('weight', models.FloatField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['term'], name='termposting_term_idx'), models.Index(fields=['kind', 'object_id'], name='termposting_item_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 6.0.1 on 2026-10-18 19:12
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_term_postings'),
+    ]
+
+    # The tag-first M2M indexes from 0015 live on the auto-created through
+    # tables, which have no Meta to declare them on: they exist in the
+    # database only and the project state is unchanged. IF NOT EXISTS makes
+    # this a no-op wherever 0015 already created them.
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    'CREATE INDEX IF NOT EXISTS core_post_tags_tag_post_idx ON core_post_tags (tag_id, post_id)',
+                    migrations.RunSQL.noop,
+                ),
+                migrations.RunSQL(
+                    'CREATE INDEX IF NOT EXISTS core_project_tags_tag_project_idx '
+                    'ON core_project_tags (tag_id, project_id)',
+                    migrations.RunSQL.noop,
+                ),
+            ],
+        ),
+    ]
@@ -1,11 +1,70 @@
 from django.db import models
+from django.db.models.functions import Coalesce, NullIf, Substr, Upper
+from django.utils import timezone
 from django.utils.text import slugify
 from markdownx.models import MarkdownxField 
+from modeltranslation.settings import AVAILABLE_LANGUAGES
+from modeltranslation.utils import build_localized_fieldname, get_language, resolution_order
+
+
+
+def localized(field_name):
+    """Expression for the active language's column of a translated field,
+    falling back the same way modeltranslation's descriptors do."""
+    columns = [
+        build_localized_fieldname(field_name, lang)
+        for lang in resolution_order(get_language())
+    ]
+    if len(columns) == 1:
+        return models.F(columns[0])
+    return Coalesce(*[NullIf(models.F(column), models.Value('')) for column in columns])
+
+
+def render_translations(instance, source, html, toc, update_fields=None):
+    """
+    Store the rendered form of each language's ``source`` Markdown on
+    ``instance``. Languages without a body keep the field defaults so that
+    modeltranslation falls back to the default language's rendering.
+
+    Returns the ``update_fields`` for save(): a save that doesn't name
+    ``source`` skips rendering, one that does also writes the output.
+    """
+    sources = {build_localized_fieldname(source, lang) for lang in AVAILABLE_LANGUAGES}
+    if update_fields is not None and not (sources | {source}) & set(update_fields):
+        return update_fields
+
+    from .rendering import image_urls, render_markdown  # Markdown is only loaded by writers
+
+    texts = {lang: getattr(instance, build_localized_fieldname(source, lang)) for lang in AVAILABLE_LANGUAGES}
+    images = MarkdownImage.objects.variants_for(image_urls(*texts.values()))
+    rendered_fields = []
+    for lang, text in texts.items():
+        rendered = render_markdown(text, images) if text else {'html': '', 'toc': [], 'word_count': 0, 'reading_time': 0}
+        setattr(instance, build_localized_fieldname(html, lang), rendered['html'])
+        setattr(instance, build_localized_fieldname(toc, lang), rendered['toc'])
+        setattr(instance, build_localized_fieldname('word_count', lang), rendered['word_count'])
+        setattr(instance, build_localized_fieldname('reading_time', lang), rendered['reading_time'])
+        rendered_fields += [build_localized_fieldname(field, lang) for field in (html, toc, 'word_count', 'reading_time')]
+    if update_fields is not None:
+        update_fields = [*update_fields, *rendered_fields]
+    return update_fields
+
 
 # The Tag Model
+class TagQuerySet(models.QuerySet):
+    def with_counts(self):
+        # Read from the TagCount table, so listing tags never counts rows.
+        return self.annotate(
+            post_count=Coalesce(models.F('counts__post_count'), 0),
+            project_count=Coalesce(models.F('counts__project_count'), 0),
+        )
+
 class Tag(models.Model):
     name = models.CharField(max_length=200)
     slug = models.SlugField(db_index=True, unique=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = TagQuerySet.as_manager()
 
     def __str__(self):
         return self.name
@@ -15,6 +74,29 @@ class Tag(models.Model):
             self.slug = slugify(self.name)
         super().save(*args, **kwargs)
 
+# Per-tag counts, kept up to date by signals (see core/signals.py)
+class TagCountQuerySet(models.QuerySet):
+    def refresh(self, tag_ids):
+        """Recount the given tags only. Posts count while they are active."""
+        tags = Tag.objects.filter(pk__in=set(tag_ids)).annotate(
+            active_posts=models.Count('posts', filter=models.Q(posts__is_active=True), distinct=True),
+            projects_count=models.Count('projects', distinct=True),
+        ).values_list('pk', 'active_posts', 'projects_count')
+        self.bulk_create(
+            [TagCount(tag_id=pk, post_count=posts, project_count=projects) for pk, posts, projects in tags],
+            update_conflicts=True, unique_fields=['tag'], update_fields=['post_count', 'project_count'],
+        )
+
+class TagCount(models.Model):
+    tag = models.OneToOneField(Tag, on_delete=models.CASCADE, primary_key=True, related_name='counts')
+    post_count = models.PositiveIntegerField(default=0)
+    project_count = models.PositiveIntegerField(default=0)
+
+    objects = TagCountQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.tag_id}: {self.post_count} posts, {self.project_count} projects"
+
 # Skill Model
 class Skill(models.Model):
     CATEGORY_CHOICES = [
@@ -24,8 +106,11 @@ class Skill(models.Model):
     ]
     name = models.CharField(max_length=50)
     logo = models.ImageField(upload_to='skills/')
+    # Responsive derivatives of logo (see core/images.py)
+    logo_variants = models.JSONField(default=dict, blank=True, editable=False)
     is_key_skill = models.BooleanField(default=False)
     category = models.CharField(max_length=10, choices=CATEGORY_CHOICES, default='WEB')
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.name
@@ -36,11 +121,29 @@ class ContactMessage(models.Model):
     email = models.EmailField()
     message = models.TextField()
     timestamp = models.DateTimeField(auto_now_add=True)
+    # Filled in by the process_contact_message job (see core/tasks.py)
+    spam_score = models.FloatField(null=True, blank=True, editable=False)
+    is_spam = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            # Admin changelist: newest first, filtered by is_spam, searched by email
+            models.Index(fields=['-timestamp'], name='contact_timestamp_idx'),
+            models.Index(fields=['is_spam', '-timestamp'], name='contact_spam_timestamp_idx'),
+            models.Index(Upper('email'), name='contact_email_upper_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
 # Projects Model
+class ProjectQuerySet(models.QuerySet):
+    def summaries(self):
+        # Card listings never show the Markdown body, so skip loading it.
+        return self.defer(
+            'full_description', 'full_description_html', 'full_description_toc', 'related',
+        ).prefetch_related('tags')
+
 class Project(models.Model):
     CATEGORY_CHOICES = [
         ('FULL_STACK', 'Full Stack'),
@@ -51,15 +154,35 @@ class Project(models.Model):
     slug = models.SlugField(db_index=True, unique=True)
     short_description = models.TextField()
     full_description = MarkdownxField() 
+    # Rendered from full_description on save (see render_translations)
+    full_description_html = models.TextField(blank=True, default='', editable=False)
+    full_description_toc = models.JSONField(blank=True, default=list, editable=False)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    reading_time = models.PositiveSmallIntegerField(default=0, editable=False)
     
     thumbnail = models.ImageField(upload_to='projects')
+    thumbnail_variants = models.JSONField(default=dict, blank=True, editable=False)
     repo_link = models.URLField(blank=True)
     demo_link = models.URLField(blank=True)
     tags = models.ManyToManyField(Tag, related_name='projects') 
+    # Nearest posts and projects with their titles (see core/recommendations.py)
+    related = models.JSONField(default=list, blank=True, editable=False)
     
     is_featured = models.BooleanField(default=False)
     category = models.CharField(max_length=20, choices=CATEGORY_CHOICES, default='FULL_STACK')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = ProjectQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Backs keyset pagination (core.pagination)
+            models.Index(fields=['-created_at', '-id'], name='project_created_id_idx'),
+            # ?category= listings and the home page's featured projects
+            models.Index(fields=['category', '-created_at', '-id'], name='project_category_created_idx'),
+            models.Index(fields=['is_featured', '-created_at', '-id'], name='project_featured_created_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -67,17 +190,64 @@ class Project(models.Model):
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
+        kwargs['update_fields'] = render_translations(
+            self, 'full_description', 'full_description_html', 'full_description_toc', kwargs.get('update_fields')
+        )
         super().save(*args, **kwargs)
 
 # Post (Blog) Model
+class PostQuerySet(models.QuerySet):
+    EXCERPT_SOURCE_LENGTH = 400
+
+    def with_comment_count(self):
+        return self.annotate(
+            approved_comment_count=models.Count('comments', filter=models.Q(comments__is_approved=True))
+        )
+
+    def with_approved_comments(self, limit=None):
+        # Counts and approved comments are computed in a fixed number of
+        # queries so the list endpoint does not grow with the number of posts.
+        # ``limit`` keeps only the newest comments of each post.
+        approved = Comment.objects.filter(is_approved=True).order_by('-created_at', '-id')
+        if limit is not None:
+            approved = approved[:limit]
+        return self.with_comment_count().prefetch_related(
+            'tags',
+            models.Prefetch('comments', queryset=approved, to_attr='approved_comments'),
+        )
+
+    def summaries(self):
+        # The body is only needed for an excerpt, which the database can cut
+        # without shipping the whole column.
+        return self.defer('content', 'content_html', 'content_toc', 'related').with_comment_count().annotate(
+            content_head=Substr(localized('content'), 1, self.EXCERPT_SOURCE_LENGTH),
+        ).prefetch_related('tags')
+
 class Post(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(db_index=True, unique=True)
     content = MarkdownxField() 
+    # Rendered from content on save (see render_translations)
+    content_html = models.TextField(blank=True, default='', editable=False)
+    content_toc = models.JSONField(blank=True, default=list, editable=False)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    reading_time = models.PositiveSmallIntegerField(default=0, editable=False)
     tags = models.ManyToManyField(Tag, related_name='posts') 
+    # Nearest posts and projects with their titles (see core/recommendations.py)
+    related = models.JSONField(default=list, blank=True, editable=False)
     
     is_active = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = PostQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Backs keyset pagination (core.pagination)
+            models.Index(fields=['-created_at', '-id'], name='post_created_id_idx'),
+            models.Index(fields=['is_active', '-created_at', '-id'], name='post_active_created_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -85,6 +255,9 @@ class Post(models.Model):
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
+        kwargs['update_fields'] = render_translations(
+            self, 'content', 'content_html', 'content_toc', kwargs.get('update_fields')
+        )
         super().save(*args, **kwargs)
 
 # Comment Model
@@ -94,15 +267,145 @@ class Comment(models.Model):
     body = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     is_approved = models.BooleanField(default=False)
+    # Filled in by the process_comment job (see core/tasks.py)
+    spam_score = models.FloatField(null=True, blank=True, editable=False)
+    is_spam = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['post', '-created_at', '-id'], name='comment_post_created_id_idx'),
+            # Admin changelist: newest first, filtered by is_approved, searched by author
+            models.Index(fields=['-created_at'], name='comment_created_idx'),
+            models.Index(fields=['is_approved', '-created_at'], name='comment_approved_created_idx'),
+            models.Index(Upper('author_name'), name='comment_author_upper_idx'),
+        ]
 
     def __str__(self):
-        return f"Comment by {self.author_name} on {self.post.title}"
+        # Not the post's title: that would cost a query per comment listed.
+        return f"Comment by {self.author_name} on post #{self.post_id}"
 
 class TimelineEvent(models.Model):
     year = models.CharField(max_length=30)
     title = models.CharField(max_length=100)
     description = models.TextField()
     order = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
-        ordering = ['order']
\ No newline at end of file
+        ordering = ['order']
+
+# Image uploaded through the Markdownx editor (see core/forms.py)
+class MarkdownImageQuerySet(models.QuerySet):
+    def variants_for(self, urls):
+        if not urls:
+            return {}
+        return {
+            url: variants
+            for url, variants in self.filter(url__in=urls).exclude(image_variants={}).values_list('url', 'image_variants')
+        }
+
+class MarkdownImage(models.Model):
+    image = models.ImageField(upload_to='markdownx/')
+    url = models.CharField(max_length=500, db_index=True)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = MarkdownImageQuerySet.as_manager()
+
+    def __str__(self):
+        return self.image.name
+
+# Precomputed related content, one row per neighbour (see core/recommendations.py)
+class Recommendation(models.Model):
+    KIND_CHOICES = [
+        ('post', 'Post'),
+        ('project', 'Project'),
+    ]
+    source_kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    source_id = models.PositiveIntegerField()
+    target_kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    target_id = models.PositiveIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['source_kind', 'source_id'], name='recommendation_source_idx'),
+            models.Index(fields=['target_kind', 'target_id'], name='recommendation_target_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.source_kind} {self.source_id} -> {self.target_kind} {self.target_id} ({self.score:.3f})"
+
+# One term of an item's TF-IDF vector, for incremental refreshes (see core/recommendations.py)
+class TermPosting(models.Model):
+    term = models.CharField(max_length=100)
+    kind = models.CharField(max_length=10, choices=Recommendation.KIND_CHOICES)
+    object_id = models.PositiveIntegerField()
+    # Unit-length TF-IDF weight; 0 for terms too common to be indexed, which
+    # are kept for their document frequency.
+    weight = models.FloatField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['term'], name='termposting_term_idx'),
+            models.Index(fields=['kind', 'object_id'], name='termposting_item_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.term}: {self.kind} {self.object_id} ({self.weight:.3f})"
+
+# Views per item, day and referring site, written in batches (see core/analytics.py)
+class DailyView(models.Model):
+    kind = models.CharField(max_length=10, choices=Recommendation.KIND_CHOICES)
+    object_id = models.PositiveIntegerField()
+    day = models.DateField()
+    referrer = models.CharField(max_length=100, blank=True)
+    views = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id', 'day', 'referrer'], name='dailyview_unique'),
+        ]
+        indexes = [
+            # Backs the popular-content ranking
+            models.Index(fields=['kind', 'day'], name='dailyview_kind_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id} on {self.day}: {self.views}"
+
+# Background Job (see core/jobs.py)
+class Job(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Backs the worker's "what is due" lookup
+            models.Index(fields=['status', 'run_at'], name='job_status_run_at_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+# Endpoints to re-export in the next incremental snapshot (see core/snapshot.py)
+class SnapshotChange(models.Model):
+    path = models.CharField(max_length=255)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.path
@@ -0,0 +1,50 @@
+"""
+Heuristic spam scoring and duplicate detection for visitor submissions.
+
+Scores run from 0 (clean) to 1; anything at or above SPAM_THRESHOLD is
+flagged. Nothing is deleted or auto-approved: flags only sort the
+moderation queue in the admin.
+"""
+import datetime
+import re
+
+SPAM_THRESHOLD = 0.5
+DUPLICATE_WINDOW = datetime.timedelta(days=1)
+
+SPAM_PHRASES = (
+    'backlink', 'bitcoin', 'casino', 'click here', 'crypto', 'earn money', 'free money',
+    'loan', 'porn', 'seo service', 'viagra', 'whatsapp me',
+)
+
+_LINK = re.compile(r'https?://|www\.', re.IGNORECASE)
+_REPEATED = re.compile(r'(.)\1{5,}')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize(text):
+    return _WHITESPACE.sub(' ', text or '').strip().casefold()
+
+
+def spam_score(*texts):
+    text = ' '.join(texts)
+    lowered = text.casefold()
+    score = min(len(_LINK.findall(text)) * 0.25, 0.5)
+    score += min(sum(phrase in lowered for phrase in SPAM_PHRASES) * 0.3, 0.6)
+    letters = [char for char in text if char.isalpha()]
+    if len(letters) > 20 and sum(char.isupper() for char in letters) / len(letters) > 0.6:
+        score += 0.2
+    if _REPEATED.search(text):
+        score += 0.1
+    return round(min(score, 1.0), 2)
+
+
+def is_duplicate(instance, queryset, text_field, timestamp_field):
+    """Whether ``queryset`` already holds the same text, sent within
+    DUPLICATE_WINDOW before ``instance``."""
+    sent_at = getattr(instance, timestamp_field)
+    earlier = queryset.exclude(pk=instance.pk).filter(**{
+        f'{timestamp_field}__gte': sent_at - DUPLICATE_WINDOW,
+        f'{timestamp_field}__lte': sent_at,
+    }).values_list(text_field, flat=True)
+    text = normalize(getattr(instance, text_field))
+    return any(normalize(other) == text for other in earlier)
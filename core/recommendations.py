@@ -0,0 +1,314 @@
+"""
+Related posts and projects, computed offline.
+
+Every published post and every project is a sparse TF-IDF vector over the
+words of all its translations (titles and Markdown bodies) plus a set of
+tags. Two items score the cosine of their vectors blended with the Jaccard
+index of their tags. One item's scores against all the others come from
+inverted indexes (term -> weighted postings, tag -> items): a sparse
+matrix-vector product that only visits items sharing a term or a tag.
+Terms found in more than MAX_DOCUMENT_FREQUENCY of the items say little
+about similarity and are left out of the index.
+
+The TOP_K best neighbours of each item are stored as Recommendation rows
+and, with their titles in every language, in the item's ``related``
+column, so the detail serializers need no extra query. The postings are
+stored too (TermPosting), one row per term of each item.
+
+``manage.py compute_recommendations`` rebuilds everything. Edits queue a
+``refresh_recommendations`` job (core/tasks.py; one pending job per item)
+that only tokenizes the edited item, weighs it against the stored document
+frequencies and scores it through the stored postings. It then rewrites
+its own list and merges its new score into the lists it enters or leaves;
+only a list that loses it to an unknown next-best item is scored again.
+The weights of other items are not updated for the new IDF until the next
+rebuild.
+"""
+import math
+import re
+from collections import Counter, defaultdict
+from heapq import nlargest
+from operator import itemgetter
+
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+from modeltranslation.settings import AVAILABLE_LANGUAGES
+from modeltranslation.utils import build_localized_fieldname
+
+from . import syndication
+from .cache import bump_named_version, bump_version
+from .models import Post, Project, Recommendation, TermPosting
+from .snapshot import mark_dirty, post_paths, project_paths
+
+TOP_K = 4
+TAG_WEIGHT = 0.3
+MAX_DOCUMENT_FREQUENCY = 0.5
+
+# kind -> (model, filters for published items, text fields, snapshot paths)
+KINDS = {
+    'post': (Post, {'is_active': True}, ('title', 'content'), post_paths),
+    'project': (Project, {}, ('title', 'short_description', 'full_description'), project_paths),
+}
+
+_LINK_TARGET = re.compile(r'\]\([^)]*\)|https?://\S+')
+# Capped at TermPosting.term's length
+_WORD = re.compile(r'[^\W\d_]{3,100}')
+
+
+def kind_of(model):
+    return next(kind for kind, (kind_model, *_) in KINDS.items() if kind_model is model)
+
+
+def terms(text):
+    return _WORD.findall(_LINK_TARGET.sub(' ', text).lower())
+
+
+class Item:
+    __slots__ = ('slug', 'titles', 'terms', 'tags', 'related')
+
+    def __init__(self, slug, titles, terms, related):
+        self.slug = slug
+        self.titles = titles
+        self.terms = terms
+        self.tags = set()
+        self.related = related
+
+    def summary(self, kind):
+        return {'kind': kind, 'slug': self.slug, 'title': self.titles}
+
+
+def load_items(keys=None, texts=True):
+    """
+    (kind, pk) -> Item for every published post and project, or for the
+    published ones among ``keys``. Without ``texts`` the bodies aren't
+    loaded and the items have no terms.
+    """
+    items = {}
+    for kind, (model, filters, fields, _) in KINDS.items():
+        published = model.objects.filter(**filters)
+        if keys is not None:
+            published = published.filter(pk__in=[pk for item_kind, pk in keys if item_kind == kind])
+        titles = [build_localized_fieldname('title', lang) for lang in AVAILABLE_LANGUAGES]
+        columns = [build_localized_fieldname(field, lang) for field in fields for lang in AVAILABLE_LANGUAGES]
+        for pk, slug, related, *values in published.values_list('pk', 'slug', 'related', *titles, *(columns if texts else [])):
+            counts = Counter(terms(' '.join(filter(None, values[len(titles):])))) if texts else Counter()
+            items[kind, pk] = Item(slug, dict(zip(AVAILABLE_LANGUAGES, values[:len(titles)])), counts, related)
+        tagged = model.tags.through.objects.values_list(f'{kind}_id', 'tag_id')
+        if keys is not None:
+            tagged = tagged.filter(**{f'{kind}_id__in': [pk for item_kind, pk in items if item_kind == kind]})
+        for pk, tag in tagged:
+            if (kind, pk) in items:
+                items[kind, pk].tags.add(tag)
+    return items
+
+
+def weigh(counts, frequency, documents):
+    """Unit-length TF-IDF vector of the term ``counts`` of one item:
+    smoothed IDF, log-scaled term frequency."""
+    limit = max(1, MAX_DOCUMENT_FREQUENCY * documents)
+    weights = {
+        term: (1 + math.log(count)) * (math.log((1 + documents) / (1 + frequency[term])) + 1)
+        for term, count in counts.items() if frequency[term] <= limit
+    }
+    norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+    return {term: weight / norm for term, weight in weights.items()}
+
+
+def combine(key, cosine, tags, tag_sets):
+    """Blend cosines with the Jaccard index of the tags; ``tag_sets`` holds
+    the tags of every item sharing one with ``key``."""
+    scores = {other: (1 - TAG_WEIGHT) * value for other, value in cosine.items()}
+    for other, other_tags in tag_sets.items():
+        shared = len(tags & other_tags)
+        if shared:
+            scores[other] = scores.get(other, 0.0) + TAG_WEIGHT * shared / len(tags | other_tags)
+    scores.pop(key, None)
+    return scores
+
+
+class SimilarityIndex:
+    def __init__(self, items):
+        self.items = items
+        documents = len(items)
+        frequency = Counter(term for item in items.values() for term in item.terms)
+        self.vectors = {}
+        self.postings = defaultdict(list)
+        for key, item in items.items():
+            vector = self.vectors[key] = weigh(item.terms, frequency, documents)
+            for term, weight in vector.items():
+                self.postings[term].append((key, weight))
+        self.tagged = defaultdict(list)
+        for key, item in items.items():
+            for tag in item.tags:
+                self.tagged[tag].append(key)
+
+    def scores(self, key):
+        """Similarity of ``key`` to every item it shares a term or tag with."""
+        cosine = defaultdict(float)
+        for term, weight in self.vectors[key].items():
+            for other, other_weight in self.postings[term]:
+                cosine[other] += weight * other_weight
+        tags = self.items[key].tags
+        sharing = {other for tag in tags for other in self.tagged[tag]}
+        return combine(key, cosine, tags, {other: self.items[other].tags for other in sharing})
+
+    def neighbours(self, key):
+        return nlargest(TOP_K, self.scores(key).items(), key=itemgetter(1))
+
+
+# -----------------
+# STORED INDEX
+# -----------------
+def postings(key, item, vector):
+    # Every term, so that the stored rows also count document frequencies.
+    return [
+        TermPosting(term=term, kind=key[0], object_id=key[1], weight=vector.get(term, 0.0)) for term in item.terms
+    ]
+
+
+def stored_vector(key):
+    return dict(TermPosting.objects.filter(kind=key[0], object_id=key[1], weight__gt=0).values_list('term', 'weight'))
+
+
+def stored_scores(key, vector, tags):
+    """Same as SimilarityIndex.scores(), from the stored postings."""
+    cosine = defaultdict(float)
+    rows = TermPosting.objects.filter(term__in=list(vector), weight__gt=0).values_list('term', 'kind', 'object_id', 'weight')
+    for term, kind, pk, weight in rows:
+        cosine[kind, pk] += vector[term] * weight
+    tag_sets = defaultdict(set)
+    if tags:
+        for kind, (model, filters, _, _) in KINDS.items():
+            sharing = model.objects.filter(**filters, tags__in=tags).values('pk')
+            for pk, tag in model.tags.through.objects.filter(**{f'{kind}_id__in': sharing}).values_list(f'{kind}_id', 'tag_id'):
+                tag_sets[kind, pk].add(tag)
+    return combine(key, cosine, tags, tag_sets)
+
+
+def current_lists(keys):
+    """source -> [(target, score)] as stored, best first."""
+    lists = defaultdict(list)
+    sources = Q(pk__in=[])
+    for kind in KINDS:
+        pks = [pk for source_kind, pk in keys if source_kind == kind]
+        if pks:
+            sources |= Q(source_kind=kind, source_id__in=pks)
+    rows = Recommendation.objects.filter(sources).order_by('-score').values_list(
+        'source_kind', 'source_id', 'target_kind', 'target_id', 'score',
+    )
+    for source_kind, source_id, target_kind, target_id, score in rows:
+        lists[source_kind, source_id].append(((target_kind, target_id), score))
+    return lists
+
+
+def store(lists, items):
+    """
+    Write the neighbour ``lists`` (key -> [(other, score)]) as rows, and as
+    ``related`` columns where they changed. ``items`` holds every item
+    involved. Returns the number of items whose list changed.
+    """
+    rows, changed = [], defaultdict(dict)
+    for key, neighbours in lists.items():
+        item = items.get(key)
+        rows += [
+            Recommendation(source_kind=key[0], source_id=key[1], target_kind=other[0], target_id=other[1], score=score)
+            for other, score in neighbours
+        ]
+        related = [items[other].summary(other[0]) for other, _ in neighbours]
+        if item is None or related != item.related:
+            changed[key[0]][key[1]] = related
+
+    sources = defaultdict(list)
+    for kind, pk in lists:
+        sources[kind].append(pk)
+    stale = Q(pk__in=[])
+    for kind, pks in sources.items():
+        stale |= Q(source_kind=kind, source_id__in=pks)
+    Recommendation.objects.filter(stale).delete()
+    Recommendation.objects.bulk_create(rows, batch_size=1000)
+
+    now = timezone.now()
+    for kind, related in changed.items():
+        model, _, _, paths = KINDS[kind]
+        objects = [model(pk=pk, related=value, updated_at=now) for pk, value in related.items()]
+        model.objects.bulk_update(objects, ['related', 'updated_at'], batch_size=500)
+        # bulk_update() sends no signals.
+        bump_version(model)
+        bump_named_version(*syndication.sections(kind, *related))
+        mark_dirty(paths(*(items[kind, pk].slug for pk in related if (kind, pk) in items)))
+    return sum(len(related) for related in changed.values())
+
+
+def rebuild():
+    """Recompute every item's neighbours. Returns (rows, changed items)."""
+    index = SimilarityIndex(load_items())
+    keys = set(index.items) | set(Recommendation.objects.values_list('source_kind', 'source_id').distinct())
+    changed = store({key: index.neighbours(key) if key in index.items else [] for key in keys}, index.items)
+    TermPosting.objects.all().delete()
+    TermPosting.objects.bulk_create(
+        [posting for key, item in index.items.items() for posting in postings(key, item, index.vectors[key])],
+        batch_size=5000,
+    )
+    return Recommendation.objects.count(), changed
+
+
+def refresh(kind, pk):
+    """Update the lists that an edit of ``(kind, pk)`` can change: its own,
+    those it is in, and those it now outscores the last entry of."""
+    if not TermPosting.objects.exists():
+        # Nothing to weigh against before the first rebuild.
+        return rebuild()[1]
+    key = (kind, pk)
+    item = load_items([key]).get(key)
+    TermPosting.objects.filter(kind=kind, object_id=pk).delete()
+    scores = {}
+    if item is not None:
+        frequency = Counter(dict(
+            TermPosting.objects.filter(term__in=list(item.terms)).values('term').annotate(
+                documents=Count('pk'),
+            ).values_list('term', 'documents')
+        ))
+        frequency.update(item.terms.keys())
+        documents = sum(model.objects.filter(**filters).count() for model, filters, _, _ in KINDS.values())
+        vector = weigh(item.terms, frequency, documents)
+        TermPosting.objects.bulk_create(postings(key, item, vector), batch_size=5000)
+        scores = stored_scores(key, vector, item.tags)
+
+    floors = {
+        (row['source_kind'], row['source_id']): (row['count'], row['lowest'])
+        for row in Recommendation.objects.values('source_kind', 'source_id').annotate(
+            count=Count('pk'), lowest=Min('score'),
+        )
+    }
+    listing = set(Recommendation.objects.filter(target_kind=kind, target_id=pk).values_list('source_kind', 'source_id'))
+    entered = {
+        other for other, score in scores.items()
+        if floors.get(other, (0, 0.0))[0] < TOP_K or score > floors[other][1]
+    }
+    lists = {key: nlargest(TOP_K, scores.items(), key=itemgetter(1))}
+    rescore = []
+    stored = current_lists((listing | entered) - {key})
+    for other in (listing | entered) - {key}:
+        neighbours = [(target, score) for target, score in stored[other] if target != key]
+        if other in scores:
+            neighbours.append((key, scores[other]))
+        merged = nlargest(TOP_K, neighbours, key=itemgetter(1))
+        if other in listing and key not in dict(merged) and len(stored[other]) >= TOP_K:
+            # Its next best item may be one it doesn't list yet.
+            rescore.append(other)
+        else:
+            lists[other] = merged
+    if rescore:
+        tags = {other: other_item.tags for other, other_item in load_items(rescore, texts=False).items()}
+        for other in rescore:
+            lists[other] = nlargest(
+                TOP_K, stored_scores(other, stored_vector(other), tags.get(other, set())).items(), key=itemgetter(1),
+            )
+
+    involved = set(lists) | {other for neighbours in lists.values() for other, _ in neighbours}
+    items = load_items(involved, texts=False)
+    if item is not None:
+        items[key] = item
+    # Stored lists can still name items unpublished since (their own refresh is queued).
+    return store({source: [(other, score) for other, score in neighbours if other in items]
+                  for source, neighbours in lists.items()}, items)
@@ -0,0 +1,45 @@
+"""
+JSONRenderer's output, encoded by orjson when it is installed.
+
+With the compact separators and ``ensure_ascii=False`` DRF uses, orjson
+writes the same bytes as ``json.dumps`` for strings, integers, booleans and
+nulls. Floats that Python writes with an exponent differ (``1e16`` against
+``1e+16``), so this renderer is only installed on views whose payloads hold
+no floats. Datetimes, decimals and lazy strings still go through DRF's
+encoder. Indented output (``Accept: application/json; indent=4``),
+non-default JSON settings and anything orjson rejects (integers over 64
+bits, lone surrogates) are rendered by JSONRenderer itself.
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+
+try:
+    import orjson
+except ImportError:  # optional: JSONRenderer is used without it
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None or data is None
+            or self.ensure_ascii or not self.compact or not self.strict
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            content = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Escaped like JSONRenderer does, to stay a strict JavaScript subset.
+        return content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+FAST_RENDERERS = [
+    FastJSONRenderer if renderer is JSONRenderer else renderer
+    for renderer in api_settings.DEFAULT_RENDERER_CLASSES
+]
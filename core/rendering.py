@@ -0,0 +1,158 @@
+"""
+Server-side rendering of the Markdown fields.
+
+Raw HTML in the source is escaped rather than passed through, link and
+image URLs are restricted to safe schemes, and TeX between ``$...$`` /
+``$$...$$`` is left untouched inside ``math-inline`` / ``math-display``
+elements for KaTeX to typeset on the client. Uploaded images with stored
+derivatives (core.images) become ``<picture>`` elements with a srcset per
+format.
+"""
+import html
+import re
+import xml.etree.ElementTree as etree
+
+import markdown
+from markdown.blockprocessors import BlockProcessor
+from markdown.extensions import Extension
+from markdown.extensions.toc import slugify_unicode
+from markdown.inlinepatterns import InlineProcessor
+from markdown.treeprocessors import Treeprocessor
+from markdown.util import AtomicString
+
+from .text import reading_time
+
+SAFE_URL_SCHEMES = ('http', 'https', 'mailto')
+_SCHEME = re.compile(r'^([a-zA-Z][a-zA-Z0-9+.-]*):')
+# Browsers ignore these inside a URL's scheme.
+_IGNORED_IN_SCHEME = re.compile(r'[\x00-\x20\x7f]+')
+_IMAGE = re.compile(r'!\[[^\]]*\]\(\s*<?([^)\s>]+)')
+
+
+class InlineMathProcessor(InlineProcessor):
+    def handleMatch(self, m, data):
+        el = etree.Element('span', {'class': 'math-inline'})
+        el.text = AtomicString(m.group(1))
+        return el, m.start(0), m.end(0)
+
+
+class BlockMathProcessor(BlockProcessor):
+    START = re.compile(r'^\s*\$\$')
+
+    def test(self, parent, block):
+        return bool(self.START.match(block))
+
+    def run(self, parent, blocks):
+        # Collect blocks until the closing $$ (which may be several paragraphs away).
+        collected = []
+        while blocks:
+            collected.append(blocks.pop(0))
+            joined = '\n\n'.join(collected).strip()
+            if len(joined) > 2 and joined.endswith('$$'):
+                break
+        source = '\n\n'.join(collected).strip()
+        el = etree.SubElement(parent, 'div', {'class': 'math-display'})
+        el.text = AtomicString(source.removeprefix('$$').removesuffix('$$').strip())
+        return True
+
+
+def is_safe_url(value):
+    """Relative URLs and SAFE_URL_SCHEMES only, judged the way a browser
+    reads the attribute (entities decoded, whitespace and controls dropped)."""
+    scheme = _SCHEME.match(_IGNORED_IN_SCHEME.sub('', html.unescape(value)))
+    return scheme is None or scheme.group(1).lower() in SAFE_URL_SCHEMES
+
+
+class SafeUrlTreeprocessor(Treeprocessor):
+    def run(self, root):
+        for el in root.iter():
+            for attr in ('href', 'src'):
+                value = el.get(attr)
+                if value is None:
+                    continue
+                if not is_safe_url(value):
+                    del el.attrib[attr]
+
+
+class ResponsiveImageTreeprocessor(Treeprocessor):
+    def __init__(self, md, images):
+        super().__init__(md)
+        self.images = images
+
+    def run(self, root):
+        for parent in list(root.iter()):
+            for index, el in enumerate(list(parent)):
+                variants = self.images.get(el.get('src')) if el.tag == 'img' else None
+                if not variants:
+                    continue
+                picture = etree.Element('picture')
+                for fmt, files in variants['sources'].items():
+                    etree.SubElement(picture, 'source', {
+                        'type': f'image/{fmt}',
+                        'srcset': ', '.join(f"{file['url']} {file['width']}w" for file in files),
+                    })
+                el.set('width', str(variants['width']))
+                el.set('height', str(variants['height']))
+                el.set('loading', 'lazy')
+                el.set('decoding', 'async')
+                picture.tail, el.tail = el.tail, None
+                parent.remove(el)
+                picture.append(el)
+                parent.insert(index, picture)
+
+
+class SafeMarkdownExtension(Extension):
+    def extendMarkdown(self, md):
+        # Without these two, raw HTML is escaped like any other text.
+        md.preprocessors.deregister('html_block')
+        md.inlinePatterns.deregister('html')
+        md.inlinePatterns.register(InlineMathProcessor(r'(?<![\\$])\$([^$\n]+?)\$(?!\$)', md), 'math_inline', 185)
+        md.parser.blockprocessors.register(BlockMathProcessor(md.parser), 'math_display', 105)
+        md.treeprocessors.register(SafeUrlTreeprocessor(md), 'safe_urls', 0)
+
+
+def image_urls(*texts):
+    return {url for text in texts if text for url in _IMAGE.findall(text)}
+
+
+def _markdown(images=None):
+    md = markdown.Markdown(
+        extensions=[
+            SafeMarkdownExtension(),
+            'fenced_code',
+            'tables',
+            'footnotes',
+            'def_list',
+            'sane_lists',
+            'toc',
+        ],
+        extension_configs={'toc': {'slugify': slugify_unicode}},
+    )
+    if images:
+        # After safe_urls, so only vetted src values are matched.
+        md.treeprocessors.register(ResponsiveImageTreeprocessor(md, images), 'responsive_images', -1)
+    return md
+
+
+def _toc(tokens):
+    return [
+        {'level': token['level'], 'id': token['id'], 'title': token['name'], 'children': _toc(token['children'])}
+        for token in tokens
+    ]
+
+
+def render_markdown(text, images=None):
+    """
+    Render ``text`` once and return everything the API exposes for it:
+    ``html`` (with heading anchors), ``toc``, ``word_count`` and
+    ``reading_time``. ``images`` maps image URLs to their stored variants.
+    """
+    md = _markdown(images)
+    html = md.convert(text or '')
+    words = len((text or '').split())
+    return {
+        'html': html,
+        'toc': _toc(md.toc_tokens),
+        'word_count': words,
+        'reading_time': reading_time(words),
+    }
@@ -0,0 +1,63 @@
+"""
+Sends the reads of public GET endpoints to the ``replica`` database alias
+when one is configured (DATABASE_REPLICA_URL). Everything else, including
+all writes, uses the primary.
+
+A response built from a lagging replica would be cached under the new
+version stamps, so for DATABASE_REPLICA_LAG seconds after any change
+(core.cache.bump_version) reads stay on the primary as well.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from .cache import RECENT_WRITE_KEY, get_cache
+
+REPLICA_ALIAS = 'replica'
+# django.core.cache.backends.db.DatabaseCache's model
+CACHE_APP_LABEL = 'django_cache'
+
+_read_alias = ContextVar('read_alias', default=None)
+
+
+def replica_available():
+    return REPLICA_ALIAS in connections and not get_cache().get(RECENT_WRITE_KEY)
+
+
+@contextmanager
+def replica_reads():
+    token = _read_alias.set(REPLICA_ALIAS)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        # The database cache (version stamps) must never lag behind.
+        if model._meta.app_label == CACHE_APP_LABEL:
+            return DEFAULT_DB_ALIAS
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        # Explicit, or rows loaded from the replica would be saved back to it.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Replicas get their schema through replication.
+        return db != REPLICA_ALIAS
+
+
+class ReplicaReadMixin:
+    """For public List/Retrieve views: GET and HEAD read from the replica."""
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or not replica_available():
+            return super().dispatch(request, *args, **kwargs)
+        with replica_reads():
+            return super().dispatch(request, *args, **kwargs)
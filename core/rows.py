@@ -0,0 +1,200 @@
+"""
+List responses built from ``.values()`` rows instead of model instances.
+
+Most of the Python time of a list request goes to building one model
+instance per row and walking a DRF serializer's fields for each. A
+RowSerializer takes the view's serializer, after ``?fields=`` has pruned it,
+and compiles each field once per request into a function of a row:
+
+- model columns and annotations are read as they are, or passed through
+  the field's ``to_representation()`` when that is not a no-op;
+- translated fields take the first meaningful value among the active
+  language's column and its fallbacks, as modeltranslation's descriptors do;
+- files become (absolute) URLs, as DRF's FileField returns them;
+- nested many-to-many serializers (the tags) are read with one query per
+  list, shaped like the prefetch query so that they come back in the same
+  order;
+- SerializerMethodField getters are called with the row, which reads as
+  attributes too; ``@reads(...)`` declares the columns they use.
+
+The output is the serializer's own for the same rows; core/tests.py checks
+the rendered bytes in every language. A field that cannot be compiled
+raises ImproperlyConfigured rather than being left out.
+"""
+from collections import defaultdict
+from operator import itemgetter
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models.query import ValuesIterable
+from modeltranslation.fields import NONE
+from modeltranslation.thread_context import fallbacks_enabled
+from modeltranslation.translator import NotRegistered, translator
+from modeltranslation.utils import build_localized_fieldname, get_language, resolution_order
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .renderers import FAST_RENDERERS
+
+# Their to_representation() returns database values unchanged.
+PLAIN_FIELDS = (serializers.CharField, serializers.IntegerField, serializers.BooleanField)
+
+
+def reads(*columns):
+    """Declares the columns a SerializerMethodField getter reads."""
+    def decorator(method):
+        method.row_columns = columns
+        return method
+    return decorator
+
+
+class Row(dict):
+    """A ``.values()`` row that also reads as attributes, for getters and
+    pagination cursors."""
+    __slots__ = ()
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+
+class RowIterable(ValuesIterable):
+    def __iter__(self):
+        return map(Row, super().__iter__())
+
+
+class RowSerializer:
+    def __init__(self, serializer):
+        self.serializer = serializer
+        self.model = serializer.Meta.model
+        try:
+            self.translated = translator.get_options_for_model(self.model).all_fields
+        except NotRegistered:
+            self.translated = {}
+        self.columns = {'pk': None}  # ordered set
+        self.relations = []  # (many-to-many field, child RowSerializer)
+        self.readers = [(field.field_name, self.compile(field)) for field in serializer._readable_fields]
+
+    def unsupported(self, field):
+        return ImproperlyConfigured(
+            f'{type(self.serializer).__name__}.{field.field_name} ({type(field).__name__}) cannot be read from rows.'
+        )
+
+    def compile(self, field):
+        if isinstance(field, serializers.SerializerMethodField):
+            method = getattr(self.serializer, field.method_name)
+            self.columns.update(dict.fromkeys(getattr(method, 'row_columns', ())))
+            return method
+        source = field.source
+        if source == '*' or '.' in source:
+            raise self.unsupported(field)
+        if isinstance(field, serializers.ListSerializer):
+            relation = self.model._meta.get_field(source)
+            if not relation.many_to_many or not isinstance(field.child, serializers.ModelSerializer):
+                raise self.unsupported(field)
+            self.relations.append((relation, RowSerializer(field.child)))
+            return itemgetter(source)
+        if isinstance(field, (serializers.BaseSerializer, serializers.RelatedField)):
+            raise self.unsupported(field)
+        if isinstance(field, serializers.FileField):
+            if source in self.translated:
+                raise self.unsupported(field)
+            return self.file_reader(field)
+
+        value = self.translation_reader(source) if source in self.translated else self.column_reader(source)
+        if isinstance(field, PLAIN_FIELDS):
+            return value
+        represent = field.to_representation
+
+        def read(row):
+            # Like Serializer.to_representation(): None skips the field.
+            data = value(row)
+            return None if data is None else represent(data)
+        return read
+
+    def column_reader(self, column):
+        self.columns[column] = None
+        return itemgetter(column)
+
+    def translation_reader(self, name):
+        descriptor = getattr(self.model, name)
+        columns = [
+            build_localized_fieldname(name, lang)
+            for lang in resolution_order(get_language(), descriptor.fallback_languages)
+        ]
+        self.columns.update(dict.fromkeys(columns))
+        default = descriptor.field.get_default()
+        undefined = default if descriptor.fallback_undefined is NONE else descriptor.fallback_undefined
+        if fallbacks_enabled() and descriptor.fallback_value is not NONE:
+            default = descriptor.fallback_value
+
+        def read(row):
+            for column in columns:
+                value = row[column]
+                if value is not None and value != undefined:
+                    return value
+            return default
+        return read
+
+    def file_reader(self, field):
+        name_of = self.column_reader(field.source)
+        storage = self.model._meta.get_field(field.source).storage
+        if not getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL):
+            return lambda row: name_of(row) or None
+        request = field.context.get('request')
+        absolute = request.build_absolute_uri if request is not None else str
+
+        def read(row):
+            name = name_of(row)
+            return absolute(storage.url(name)) if name else None
+        return read
+
+    def values(self, queryset, *extra):
+        """``queryset`` yielding Rows with the columns the fields read."""
+        clone = queryset.prefetch_related(None)
+        if clone.query.group_by is True:
+            # values() would group an aggregate annotation by every column of
+            # the table; by the primary key, the selected ones are added.
+            clone.query.group_by = (self.model._meta.pk.get_col(clone.query.get_initial_alias()),)
+        clone = clone.values(*self.columns, *extra)
+        clone._iterable_class = RowIterable
+        return clone
+
+    def to_representation(self, rows, using=None):
+        rows = list(rows)
+        if rows:
+            for relation, child in self.relations:
+                self.attach(rows, relation, child, using)
+        readers = self.readers
+        return [{name: read(row) for name, read in readers} for row in rows]
+
+    def attach(self, rows, relation, child, using):
+        # The same join and filter as prefetch_related(relation.name).
+        owner = relation.related_query_name()
+        related = relation.related_model._default_manager.db_manager(using).filter(
+            **{f'{owner}__in': [row['pk'] for row in rows]}
+        )
+        related_rows = list(child.values(related, owner))
+        items = defaultdict(list)
+        for item, data in zip(related_rows, child.to_representation(related_rows, using)):
+            items[item[owner]].append(data)
+        for row in rows:
+            row[relation.name] = items.get(row['pk'], [])
+
+
+class RowListMixin:
+    """For generic list views: list() serializes ``.values()`` rows through
+    a RowSerializer and renders them with FastJSONRenderer. ``row_columns``
+    are extra columns the pagination cursor reads."""
+    renderer_classes = FAST_RENDERERS
+    row_columns = ()
+
+    def list(self, request, *args, **kwargs):
+        rows = RowSerializer(self.get_serializer())
+        queryset = rows.values(self.filter_queryset(self.get_queryset()), *self.row_columns)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(rows.to_representation(page, queryset.db))
+        return Response(rows.to_representation(queryset, queryset.db))
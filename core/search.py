@@ -0,0 +1,344 @@
+"""
+Full-text search over the translated columns of posts and projects.
+
+PostgreSQL uses GIN expression indexes over ``to_tsvector`` of each
+language's columns, with that language's text search configuration for
+stemming. SQLite uses one FTS5 table per model, kept in sync by triggers,
+with the porter stemmer (English only). Both are created by migration 0009
+and re-checked after every ``migrate``: rebuilding a SQLite table drops its
+triggers, in which case the FTS table is rebuilt as well.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Count, Q
+from django.utils.html import escape
+from modeltranslation.utils import build_localized_fieldname, resolution_order
+
+from .i18n import active_translations
+from .models import Tag, Project, Post
+
+# Text search configuration used for stemming each language on PostgreSQL.
+POSTGRES_CONFIGS = {
+    'en': 'english',
+    'fr': 'french',
+    'ar': 'arabic',
+}
+LANGUAGES = tuple(POSTGRES_CONFIGS)
+
+# kind -> (model, title field, body fields)
+DOCUMENTS = {
+    'post': (Post, 'title', ('content',)),
+    'project': (Project, 'title', ('short_description', 'full_description')),
+}
+
+MAX_MATCHES = 1000
+SNIPPET_WORDS = 24
+
+# Highlight markers are swapped for <mark> tags after escaping the text.
+START, STOP = '\x02', '\x03'
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+
+
+def _columns(kind, lang):
+    _, title, body = DOCUMENTS[kind]
+    return (
+        build_localized_fieldname(title, lang),
+        [build_localized_fieldname(field, lang) for field in body],
+    )
+
+
+def _mark(text):
+    return escape(text or '').replace(START, '<mark>').replace(STOP, '</mark>')
+
+
+# -----------------
+# PostgreSQL
+# -----------------
+def postgres_document(kind, lang):
+    config = POSTGRES_CONFIGS[lang]
+    title, body = _columns(kind, lang)
+    body_sql = " || ' ' || ".join(f"coalesce({column}, '')" for column in body)
+    return (
+        f"setweight(to_tsvector('{config}', coalesce({title}, '')), 'A') || "
+        f"setweight(to_tsvector('{config}', {body_sql}), 'B')"
+    )
+
+
+def _install_postgres(cursor):
+    for kind, (model, _, _) in DOCUMENTS.items():
+        table = model._meta.db_table
+        for lang in LANGUAGES:
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {table}_search_{lang} '
+                f'ON {table} USING gin (({postgres_document(kind, lang)}))'
+            )
+
+
+def _uninstall_postgres(cursor):
+    for model, _, _ in DOCUMENTS.values():
+        for lang in LANGUAGES:
+            cursor.execute(f'DROP INDEX IF EXISTS {model._meta.db_table}_search_{lang}')
+
+
+def _match_postgres(kind, query, languages):
+    model = DOCUMENTS[kind][0]
+    conditions, ranks, params = [], [], []
+    for lang in languages:
+        document = postgres_document(kind, lang)
+        conditions.append(f"({document}) @@ websearch_to_tsquery('{POSTGRES_CONFIGS[lang]}', %s)")
+        ranks.append(f"ts_rank({document}, websearch_to_tsquery('{POSTGRES_CONFIGS[lang]}', %s))")
+        params.append(query)
+    sql = (
+        f"SELECT id, greatest({', '.join(ranks)}) AS rank FROM {model._meta.db_table} "
+        f"WHERE {' OR '.join(conditions)} ORDER BY rank DESC LIMIT {MAX_MATCHES}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params + params)
+        return cursor.fetchall()
+
+
+def _highlight_postgres(kind, query, languages, ids):
+    model = DOCUMENTS[kind][0]
+    title_options = f'StartSel={START}, StopSel={STOP}, HighlightAll=TRUE'
+    body_options = f'StartSel={START}, StopSel={STOP}, MaxWords={SNIPPET_WORDS}, MinWords=8, MaxFragments=2'
+    selects, params = [], []
+    for lang in languages:
+        config = POSTGRES_CONFIGS[lang]
+        title, body = _columns(kind, lang)
+        body_sql = " || ' ' || ".join(f"coalesce({column}, '')" for column in body)
+        selects.append(
+            f"ts_headline('{config}', coalesce({title}, ''), websearch_to_tsquery('{config}', %s), %s)"
+        )
+        selects.append(f"ts_headline('{config}', {body_sql}, websearch_to_tsquery('{config}', %s), %s)")
+        params += [query, title_options, query, body_options]
+    placeholders = ', '.join(['%s'] * len(ids))
+    sql = f"SELECT id, {', '.join(selects)} FROM {model._meta.db_table} WHERE id IN ({placeholders})"
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params + list(ids))
+        return cursor.fetchall()
+
+
+# -----------------
+# SQLite (FTS5)
+# -----------------
+def _fts_table(kind):
+    return f'{DOCUMENTS[kind][0]._meta.db_table}_fts'
+
+
+def _fts_columns(kind):
+    columns = []
+    for lang in LANGUAGES:
+        title, body = _columns(kind, lang)
+        columns += [title, *body]
+    return columns
+
+
+def _install_sqlite(cursor):
+    for kind, (model, _, _) in DOCUMENTS.items():
+        table, fts = model._meta.db_table, _fts_table(kind)
+        columns = _fts_columns(kind)
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = %s", [table])
+        triggers = {row[0] for row in cursor.fetchall()}
+        if {f'{fts}_ai', f'{fts}_ad', f'{fts}_au'} <= triggers:
+            continue
+
+        names = ', '.join(columns)
+        new = ', '.join(f'new.{column}' for column in columns)
+        old = ', '.join(f'old.{column}' for column in columns)
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({names}, content='{table}', "
+            f"content_rowid='id', tokenize='porter unicode61 remove_diacritics 2')"
+        )
+        cursor.execute(
+            f'CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN '
+            f'INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new}); END'
+        )
+        cursor.execute(
+            f'CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN '
+            f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old}); END"
+        )
+        cursor.execute(
+            f'CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {table} BEGIN '
+            f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old}); "
+            f'INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new}); END'
+        )
+        cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def _uninstall_sqlite(cursor):
+    for kind in DOCUMENTS:
+        fts = _fts_table(kind)
+        for suffix in ('ai', 'ad', 'au'):
+            cursor.execute(f'DROP TRIGGER IF EXISTS {fts}_{suffix}')
+        cursor.execute(f'DROP TABLE IF EXISTS {fts}')
+
+
+def _fts_query(kind, query, languages):
+    tokens = _TOKEN.findall(query)
+    if not tokens:
+        return None
+    columns = []
+    for lang in languages:
+        title, body = _columns(kind, lang)
+        columns += [title, *body]
+    terms = ' '.join(f'"{token}"*' for token in tokens)
+    return f"{{{' '.join(columns)}}}: ({terms})"
+
+
+def _match_sqlite(kind, query, languages):
+    match = _fts_query(kind, query, languages)
+    if match is None:
+        return []
+    fts = _fts_table(kind)
+    titles = {_columns(kind, lang)[0] for lang in LANGUAGES}
+    # Same A/B weighting as PostgreSQL: titles count ten times the body.
+    weights = ', '.join('10.0' if column in titles else '1.0' for column in _fts_columns(kind))
+    with connection.cursor() as cursor:
+        # bm25() is lower-is-better; negate it so scores sort like ts_rank.
+        cursor.execute(
+            f'SELECT rowid, -bm25({fts}, {weights}) AS score FROM {fts} WHERE {fts} MATCH %s '
+            f'ORDER BY score DESC LIMIT {MAX_MATCHES}',
+            [match],
+        )
+        return cursor.fetchall()
+
+
+def _highlight_sqlite(kind, query, languages, ids):
+    match = _fts_query(kind, query, languages)
+    fts = _fts_table(kind)
+    all_columns = _fts_columns(kind)
+    selects, params = [], []
+    for lang in languages:
+        title, body = _columns(kind, lang)
+        selects.append(f'highlight({fts}, {all_columns.index(title)}, %s, %s)')
+        selects.append(f'snippet({fts}, {all_columns.index(body[-1])}, %s, %s, %s, {SNIPPET_WORDS})')
+        params += [START, STOP, START, STOP, '…']
+    placeholders = ', '.join(['%s'] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid, {', '.join(selects)} FROM {fts} "
+            f"WHERE {fts} MATCH %s AND rowid IN ({placeholders})",
+            [*params, match, *ids],
+        )
+        return cursor.fetchall()
+
+
+# -----------------
+# Public API
+# -----------------
+def install_search_index(conn=connection):
+    """Create the vendor-specific index structures if they are missing."""
+    tables = conn.introspection.table_names()
+    if not all(model._meta.db_table in tables for model, _, _ in DOCUMENTS.values()):
+        return
+    with conn.cursor() as cursor:
+        if conn.vendor == 'postgresql':
+            _install_postgres(cursor)
+        elif conn.vendor == 'sqlite':
+            _install_sqlite(cursor)
+
+
+def uninstall_search_index(conn=connection):
+    with conn.cursor() as cursor:
+        if conn.vendor == 'postgresql':
+            _uninstall_postgres(cursor)
+        elif conn.vendor == 'sqlite':
+            _uninstall_sqlite(cursor)
+
+
+def _match(kind, query, languages):
+    if connection.vendor == 'postgresql':
+        return _match_postgres(kind, query, languages)
+    return _match_sqlite(kind, query, languages)
+
+
+def _highlight(kind, query, languages, ids):
+    if not ids:
+        return {}
+    if connection.vendor == 'postgresql':
+        rows = _highlight_postgres(kind, query, languages, ids)
+    else:
+        rows = _highlight_sqlite(kind, query, languages, ids)
+    highlights = {}
+    for row in rows:
+        pairs = list(zip(row[1::2], row[2::2]))
+        # Follow the translation fallback order: first language with a title.
+        title, snippet = next(((t, s) for t, s in pairs if t), pairs[0])
+        highlights[row[0]] = {'title': _mark(title), 'snippet': _mark(snippet)}
+    return highlights
+
+
+def search(query, language, kinds=tuple(DOCUMENTS), tag=None, category=None, limit=20):
+    """
+    Ranked, highlighted matches for ``query`` in ``language`` (falling back
+    like modeltranslation does), plus tag, category and type facets computed
+    over every match before the ``tag``/``category`` filters are applied.
+    """
+    languages = resolution_order(language)
+    hits, facet_ids = [], {}
+    for kind in kinds:
+        matches = _match(kind, query, languages)
+        model = DOCUMENTS[kind][0]
+        queryset = model._default_manager.filter(pk__in=[pk for pk, _ in matches])
+        if model is Post:
+            queryset = queryset.filter(is_active=True)
+        facet_ids[kind] = set(queryset.values_list('pk', flat=True))
+        if tag:
+            queryset = queryset.filter(tags__slug=tag)
+        if category:
+            queryset = queryset.filter(category=category) if model is Project else queryset.none()
+        allowed = set(queryset.values_list('pk', flat=True))
+        hits += [(rank, kind, pk) for pk, rank in matches if pk in allowed]
+
+    hits.sort(key=lambda hit: hit[0], reverse=True)
+    page = hits[:limit]
+
+    results = []
+    for kind in kinds:
+        ids = [pk for _, hit_kind, pk in page if hit_kind == kind]
+        if not ids:
+            continue
+        highlights = _highlight(kind, query, languages, ids)
+        objects = active_translations(DOCUMENTS[kind][0]._default_manager.prefetch_related('tags')).in_bulk(ids)
+        for rank, hit_kind, pk in page:
+            if hit_kind != kind:
+                continue
+            obj = objects[pk]
+            results.append({
+                'type': kind,
+                'id': pk,
+                'slug': obj.slug,
+                'title': obj.title,
+                'category': getattr(obj, 'category', None),
+                'tags': [{'name': t.name, 'slug': t.slug} for t in obj.tags.all()],
+                'rank': round(float(rank), 6),
+                'highlight': highlights.get(pk, {'title': escape(obj.title), 'snippet': ''}),
+            })
+    results.sort(key=lambda result: result['rank'], reverse=True)
+
+    tags = (
+        Tag.objects
+        .annotate(
+            count=Count('posts', filter=Q(posts__in=facet_ids.get('post', ())), distinct=True)
+            + Count('projects', filter=Q(projects__in=facet_ids.get('project', ())), distinct=True)
+        )
+        .filter(count__gt=0)
+        .order_by('-count', 'name')
+        .values('slug', 'name', 'count')
+    )
+    categories = (
+        Project.objects.filter(pk__in=facet_ids.get('project', ()))
+        .values('category').annotate(count=Count('pk')).order_by('-count', 'category')
+    )
+    return {
+        'query': query,
+        'count': len(hits),
+        'results': results,
+        'facets': {
+            'types': {kind: len(ids) for kind, ids in facet_ids.items()},
+            'tags': list(tags),
+            'categories': list(categories),
+        },
+    }
+
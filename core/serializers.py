@@ -1,18 +1,92 @@
+from django.urls import reverse
+from modeltranslation.utils import get_language, resolution_order
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.utils.urls import replace_query_param
+
+from . import images
 from .models import Tag, Skill, Project, Post, Comment, ContactMessage, TimelineEvent
+from .pagination import CommentPagination, encode_cursor
+from .rows import reads
+from .text import markdown_excerpt
+
+class SparseFieldsetMixin:
+    """Restricts the output of reads to the comma-separated ``?fields=``
+    query parameter. ``optional_fields`` are only included when it names
+    them. Writes keep every field so validation sees the whole input."""
+    optional_fields = ()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is not None and request.method not in SAFE_METHODS:
+            return
+        requested = request.query_params.get('fields') if request is not None else None
+        if requested:
+            allowed = {name.strip() for name in requested.split(',')}
+        else:
+            allowed = set(self.fields) - set(self.optional_fields)
+        for name in set(self.fields) - allowed:
+            self.fields.pop(name)
+
+class ImageVariantsField(serializers.Field):
+    """Stored image derivatives as ``{width, height, placeholder, sources}``,
+    with one ``srcset`` per format; null until they have been generated."""
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
 
-class TagSerializer(serializers.ModelSerializer):
+    def to_representation(self, value):
+        request = self.context.get('request')
+        return images.srcset(value, request.build_absolute_uri if request is not None else str)
+
+class RelatedItemsField(serializers.Field):
+    """Precomputed related posts and projects (see core/recommendations.py)
+    as ``{kind, slug, title}``, titled in the active language."""
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        languages = resolution_order(get_language())
+        return [
+            {
+                'kind': item['kind'],
+                'slug': item['slug'],
+                'title': next((item['title'][lang] for lang in languages if item['title'].get(lang)), ''),
+            }
+            for item in value
+        ]
+
+class TagSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Tag
         fields = ['id', 'name', 'slug']
 
-class SkillSerializer(serializers.ModelSerializer):
+class TagCountSerializer(TagSerializer):
+    # Annotated by Tag.objects.with_counts()
+    post_count = serializers.IntegerField(read_only=True)
+    project_count = serializers.IntegerField(read_only=True)
+
+    class Meta(TagSerializer.Meta):
+        fields = TagSerializer.Meta.fields + ['post_count', 'project_count']
+
+class SkillSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    logo_image = ImageVariantsField(source='logo_variants')
+
     class Meta:
         model = Skill
-        fields = ['id', 'name', 'logo', 'is_key_skill', 'category']
+        fields = ['id', 'name', 'logo', 'logo_image', 'is_key_skill', 'category']
 
-class ProjectSerializer(serializers.ModelSerializer):
+class ProjectSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    # The page renders full_description_html; the Markdown source is opt-in.
+    optional_fields = ('full_description',)
     tags = TagSerializer(many=True, read_only=True)
+    toc = serializers.JSONField(source='full_description_toc', read_only=True)
+    thumbnail_image = ImageVariantsField(source='thumbnail_variants')
+    related = RelatedItemsField()
 
     class Meta:
         model = Project
@@ -22,25 +96,57 @@ class ProjectSerializer(serializers.ModelSerializer):
             'slug', 
             'short_description', 
             'full_description', 
+            'full_description_html',
+            'toc',
+            'word_count',
+            'reading_time',
             'thumbnail', 
+            'thumbnail_image',
             'repo_link', 
             'demo_link', 
             'tags', 
             'is_featured', 
             'category',
+            'created_at',
+            'related'
+        ]
+
+class ProjectSummarySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    tags = TagSerializer(many=True, read_only=True)
+    thumbnail_image = ImageVariantsField(source='thumbnail_variants')
+
+    class Meta:
+        model = Project
+        fields = [
+            'id',
+            'title',
+            'slug',
+            'short_description',
+            'thumbnail',
+            'thumbnail_image',
+            'repo_link',
+            'demo_link',
+            'tags',
+            'is_featured',
+            'category',
             'created_at'
         ]
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = ['id', 'post', 'author_name', 'body', 'created_at']
         read_only_fields = ['created_at']
 
-class PostSerializer(serializers.ModelSerializer):
+class PostSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    # The page renders content_html; the Markdown source is opt-in.
+    optional_fields = ('content',)
     tags = TagSerializer(many=True, read_only=True)
+    toc = serializers.JSONField(source='content_toc', read_only=True)
     comment_count = serializers.SerializerMethodField()
     comments = serializers.SerializerMethodField()
+    comments_next = serializers.SerializerMethodField()
+    related = RelatedItemsField()
 
     class Meta:
         model = Post
@@ -49,19 +155,68 @@ class PostSerializer(serializers.ModelSerializer):
             'title', 
             'slug', 
             'content', 
+            'content_html',
+            'toc',
+            'word_count',
+            'reading_time',
             'tags', 
             'is_active', 
             'created_at',
             'comment_count',
-            'comments'
+            'comments',
+            'comments_next',
+            'related'
         ]
 
+    # Views annotate/prefetch these via Post.objects.with_approved_comments();
+    # the fallbacks keep the serializer usable on plain instances.
     def get_comment_count(self, obj):
+        if hasattr(obj, 'approved_comment_count'):
+            return obj.approved_comment_count
         return obj.comments.filter(is_approved=True).count()
 
+    def _first_comments(self, obj):
+        # Only the newest page is embedded; the rest lives at comments_next.
+        if hasattr(obj, 'approved_comments'):
+            return obj.approved_comments[:CommentPagination.page_size]
+        comments = obj.comments.filter(is_approved=True).order_by('-created_at', '-id')
+        return list(comments[:CommentPagination.page_size])
+
     def get_comments(self, obj):
-        comments = obj.comments.filter(is_approved=True).order_by('-created_at')
-        return CommentSerializer(comments, many=True).data
+        return CommentSerializer(self._first_comments(obj), many=True).data
+
+    def get_comments_next(self, obj):
+        comments = self._first_comments(obj)
+        if self.get_comment_count(obj) <= len(comments):
+            return None
+        url = reverse('post-comment-list', args=[obj.slug])
+        request = self.context.get('request')
+        if request is not None:
+            url = request.build_absolute_uri(url)
+        return replace_query_param(url, CommentPagination.cursor_query_param, encode_cursor(comments[-1]))
+
+class PostSummarySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    # Reads the excerpt source annotated by Post.objects.summaries().
+    tags = TagSerializer(many=True, read_only=True)
+    excerpt = serializers.SerializerMethodField()
+    comment_count = serializers.IntegerField(source='approved_comment_count', read_only=True)
+
+    class Meta:
+        model = Post
+        fields = [
+            'id',
+            'title',
+            'slug',
+            'tags',
+            'created_at',
+            'excerpt',
+            'reading_time',
+            'comment_count'
+        ]
+
+    @reads('content_head')
+    def get_excerpt(self, obj):
+        return markdown_excerpt(obj.content_head)
 
 class ContactMessageSerializer(serializers.ModelSerializer):
     class Meta:
@@ -69,7 +224,7 @@ class ContactMessageSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'email', 'message', 'timestamp']
         read_only_fields = ['timestamp'] 
 
-class TimelineEventSerializer(serializers.ModelSerializer):
+class TimelineEventSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = TimelineEvent
         fields = ['id', 'year', 'title', 'description', 'order']
\ No newline at end of file
@@ -0,0 +1,248 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+
+from .cache import bump_named_version, bump_version
+from .jobs import enqueue
+from .recommendations import kind_of
+from .models import Tag, TagCount, Skill, Project, Post, Comment, TimelineEvent
+from .snapshot import mark_dirty, post_paths, project_paths
+from .syndication import sections
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Skill)
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=TimelineEvent)
+@receiver(post_delete, sender=TimelineEvent)
+def invalidate_model(sender, **kwargs):
+    bump_version(sender)
+
+
+@receiver(m2m_changed, sender=Project.tags.through)
+@receiver(m2m_changed, sender=Post.tags.through)
+def invalidate_tagged(sender, instance, action, model, **kwargs):
+    if action.startswith('post_'):
+        # Either side of the relation can be the one being edited.
+        bump_version(type(instance))
+        bump_version(model)
+
+
+# Set while comments change in bulk (CommentAdmin): the caller invalidates
+# once for the whole batch instead of once per row.
+_batched_comments = ContextVar('batched_comments', default=False)
+
+
+@contextmanager
+def batched_comment_changes():
+    token = _batched_comments.set(True)
+    try:
+        yield
+    finally:
+        _batched_comments.reset(token)
+
+
+@receiver(post_init, sender=Comment)
+def remember_comment_approval(sender, instance, **kwargs):
+    instance._was_approved = instance.is_approved
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment(sender, instance, **kwargs):
+    # Pending comments are never published, so they don't touch the cache.
+    if (instance.is_approved or instance._was_approved) and not _batched_comments.get():
+        bump_version(Comment)
+        mark_dirty(post_paths(*Post.objects.filter(pk=instance.post_id).values_list('slug', flat=True)))
+    instance._was_approved = instance.is_approved
+
+
+# -----------------
+# TAG COUNTS
+# -----------------
+@receiver(post_save, sender=Tag)
+def count_new_tag(sender, instance, created, **kwargs):
+    if created:
+        TagCount.objects.refresh([instance.pk])
+
+
+@receiver(m2m_changed, sender=Project.tags.through)
+@receiver(m2m_changed, sender=Post.tags.through)
+def count_tagged(sender, instance, action, pk_set, **kwargs):
+    if isinstance(instance, Tag):
+        if action.startswith('post_'):
+            TagCount.objects.refresh([instance.pk])
+    elif action == 'pre_clear':
+        # post_clear doesn't say which tags were removed.
+        instance._cleared_tags = list(instance.tags.values_list('pk', flat=True))
+    elif action == 'post_clear':
+        TagCount.objects.refresh(instance._cleared_tags)
+    elif action.startswith('post_'):
+        TagCount.objects.refresh(pk_set)
+
+
+@receiver(post_init, sender=Post)
+def remember_active(sender, instance, **kwargs):
+    instance._was_active = instance.__dict__.get('is_active')
+
+
+@receiver(post_save, sender=Post)
+def count_published(sender, instance, created, **kwargs):
+    # Only active posts are counted; new posts have no tags yet.
+    if not created and instance.is_active != instance._was_active:
+        TagCount.objects.refresh(instance.tags.values_list('pk', flat=True))
+    instance._was_active = instance.is_active
+
+
+@receiver(pre_delete, sender=Project)
+@receiver(pre_delete, sender=Post)
+def remember_tags(sender, instance, **kwargs):
+    # The M2M rows are gone by post_delete and their removal sends no m2m_changed.
+    instance._deleted_tags = list(instance.tags.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=Post)
+def count_deleted(sender, instance, **kwargs):
+    TagCount.objects.refresh(instance._deleted_tags)
+
+
+# -----------------
+# STATIC SNAPSHOT (see core/snapshot.py)
+# -----------------
+@receiver(post_init, sender=Project)
+@receiver(post_init, sender=Post)
+def remember_slug(sender, instance, **kwargs):
+    # A renamed slug also retires the file under the old one. (Read from
+    # __dict__ so deferred loads don't fetch the column.)
+    instance._saved_slug = instance.__dict__.get('slug')
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def snapshot_content(sender, instance, **kwargs):
+    paths = project_paths if sender is Project else post_paths
+    mark_dirty(paths(instance.slug, instance._saved_slug))
+    instance._saved_slug = instance.slug
+
+
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Skill)
+def snapshot_skills(sender, **kwargs):
+    mark_dirty(['skills/', 'home/'])
+
+
+@receiver(post_save, sender=TimelineEvent)
+@receiver(post_delete, sender=TimelineEvent)
+def snapshot_timeline(sender, **kwargs):
+    mark_dirty(['timeline/', 'home/'])
+
+
+@receiver(post_save, sender=Tag)
+@receiver(pre_delete, sender=Tag)
+def snapshot_tag(sender, instance, **kwargs):
+    # pre_delete: the tagged objects are no longer reachable afterwards.
+    mark_dirty([
+        'tags/',
+        *project_paths(*instance.projects.values_list('slug', flat=True)),
+        *post_paths(*instance.posts.values_list('slug', flat=True)),
+    ])
+
+
+@receiver(m2m_changed, sender=Project.tags.through)
+@receiver(m2m_changed, sender=Post.tags.through)
+def snapshot_tagged(sender, instance, action, model, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if isinstance(instance, Tag):
+        # Edited from the tag side: pk_set holds the projects or posts.
+        # (post_clear doesn't say which, so every object of that kind is marked.)
+        objects = model.objects.all() if pk_set is None else model.objects.filter(pk__in=pk_set)
+        slugs = objects.values_list('slug', flat=True)
+    else:
+        model, slugs = type(instance), [instance.slug]
+    mark_dirty((project_paths if model is Project else post_paths)(*slugs))
+
+
+# -----------------
+# IMAGE DERIVATIVES (see core/images.py)
+# -----------------
+IMAGE_FIELDS = {Skill: 'logo', Project: 'thumbnail'}
+
+
+@receiver(post_init, sender=Skill)
+@receiver(post_init, sender=Project)
+def remember_image(sender, instance, **kwargs):
+    value = instance.__dict__.get(IMAGE_FIELDS[sender])
+    instance._saved_image = getattr(value, 'name', value)
+
+
+@receiver(post_save, sender=Skill)
+@receiver(post_save, sender=Project)
+def queue_image_derivatives(sender, instance, **kwargs):
+    field = IMAGE_FIELDS[sender]
+    name = getattr(instance, field).name
+    if name != instance._saved_image:
+        enqueue('generate_image_derivatives', model=sender._meta.label_lower, pk=instance.pk, field=field)
+    instance._saved_image = name
+
+
+# -----------------
+# RECOMMENDATIONS (see core/recommendations.py)
+# -----------------
+# One admin save sends post_save and several m2m_changed; unique=True
+# leaves a single pending refresh per item.
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def queue_recommendations(sender, instance, **kwargs):
+    enqueue('refresh_recommendations', unique=True, kind=kind_of(sender), pk=instance.pk)
+
+
+@receiver(m2m_changed, sender=Project.tags.through)
+@receiver(m2m_changed, sender=Post.tags.through)
+def queue_tagged_recommendations(sender, instance, action, model, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not isinstance(instance, Tag):
+        enqueue('refresh_recommendations', unique=True, kind=kind_of(type(instance)), pk=instance.pk)
+        return
+    # Edited from the tag side: pk_set holds the projects or posts (and
+    # before a clear, the tagged objects can still be listed).
+    pks = model.objects.filter(tags=instance).values_list('pk', flat=True) if pk_set is None else pk_set
+    for pk in pks:
+        enqueue('refresh_recommendations', unique=True, kind=kind_of(model), pk=pk)
+
+
+# -----------------
+# SITEMAPS AND FEEDS (see core/syndication.py)
+# -----------------
+@receiver(post_init, sender=Post)
+def remember_published(sender, instance, **kwargs):
+    # None when is_active was deferred: assume it was published.
+    instance._was_published = instance.__dict__.get('is_active')
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def syndicate_project(sender, instance, **kwargs):
+    bump_named_version(*sections('project', instance.pk))
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def syndicate_post(sender, instance, **kwargs):
+    # Drafts are in no sitemap or feed.
+    if instance.is_active or instance._was_published is not False:
+        bump_named_version(*sections('post', instance.pk))
+    instance._was_published = instance.is_active
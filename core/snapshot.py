@@ -0,0 +1,144 @@
+"""
+Static JSON snapshot of the public read API, for serving from a CDN
+(``manage.py export_api_snapshot``).
+
+Every endpoint is requested through the real URLconf, middleware and
+views, so each file is byte-identical to the live response. Files live at
+``<lang>/<endpoint path>index.json`` next to precompressed ``.gz`` and
+``.br`` copies, and ``manifest.json`` lists the hash and size of each one.
+
+Signals (core/signals.py) record the endpoint paths an edit touches as
+SnapshotChange rows, so incremental exports re-render only those.
+"""
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.utils import timezone, translation
+
+from .models import Project, Post, SnapshotChange
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MANIFEST = 'manifest.json'
+LIST_PATHS = ['skills/', 'tags/', 'projects/', 'posts/', 'timeline/', 'home/']
+
+
+class SnapshotError(Exception):
+    pass
+
+
+# The tag list carries project and post counts, so it changes with both.
+def project_paths(*slugs):
+    return ['projects/', 'tags/', 'home/', *(f'projects/{slug}/' for slug in slugs if slug)]
+
+
+def post_paths(*slugs):
+    return ['posts/', 'tags/', 'home/', *(f'posts/{slug}/' for slug in slugs if slug)]
+
+
+def all_paths():
+    return [
+        *LIST_PATHS,
+        *(f'projects/{slug}/' for slug in Project.objects.values_list('slug', flat=True)),
+        *(f'posts/{slug}/' for slug in Post.objects.filter(is_active=True).values_list('slug', flat=True)),
+    ]
+
+
+def mark_dirty(paths):
+    SnapshotChange.objects.bulk_create([SnapshotChange(path=path) for path in sorted(set(paths))])
+
+
+def _write(path, content):
+    # Write-then-rename, so a sync to the CDN never sees a partial file.
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, 'wb') as f:
+        f.write(content)
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, path)
+
+
+def _remove(path):
+    for name in (path, f'{path}.gz', f'{path}.br'):
+        if os.path.exists(name):
+            os.remove(name)
+
+
+class SnapshotWriter:
+    def __init__(self, output, base_url):
+        from django.test import Client  # heavy; only the exporter needs it
+
+        self.output = output
+        url = urlsplit(base_url)
+        self.client = Client(HTTP_HOST=url.netloc, HTTP_ACCEPT='application/json')
+        self.secure = url.scheme == 'https'
+        self.languages = [code for code, _ in settings.LANGUAGES]
+        self.manifest = self.load_manifest()
+
+    def load_manifest(self):
+        try:
+            with open(os.path.join(self.output, MANIFEST)) as f:
+                return json.load(f)['files']
+        except FileNotFoundError:
+            return None
+
+    def export(self, paths, prune=False):
+        """
+        Render ``paths`` in every language and write the files whose
+        content changed. Endpoints that now answer 404 are removed, and so
+        is anything not in ``paths`` when ``prune`` is set. Returns counts
+        of written, unchanged and removed files.
+        """
+        files = {} if self.manifest is None else dict(self.manifest)
+        written = unchanged = removed = 0
+        exported = set()
+        # LocaleMiddleware activates each request's language in this thread.
+        with translation.override(translation.get_language()):
+            for lang in self.languages:
+                for path in sorted(set(paths)):
+                    name = f'{lang}/{path}index.json'
+                    response = self.client.get(f'/api/{path}', HTTP_ACCEPT_LANGUAGE=lang, secure=self.secure)
+                    if response.status_code == 404:
+                        if files.pop(name, None) is not None:
+                            _remove(os.path.join(self.output, name))
+                            removed += 1
+                        continue
+                    if response.status_code != 200:
+                        raise SnapshotError(f'/api/{path} ({lang}) answered {response.status_code}.')
+                    exported.add(name)
+                    if self.write(name, response.content, files):
+                        written += 1
+                    else:
+                        unchanged += 1
+        if prune:
+            for name in set(files) - exported:
+                del files[name]
+                _remove(os.path.join(self.output, name))
+                removed += 1
+        self.manifest = files
+        _write(os.path.join(self.output, MANIFEST), json.dumps({
+            'generated_at': timezone.now().isoformat(),
+            'languages': self.languages,
+            'files': dict(sorted(files.items())),
+        }, indent=2).encode())
+        return written, unchanged, removed
+
+    def write(self, name, content, files):
+        digest = hashlib.sha256(content).hexdigest()
+        target = os.path.join(self.output, name)
+        if files.get(name, {}).get('sha256') == digest and os.path.exists(target):
+            return False
+        _write(target, content)
+        _write(f'{target}.gz', gzip.compress(content, compresslevel=9, mtime=0))
+        if brotli is not None:
+            _write(f'{target}.br', brotli.compress(content, quality=11))
+        files[name] = {'sha256': digest, 'size': len(content)}
+        return True
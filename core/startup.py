@@ -0,0 +1,111 @@
+"""
+Process warm-up.
+
+gunicorn.conf.py preloads the application in the master and runs
+preload() there before forking, so every worker (including the ones
+``max_requests`` recycles) starts with what Django otherwise does lazily
+already done and shared copy-on-write:
+
+- importing the modules only loaded on first use (Markdown rendering);
+- importing the views and populating the URL resolvers;
+- building the fields of every serializer the API views use;
+- loading each language's translation catalog.
+
+Connections can't be shared across a fork, so warm_up() in each worker
+only opens the database connections (or the connection pool) before it
+accepts requests.
+
+A step that fails is logged and skipped: a worker that starts cold is
+better than one that doesn't start.
+"""
+import logging
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.db import connections
+from django.urls import URLPattern, URLResolver, get_resolver
+from django.utils import translation
+
+logger = logging.getLogger(__name__)
+
+# Imported inside functions elsewhere to keep management commands light.
+LAZY_MODULES = ('core.rendering',)
+
+
+def open_connections():
+    for alias in connections:
+        connections[alias].ensure_connection()
+
+
+def import_modules():
+    for name in LAZY_MODULES:
+        import_module(name)
+
+
+def _views(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _views(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern):
+            yield getattr(pattern.callback, 'view_class', None)
+
+
+def populate_urls():
+    get_resolver().reverse_dict  # noqa: B018 (compiles every pattern)
+
+
+def build_serializers():
+    serializers = {
+        view.serializer_class for view in _views(get_resolver().url_patterns)
+        if getattr(view, 'serializer_class', None) is not None
+    }
+    for serializer_class in serializers:
+        serializer_class(context={'request': None}).fields  # noqa: B018
+    return len(serializers)
+
+
+def load_catalogs():
+    for code, _ in settings.LANGUAGES:
+        with translation.override(code):
+            translation.gettext('')
+
+
+PRELOAD_STEPS = {
+    'modules': import_modules,
+    'urls': populate_urls,
+    'serializers': build_serializers,
+    'translations': load_catalogs,
+}
+
+WORKER_STEPS = {
+    'connections': open_connections,
+}
+
+
+def _run(steps, label):
+    timings = {}
+    for name, step in steps.items():
+        start = time.perf_counter()
+        try:
+            step()
+        except Exception:
+            logger.exception('%s step %s failed', label, name)
+            continue
+        timings[name] = time.perf_counter() - start
+    logger.info('%s took %.0f ms (%s)', label, sum(timings.values()) * 1000, ', '.join(
+        f'{name} {seconds * 1000:.0f} ms' for name, seconds in timings.items()
+    ))
+    return timings
+
+
+def preload():
+    """Runs in the master before forking; returns {step: seconds} for the
+    steps that worked."""
+    return _run(PRELOAD_STEPS, 'Preload')
+
+
+def warm_up():
+    """Runs in each worker after the fork; returns {step: seconds} for the
+    steps that worked."""
+    return _run(WORKER_STEPS, 'Warm-up')
@@ -0,0 +1,99 @@
+"""
+Streamed list responses for clients that want a whole collection.
+
+``?format=json-stream`` returns the same JSON array as the plain list
+endpoint, and ``?format=ndjson`` (or ``Accept: application/x-ndjson``)
+returns one object per line. Either way the queryset is read with
+``iterator(chunk_size=...)`` and each chunk of objects is serialized and
+sent before the next one is fetched. Peak memory then stays flat however
+many rows there are. Paginated requests (``cursor``/``page_size``) get the
+regular paginated body instead.
+
+Under ASGI the chunks are produced by an async iterator, because Django
+would otherwise buffer a sync iterator completely before sending it.
+"""
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils import translation
+from rest_framework.renderers import JSONRenderer
+
+from .renderers import FAST_RENDERERS
+
+
+class StreamingRenderer(JSONRenderer):
+    """Renders single bodies (errors, paginated pages) like JSONRenderer;
+    full lists are streamed by StreamingListMixin."""
+    opening = b'['
+    separator = b','
+    closing = b']'
+
+    def render_item(self, data):
+        return JSONRenderer.render(self, data)
+
+
+class JSONStreamRenderer(StreamingRenderer):
+    format = 'json-stream'
+
+
+class NDJSONRenderer(StreamingRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    opening = separator = closing = b''
+
+    def render_item(self, data):
+        return super().render_item(data) + b'\n'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        items = data if isinstance(data, list) else [data]
+        return b''.join(self.render_item(item) for item in items)
+
+
+STREAMING_RENDERERS = [*FAST_RENDERERS, JSONStreamRenderer, NDJSONRenderer]
+
+
+async def _async_chunks(chunks):
+    # Each chunk is produced in the thread that owns the DB connection.
+    chunks = iter(chunks)
+    while (chunk := await sync_to_async(next)(chunks, None)) is not None:
+        yield chunk
+
+
+class StreamingListMixin:
+    renderer_classes = STREAMING_RENDERERS
+    stream_chunk_size = 200
+
+    def list(self, request, *args, **kwargs):
+        renderer = request.accepted_renderer
+        if not isinstance(renderer, StreamingRenderer):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+        # Chunks are produced after the view returns: pin the database the
+        # router picked and the active language for them.
+        chunks = self.stream_chunks(queryset.using(queryset.db), renderer, translation.get_language())
+        if isinstance(request._request, ASGIRequest):
+            chunks = _async_chunks(chunks)
+        return StreamingHttpResponse(chunks, content_type=renderer.media_type)
+
+    def stream_chunks(self, queryset, renderer, language):
+        # One serializer for every row, as ListSerializer does: building the
+        # fields is the expensive part.
+        serializer = self.get_serializer_class()(context=self.get_serializer_context())
+        if renderer.opening:
+            yield renderer.opening  # the first byte goes out before any query
+        objects = queryset.iterator(chunk_size=self.stream_chunk_size)
+        separator = b''
+        while batch := list(islice(objects, self.stream_chunk_size)):
+            with translation.override(language):
+                items = [renderer.render_item(serializer.to_representation(obj)) for obj in batch]
+            yield separator + renderer.separator.join(items)
+            separator = renderer.separator
+        if renderer.closing:
+            yield renderer.closing
@@ -0,0 +1,223 @@
+"""
+Sitemaps and feeds for the frontend's pages.
+
+``sitemap.xml`` is an index of per-language sitemaps: one for the fixed
+pages, and one per shard of projects and of active posts. A shard covers
+SITEMAP_MAX_URLS consecutive primary keys, so no file can outgrow the
+50,000-URL limit and an edit only ever changes one shard. Every URL lists
+its translations as hreflang alternates. Each language also has an RSS and
+an Atom feed of the newest active posts.
+
+Documents are built on their first request and cached under the version of
+their section (core.cache.get_named_versions). Signals (core/signals.py)
+bump only the sections an edit touches, so the next request rebuilds that
+shard or feed and nothing else. The version is also the document's
+Last-Modified and ETag, so crawlers revalidate without a document being
+built (a shard request only checks that the shard isn't empty).
+"""
+import hashlib
+from io import StringIO
+
+from django.conf import settings
+from django.db.models import CharField, ExpressionWrapper, F, Max
+from django.db.models.functions import Substr
+from django.http import HttpResponse
+from django.urls import reverse
+from django.utils import feedgenerator, translation
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.utils.xmlutils import SimplerXMLGenerator
+
+from .cache import get_cache, get_named_versions
+from .models import Post, PostQuerySet, Project, localized
+from .text import markdown_excerpt
+
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+XHTML_NS = 'http://www.w3.org/1999/xhtml'
+SITEMAP_TYPE = 'application/xml; charset=utf-8'
+
+INDEX_SECTION = 'sitemap:index'
+PAGES_SECTION = 'sitemap:pages'
+FEED_SECTION = 'feed:posts'
+
+# kind -> published objects; kinds are also the SITE_PATHS entries of their pages
+KINDS = {
+    'project': lambda: Project.objects.all(),
+    'post': lambda: Post.objects.filter(is_active=True),
+}
+# Fixed pages, as SITE_PATHS entries
+PAGES = ['home', 'projects', 'posts']
+
+
+def languages():
+    return [code for code, _ in settings.LANGUAGES]
+
+
+def shard_of(pk):
+    return pk // settings.SITEMAP_MAX_URLS
+
+
+def shard_section(kind, shard):
+    return f'sitemap:{kind}:{shard}'
+
+
+def sections(kind, *pks):
+    """The sections that list the ``kind`` objects ``pks``."""
+    names = [INDEX_SECTION, *sorted({shard_section(kind, shard_of(pk)) for pk in pks})]
+    if kind == 'post':
+        names.append(FEED_SECTION)
+    return names
+
+
+def page_url(page, lang=None, **kwargs):
+    """The frontend URL of ``page`` in ``lang``, or the unprefixed one that
+    follows the visitor's language."""
+    path = settings.SITE_PATHS[page].format(**kwargs)
+    if lang is not None:
+        path = f'/{lang}' + path.rstrip('/')
+    return settings.SITE_URL + path
+
+
+def _w3c(value):
+    return value.isoformat(timespec='seconds')
+
+
+def _document(write):
+    stream = StringIO()
+    xml = SimplerXMLGenerator(stream, 'utf-8', short_empty_elements=True)
+    xml.startDocument()
+    write(xml)
+    xml.endDocument()
+    return stream.getvalue().encode()
+
+
+# -----------------
+# SITEMAPS
+# -----------------
+def build_index(request):
+    def write(xml):
+        xml.startElement('sitemapindex', {'xmlns': SITEMAP_NS})
+        for lang in languages():
+            entry(xml, reverse('sitemap-pages', args=[lang]))
+            for kind, published in KINDS.items():
+                shards = published().annotate(shard=F('pk') / settings.SITEMAP_MAX_URLS).values('shard').annotate(
+                    lastmod=Max('updated_at'),
+                ).order_by('shard')
+                for row in shards:
+                    entry(xml, reverse('sitemap-shard', args=[lang, kind, row['shard']]), row['lastmod'])
+        xml.endElement('sitemapindex')
+
+    def entry(xml, path, lastmod=None):
+        xml.startElement('sitemap', {})
+        xml.addQuickElement('loc', request.build_absolute_uri(path))
+        if lastmod is not None:
+            xml.addQuickElement('lastmod', _w3c(lastmod))
+        xml.endElement('sitemap')
+
+    return _document(write)
+
+
+def _write_urls(xml, lang, entries):
+    """``entries`` are (SITE_PATHS entry, format kwargs, lastmod or None)."""
+    xml.startElement('urlset', {'xmlns': SITEMAP_NS, 'xmlns:xhtml': XHTML_NS})
+    for page, kwargs, lastmod in entries:
+        xml.startElement('url', {})
+        xml.addQuickElement('loc', page_url(page, lang, **kwargs))
+        if lastmod is not None:
+            xml.addQuickElement('lastmod', _w3c(lastmod))
+        for alternate in languages():
+            xml.addQuickElement('xhtml:link', attrs={
+                'rel': 'alternate', 'hreflang': alternate, 'href': page_url(page, alternate, **kwargs),
+            })
+        xml.addQuickElement('xhtml:link', attrs={
+            'rel': 'alternate', 'hreflang': 'x-default',
+            'href': page_url(page, **kwargs),
+        })
+        xml.endElement('url')
+    xml.endElement('urlset')
+
+
+def build_pages(request, lang):
+    return _document(lambda xml: _write_urls(xml, lang, [(page, {}, None) for page in PAGES]))
+
+
+def shard_queryset(kind, shard):
+    size = settings.SITEMAP_MAX_URLS
+    return KINDS[kind]().filter(pk__gte=shard * size, pk__lt=(shard + 1) * size)
+
+
+def build_shard(request, lang, kind, shard):
+    rows = shard_queryset(kind, shard).order_by('pk').values_list('slug', 'updated_at')
+    return _document(lambda xml: _write_urls(xml, lang, (
+        (kind, {'slug': slug}, updated_at) for slug, updated_at in rows.iterator(chunk_size=2000)
+    )))
+
+
+# -----------------
+# FEEDS
+# -----------------
+FEED_TYPES = {
+    'rss': (feedgenerator.Rss201rev2Feed, 'application/rss+xml; charset=utf-8'),
+    'atom': (feedgenerator.Atom1Feed, 'application/atom+xml; charset=utf-8'),
+}
+
+
+def build_feed(request, lang, feed_type):
+    feed_class, _ = FEED_TYPES[feed_type]
+    with translation.override(lang):
+        # localized() reads the active language, so only its columns are loaded.
+        items = Post.objects.filter(is_active=True).order_by('-created_at', '-id').values(
+            'slug', 'created_at', 'updated_at',
+            title_text=ExpressionWrapper(localized('title'), output_field=CharField()),
+            content_head=Substr(localized('content'), 1, PostQuerySet.EXCERPT_SOURCE_LENGTH),
+        )[:settings.FEED_ITEMS]
+        feed = feed_class(
+            title=settings.FEED_TITLE,
+            link=page_url('posts', lang),
+            description=settings.FEED_DESCRIPTION,
+            language=lang,
+            feed_url=request.build_absolute_uri(),
+        )
+        for item in items:
+            link = page_url('post', lang, slug=item['slug'])
+            feed.add_item(
+                title=item['title_text'],
+                link=link,
+                description=markdown_excerpt(item['content_head']),
+                unique_id=link,
+                pubdate=item['created_at'],
+                updateddate=item['updated_at'],
+            )
+    stream = StringIO()
+    feed.write(stream, 'utf-8')
+    return stream.getvalue().encode()
+
+
+# -----------------
+# SERVING
+# -----------------
+def serve(request, section, content_type, build, *args):
+    """
+    Answers with the cached document ``build(request, *args)`` of
+    ``section``, building it if the section changed since it was cached.
+    """
+    version, = get_named_versions([section])
+    # The absolute URLs in a document depend on the host it was requested on.
+    digest = hashlib.sha256('|'.join([
+        section, request.path, request.scheme, request.get_host(), str(version),
+    ]).encode()).hexdigest()
+    etag = quote_etag(digest[:32])
+    last_modified = version // 10 ** 9
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        cache = get_cache()
+        key = f'syndication:{digest}'
+        content = cache.get(key)
+        if content is None:
+            content = build(request, *args)
+            cache.set(key, content, settings.API_CACHE_TIMEOUT)
+        response = HttpResponse(content, content_type=content_type)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    return response
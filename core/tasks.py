@@ -0,0 +1,100 @@
+"""
+Background work run by ``manage.py run_jobs``: screening of visitor
+submissions, image processing and related-content refreshes.
+"""
+from functools import reduce
+from operator import or_
+
+from django.apps import apps
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db.models import Q
+from modeltranslation.settings import AVAILABLE_LANGUAGES
+from modeltranslation.utils import build_localized_fieldname
+
+from . import images, moderation, recommendations
+from .jobs import enqueue, job
+from .models import ContactMessage, Comment, MarkdownImage, Post, Project
+
+
+def _screen(instance, queryset, text_field, timestamp_field, *texts):
+    score = moderation.spam_score(*texts)
+    if moderation.is_duplicate(instance, queryset, text_field, timestamp_field):
+        score = 1.0
+    # update() rather than save(): pending rows don't touch the API cache.
+    type(instance).objects.filter(pk=instance.pk).update(
+        spam_score=score, is_spam=score >= moderation.SPAM_THRESHOLD,
+    )
+    return score < moderation.SPAM_THRESHOLD
+
+
+@job('process_contact_message')
+def process_contact_message(pk):
+    message = ContactMessage.objects.filter(pk=pk).first()
+    if message is None:
+        return
+    same_sender = ContactMessage.objects.filter(email__iexact=message.email)
+    if _screen(message, same_sender, 'message', 'timestamp', message.name, message.message):
+        enqueue(
+            'send_notification',
+            subject=f'New contact message from {message.name}',
+            message=f'{message.name} <{message.email}> wrote:\n\n{message.message}',
+        )
+
+
+@job('process_comment')
+def process_comment(pk):
+    comment = Comment.objects.select_related('post').filter(pk=pk).first()
+    if comment is None:
+        return
+    same_post = Comment.objects.filter(post_id=comment.post_id)
+    if _screen(comment, same_post, 'body', 'created_at', comment.author_name, comment.body):
+        enqueue(
+            'send_notification',
+            subject=f'Comment awaiting moderation on "{comment.post.title}"',
+            message=f'{comment.author_name} wrote:\n\n{comment.body}',
+        )
+
+
+@job('send_notification')
+def send_notification(subject, message):
+    if settings.NOTIFICATION_EMAILS:
+        send_mail(subject, message, None, settings.NOTIFICATION_EMAILS)
+
+
+@job('generate_image_derivatives')
+def generate_image_derivatives(model, pk, field):
+    obj = apps.get_model(model).objects.filter(pk=pk).first()
+    if obj is None:
+        return
+    name = getattr(obj, field).name
+    previous = getattr(obj, f'{field}_variants')
+    raster = bool(name) and images.is_raster(name)
+    if previous.get('source') == name or not (raster or previous):
+        return
+    store_variants(obj, field, images.generate(name) if raster else {})
+
+
+def store_variants(obj, field, variants):
+    variants_field = f'{field}_variants'
+    images.delete_derivatives(getattr(obj, variants_field), keep=images.derivative_names(variants))
+    setattr(obj, variants_field, variants)
+    # save() so the usual signals refresh cached responses and snapshots.
+    obj.save(update_fields=[variants_field, 'updated_at'] if hasattr(obj, 'updated_at') else [variants_field])
+    if isinstance(obj, MarkdownImage):
+        rerender_markdown_using(obj.url)
+
+
+def rerender_markdown_using(url):
+    # The image may have been inserted before its derivatives existed.
+    for model, source in ((Post, 'content'), (Project, 'full_description')):
+        columns = [build_localized_fieldname(source, lang) for lang in AVAILABLE_LANGUAGES]
+        query = reduce(or_, [Q(**{f'{column}__contains': url}) for column in columns])
+        for obj in model.objects.filter(query):
+            # Naming the source re-renders it and writes only the output.
+            obj.save(update_fields=[*columns, 'updated_at'])
+
+
+@job('refresh_recommendations')
+def refresh_recommendations(kind, pk):
+    recommendations.refresh(kind, pk)
@@ -1,3 +1,1488 @@
-from django.test import TestCase
+import datetime
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import time
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache, caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test import AsyncClient, Client, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone, translation
+from django.utils.translation import gettext_lazy
+from PIL import Image
+from rest_framework import generics
+from rest_framework.renderers import JSONRenderer
+
+from . import analytics, benchmarks, compression, jobs, metrics, recommendations, snapshot, startup
+from .cache import cache_stats, get_versions, reset_cache_stats
+from .middleware import InstrumentationMiddleware
+from .rendering import render_markdown
+from .renderers import FastJSONRenderer
+from .rows import RowListMixin
+from .routers import REPLICA_ALIAS, ReplicaRouter
+from .streaming import StreamingListMixin
+from .throttling import WriteRateThrottle
+from .models import (
+    Tag, TagCount, Skill, Project, Post, Comment, ContactMessage, TimelineEvent, Job, SnapshotChange, MarkdownImage,
+    Recommendation, DailyView, TermPosting,
+)
+
+
+def create_posts(count, tags_per_post=3, comments_per_post=2):
+    tags = Tag.objects.bulk_create(
+        [Tag(name=f'Tag {i}', slug=f'tag-{i}') for i in range(tags_per_post)]
+    )
+    posts = Post.objects.bulk_create([
+        Post(title=f'Post {i}', slug=f'post-{i}', content='Some *markdown* body.', is_active=True)
+        for i in range(count)
+    ])
+    Post.tags.through.objects.bulk_create([
+        Post.tags.through(post_id=post.pk, tag_id=tag.pk) for post in posts for tag in tags
+    ])
+    Comment.objects.bulk_create([
+        Comment(post=post, author_name=f'Reader {i}', body='Nice post', is_approved=i % 2 == 0)
+        for post in posts for i in range(comments_per_post)
+    ])
+    return posts
+
+
+class APITestCase(TestCase):
+    # bulk_create() skips the signals that invalidate cached responses.
+    def setUp(self):
+        cache.clear()
+        reset_cache_stats()
+
+
+class PostQueryCountTests(APITestCase):
+    # updated_at aggregate (validators), posts (+ annotated comment count),
+    # tags, approved comments
+    EXPECTED_QUERIES = 4
+    # updated_at aggregate, posts (+ annotated comment count and excerpt), tags
+    EXPECTED_LIST_QUERIES = 3
+
+    def assert_list_queries(self, count):
+        create_posts(count)
+        with self.assertNumQueries(self.EXPECTED_LIST_QUERIES):
+            response = self.client.get(reverse('post-list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), count)
+
+    def test_list_queries_with_1_post(self):
+        self.assert_list_queries(1)
+
+    def test_list_queries_with_10_posts(self):
+        self.assert_list_queries(10)
+
+    def test_list_queries_with_500_posts(self):
+        self.assert_list_queries(500)
+
+    def test_detail_queries(self):
+        create_posts(10)
+        with self.assertNumQueries(self.EXPECTED_QUERIES):
+            response = self.client.get(reverse('post-detail', args=['post-3']))
+        self.assertEqual(response.status_code, 200)
+
+    def test_only_approved_comments_are_returned_newest_first(self):
+        post = create_posts(1, comments_per_post=4)[0]
+        latest = Comment.objects.create(post=post, author_name='Latest', body='Hi', is_approved=True)
+        data = self.client.get(reverse('post-detail', args=[post.slug])).json()
+        self.assertEqual(data['comment_count'], 3)
+        self.assertEqual(len(data['comments']), 3)
+        self.assertEqual(data['comments'][0]['id'], latest.pk)
+        self.assertEqual(len(data['tags']), 3)
+
+
+class ListRepresentationTests(APITestCase):
+    def test_post_list_returns_summaries_without_bodies(self):
+        Post.objects.create(
+            title='Long read', slug='long-read', is_active=True,
+            content='# Heading\n\n' + 'word ' * 450,
+        )
+        post = self.client.get(reverse('post-list')).json()[0]
+        self.assertNotIn('content', post)
+        self.assertNotIn('comments', post)
+        self.assertEqual(post['reading_time'], 3)
+        self.assertTrue(post['excerpt'].startswith('Heading word word'))
+        self.assertLessEqual(len(post['excerpt']), 180)
+        self.assertEqual(post['comment_count'], 0)
+
+    def test_post_excerpt_falls_back_to_default_language(self):
+        Post.objects.create(title='Only English', slug='only-english', is_active=True, content='English body')
+        # LocaleMiddleware leaves the request language active on this thread.
+        with translation.override('en'):
+            post = self.client.get(reverse('post-list'), HTTP_ACCEPT_LANGUAGE='fr').json()[0]
+        self.assertEqual(post['excerpt'], 'English body')
+
+    def test_project_list_omits_full_description(self):
+        Project.objects.create(
+            title='Tool', slug='tool', short_description='Short',
+            full_description='Very long', thumbnail='projects/tool.png',
+        )
+        project = self.client.get(reverse('project-list')).json()[0]
+        self.assertNotIn('full_description', project)
+        self.assertEqual(project['short_description'], 'Short')
+        detail = self.client.get(reverse('project-detail', args=['tool'])).json()
+        self.assertNotIn('full_description', detail)
+        self.assertEqual(detail['full_description_html'], '<p>Very long</p>')
+        detail = self.client.get(reverse('project-detail', args=['tool']), {'fields': 'full_description'}).json()
+        self.assertEqual(detail, {'full_description': 'Very long'})
+
+    def test_sparse_fieldsets(self):
+        create_posts(2)
+        posts = self.client.get(reverse('post-list'), {'fields': 'slug,title'}).json()
+        self.assertEqual([set(post) for post in posts], [{'slug', 'title'}] * 2)
+
+    def test_sparse_fieldsets_on_tags_and_comments(self):
+        post = Post.objects.create(title='Tagged', slug='tagged', content='Body', is_active=True)
+        post.tags.add(Tag.objects.create(name='Django', slug='django'))
+        Comment.objects.create(post=post, author_name='Ann', body='Hi', is_approved=True)
+        tags = self.client.get(reverse('tag-list'), {'fields': 'slug,post_count'}).json()
+        self.assertEqual(tags, [{'slug': 'django', 'post_count': 1}])
+        comments = self.client.get(reverse('post-comment-list', args=['tagged']), {'fields': 'author_name'}).json()
+        self.assertEqual(comments['results'], [{'author_name': 'Ann'}])
+        # Nested tags and the fields of a write are left whole.
+        detail = self.client.get(reverse('post-detail', args=['tagged']), {'fields': 'tags'}).json()
+        self.assertEqual(detail['tags'][0]['name'], 'Django')
+        response = self.client.post(
+            reverse('comment-create') + '?fields=id', {'post': post.pk, 'author_name': 'Bob', 'body': 'Hey'}
+        )
+        self.assertEqual(response.status_code, 201)
+
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.post = Post.objects.create(title='Fresh', slug='fresh', content='Body', is_active=True)
+
+    def test_list_and_detail_emit_validators(self):
+        for url in (reverse('post-list'), reverse('post-detail', args=['fresh']), reverse('skill-list')):
+            response = self.client.get(url)
+            self.assertTrue(response['ETag'].startswith('"'), url)
+            self.assertIn('Last-Modified', response)
+
+    @override_settings(API_CACHE_ENABLED=False)
+    def test_if_none_match_returns_304_without_serializing(self):
+        etag = self.client.get(reverse('post-detail', args=['fresh']))['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('post-detail', args=['fresh']), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_if_modified_since_returns_304(self):
+        last_modified = self.client.get(reverse('post-list'))['Last-Modified']
+        response = self.client.get(reverse('post-list'), HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_deleting_the_newest_row_moves_last_modified_forward(self):
+        older = Post.objects.create(title='Older', slug='older', content='Body', is_active=True)
+        Post.objects.filter(pk=older.pk).update(updated_at=timezone.now() - datetime.timedelta(hours=1))
+        last_modified = self.client.get(reverse('post-list'))['Last-Modified']
+        later = time.time_ns() + 10 ** 10
+        with mock.patch('core.cache.time.time_ns', return_value=later):
+            self.post.delete()
+        response = self.client.get(reverse('post-list'), HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('fresh', response.content.decode())
+
+    def test_changes_produce_a_new_etag(self):
+        etag = self.client.get(reverse('post-list'))['ETag']
+        Comment.objects.create(post=self.post, author_name='A', body='B', is_approved=True)
+        response = self.client.get(reverse('post-list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_depends_on_language(self):
+        english = self.client.get(reverse('post-list'), HTTP_ACCEPT_LANGUAGE='en')['ETag']
+        with translation.override('en'):
+            french = self.client.get(reverse('post-list'), HTTP_ACCEPT_LANGUAGE='fr')['ETag']
+        self.assertNotEqual(english, french)
+
+
+class ResponseCacheTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.post = Post.objects.create(title='Cached', slug='cached', content='Body', is_active=True)
+
+    def test_repeated_requests_are_served_from_cache(self):
+        first = self.client.get(reverse('post-detail', args=['cached']))
+        # Only the Last-Modified lookup touches the database.
+        with self.assertNumQueries(1):
+            second = self.client.get(reverse('post-detail', args=['cached']))
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(cache_stats(), {'hits': 1, 'misses': 1})
+
+    def test_cache_is_keyed_by_language(self):
+        self.post.title_fr = 'En cache'
+        self.post.save()
+        english = self.client.get(reverse('post-list'), HTTP_ACCEPT_LANGUAGE='en').json()
+        with translation.override('en'):
+            french = self.client.get(reverse('post-list'), HTTP_ACCEPT_LANGUAGE='fr').json()
+        self.assertEqual(english[0]['title'], 'Cached')
+        self.assertEqual(french[0]['title'], 'En cache')
+
+    def test_saving_a_post_invalidates(self):
+        self.client.get(reverse('post-list'))
+        self.post.title = 'Renamed'
+        self.post.save()
+        self.assertEqual(self.client.get(reverse('post-list')).json()[0]['title'], 'Renamed')
+
+    def test_tagging_invalidates(self):
+        self.client.get(reverse('post-list'))
+        self.post.tags.add(Tag.objects.create(name='Django', slug='django'))
+        self.assertEqual(len(self.client.get(reverse('post-list')).json()[0]['tags']), 1)
+
+    def test_only_approved_comments_invalidate(self):
+        self.client.get(reverse('post-list'))
+        comment = Comment.objects.create(post=self.post, author_name='Spam', body='Buy now')
+        with self.assertNumQueries(1):
+            self.client.get(reverse('post-list'))
+        comment.is_approved = True
+        comment.save()
+        self.assertEqual(self.client.get(reverse('post-list')).json()[0]['comment_count'], 1)
+
+
+class SearchTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        django = Tag.objects.create(name='Django', slug='django')
+        self.post = Post.objects.create(
+            title_en='Running Django in production', title_fr='Django en production',
+            content_en='Notes on deploying <b>apps</b> with gunicorn runners.',
+            content_fr='Des notes sur le déploiement.',
+            slug='django-prod', is_active=True,
+        )
+        self.post.tags.add(django)
+        Post.objects.create(title='Draft about Django', slug='draft', content='Unpublished', is_active=False)
+        self.project = Project.objects.create(
+            title='Portfolio', slug='portfolio', short_description='Built with Django',
+            full_description='A site', thumbnail='projects/p.png', category='FULL_STACK',
+        )
+        self.project.tags.add(django)
+
+    def search(self, **params):
+        return self.client.get(reverse('search'), params).json()
+
+    def test_ranked_results_across_types(self):
+        data = self.search(q='django')
+        self.assertEqual(data['count'], 2)
+        self.assertEqual([r['slug'] for r in data['results']], ['django-prod', 'portfolio'])
+        self.assertEqual(data['facets']['types'], {'post': 1, 'project': 1})
+        self.assertEqual(data['facets']['tags'], [{'slug': 'django', 'name': 'Django', 'count': 2}])
+        self.assertEqual(data['facets']['categories'], [{'category': 'FULL_STACK', 'count': 1}])
+
+    def test_stemming_and_escaped_highlights(self):
+        result = self.search(q='running deployed', type='post')['results'][0]
+        self.assertIn('<mark>Running</mark>', result['highlight']['title'])
+        self.assertIn('<mark>deploying</mark>', result['highlight']['snippet'])
+        self.assertIn('&lt;b&gt;', result['highlight']['snippet'])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.post.content_en = 'Now about kubernetes'
+        self.post.save()
+        self.assertEqual(self.search(q='kubernetes')['count'], 1)
+        self.assertEqual(self.search(q='gunicorn')['count'], 0)
+        self.post.delete()
+        self.assertEqual(self.search(q='kubernetes')['count'], 0)
+
+    def test_searches_active_language_with_fallback(self):
+        with translation.override('en'):
+            data = self.client.get(reverse('search'), {'q': 'déploiement'}, HTTP_ACCEPT_LANGUAGE='fr').json()
+            self.assertEqual(data['results'][0]['title'], 'Django en production')
+            fallback = self.client.get(reverse('search'), {'q': 'portfolio'}, HTTP_ACCEPT_LANGUAGE='fr').json()
+            self.assertEqual(fallback['count'], 1)
+
+    def test_filters(self):
+        self.assertEqual(self.search(q='django', category='FULL_STACK')['count'], 1)
+        self.assertEqual(self.search(q='django', tag='missing')['count'], 0)
+        self.assertEqual(self.client.get(reverse('search'), {'q': 'x', 'type': 'bad'}).status_code, 400)
+
+
+class KeysetPaginationTests(APITestCase):
+    def test_bare_list_without_page_parameters(self):
+        create_posts(3)
+        self.assertIsInstance(self.client.get(reverse('post-list')).json(), list)
+
+    def test_pages_are_stable_across_inserts(self):
+        create_posts(5)
+        first = self.client.get(reverse('post-list'), {'page_size': 2}).json()
+        self.assertEqual(len(first['results']), 2)
+        seen = [post['id'] for post in first['results']]
+
+        Post.objects.create(title='Newer', slug='newer', content='x', is_active=True)
+        page = first
+        while page['next']:
+            page = self.client.get(page['next']).json()
+            seen += [post['id'] for post in page['results']]
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(len(set(seen)), 5)
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get(reverse('project-list'), {'cursor': 'bogus'}).status_code, 404)
+
+    def test_post_detail_embeds_first_comment_page(self):
+        post = create_posts(1, comments_per_post=50)[0]
+        detail = self.client.get(reverse('post-detail', args=[post.slug])).json()
+        self.assertEqual(detail['comment_count'], 25)
+        self.assertEqual(len(detail['comments']), 20)
+
+        rest = self.client.get(detail['comments_next']).json()
+        self.assertEqual(len(rest['results']), 5)
+        self.assertIsNone(rest['next'])
+        ids = [c['id'] for c in detail['comments']] + [c['id'] for c in rest['results']]
+        self.assertEqual(len(set(ids)), 25)
+
+    def test_comment_list_is_always_paginated(self):
+        post = create_posts(1, comments_per_post=2)[0]
+        data = self.client.get(reverse('post-comment-list', args=[post.slug])).json()
+        self.assertEqual(len(data['results']), 1)
+
+
+class RenderedMarkdownTests(APITestCase):
+    def test_post_is_rendered_on_save(self):
+        Post.objects.create(
+            slug='rendered', is_active=True, title='Rendered',
+            content_en='# Intro\n\nHello <script>x</script> $a_1$\n\n## Usage\n\n[bad](javascript:alert(1))',
+        )
+        with translation.override('en'):
+            data = self.client.get(reverse('post-detail', args=['rendered']), HTTP_ACCEPT_LANGUAGE='fr').json()
+        # The French fields are empty, so the English rendering is served.
+        self.assertIn('<h1 id="intro">Intro</h1>', data['content_html'])
+        self.assertIn('&lt;script&gt;', data['content_html'])
+        self.assertIn('<span class="math-inline">a_1</span>', data['content_html'])
+        self.assertNotIn('javascript:', data['content_html'])
+        self.assertEqual(data['toc'], [{
+            'level': 1, 'id': 'intro', 'title': 'Intro',
+            'children': [{'level': 2, 'id': 'usage', 'title': 'Usage', 'children': []}],
+        }])
+        self.assertEqual(data['reading_time'], 1)
+
+    def test_encoded_schemes_are_dropped(self):
+        payloads = [
+            '&#106;avascript:alert(1)', 'java&#x73;cript:alert(1)', 'java&Tab;script:alert(1)',
+            ' &#1;javascript:alert(1)', 'data:text/html,x',
+        ]
+        html = render_markdown('\n\n'.join(f'[x]({url}) ![y]({url})' for url in payloads))['html']
+        self.assertNotIn('href', html)
+        self.assertNotIn('src', html)
+        html = render_markdown('[a](/posts/) [b](#top) [c](mailto:me@example.com) [d](https://example.com/?a=1&amp;b=2)')['html']
+        self.assertEqual(html.count('href'), 4)
+
+    def test_render_markdown_command(self):
+        create_posts(3)
+        Post.objects.update(content_en='one two three')
+        call_command('render_markdown', workers=1, stdout=StringIO())
+        self.assertEqual(set(Post.objects.values_list('word_count_en', flat=True)), {3})
+
+
+class AsyncReadPathTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        post = create_posts(3, comments_per_post=30)[0]
+        post.save()  # render the Markdown fields
+        project = Project.objects.create(
+            title='Tool', slug='tool', short_description='Short',
+            full_description='## Body', thumbnail='projects/tool.png',
+        )
+        project.tags.add(Tag.objects.first())
+        Skill.objects.create(name='Python', logo='skills/python.png', category='DATA')
+        TimelineEvent.objects.create(year='2024', title='Started', description='Hello')
+
+    async def test_async_responses_match_sync_views(self):
+        paths = [
+            'skills/', 'projects/', 'projects/tool/', 'posts/', 'posts/?page_size=2',
+            'posts/post-0/', 'timeline/', 'posts/missing/', 'posts/?cursor=bogus',
+        ]
+        tag = await Tag.objects.afirst()
+        paths += [
+            f'projects/?tag={tag.slug}', 'projects/?tag=missing', 'projects/?category=SCRIPTS',
+            f'posts/?tag={tag.slug}', 'posts/?tag=missing',
+        ]
+        for path in paths:
+            expected = await sync_to_async(self.client.get)(f'/api/{path}')
+            actual = await self.async_client.get(f'/api/async/{path}')
+            self.assertEqual(actual.status_code, expected.status_code, path)
+            # Pagination links point back at the endpoint that was called.
+            self.assertEqual(actual.content.replace(b'/api/async/', b'/api/'), expected.content, path)
+
+
+class HomeBundleTests(APITestCase):
+    # skills, featured projects, project tags, timeline, latest posts, post tags
+    EXPECTED_QUERIES = 6
+
+    def setUp(self):
+        super().setUp()
+        create_posts(5)
+        for i in range(4):
+            project = Project.objects.create(
+                title=f'Project {i}', title_fr=f'Projet {i}', slug=f'project-{i}', short_description='Short',
+                full_description='Body', thumbnail='projects/p.png', is_featured=i != 1,
+            )
+            project.tags.add(Tag.objects.first())
+        Skill.objects.create(name='Django', logo='skills/django.png', category='WEB', is_key_skill=True)
+        Skill.objects.create(name='Pandas', logo='skills/pandas.png', category='DATA', is_key_skill=True)
+        Skill.objects.create(name='Bash', logo='skills/bash.png', category='TOOLS')
+        TimelineEvent.objects.create(year='2024', title='Started', description='Hello')
+
+    def test_bundle_contents(self):
+        with self.assertNumQueries(self.EXPECTED_QUERIES):
+            data = self.client.get(reverse('home')).json()
+        self.assertEqual(
+            {category: [skill['name'] for skill in skills] for category, skills in data['skills'].items()},
+            {'WEB': ['Django'], 'DATA': ['Pandas'], 'TOOLS': []},
+        )
+        self.assertEqual([p['slug'] for p in data['featured_projects']], ['project-3', 'project-2', 'project-0'])
+        self.assertEqual(len(data['timeline']), 1)
+        self.assertEqual([p['slug'] for p in data['latest_posts']], ['post-4', 'post-3', 'post-2'])
+        self.assertEqual(len(self.client.get(reverse('home'), {'posts': 5}).json()['latest_posts']), 5)
+
+    def test_lang_parameter_and_caching(self):
+        with translation.override('en'):
+            french = self.client.get(reverse('home'), {'lang': 'fr'})
+        self.assertEqual(french['Content-Language'], 'fr')
+        self.assertEqual(french.json()['featured_projects'][0]['title'], 'Projet 3')
+        self.assertEqual(self.client.get(reverse('home')).json()['featured_projects'][0]['title'], 'Project 3')
+        with self.assertNumQueries(0):
+            self.client.get(reverse('home'), {'lang': 'fr'})
+        Project.objects.filter(slug='project-3').first().save()
+        with self.assertNumQueries(self.EXPECTED_QUERIES):
+            self.client.get(reverse('home'), {'lang': 'fr'})
+
+
+@override_settings(NOTIFICATION_EMAILS=['owner@example.com'])
+class BackgroundJobTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.post = Post.objects.create(title='Hello', slug='hello', content='Body', is_active=True)
+        Job.objects.all().delete()  # the new post's recommendations refresh
+
+    def test_submissions_are_screened_in_the_background(self):
+        response = self.client.post(reverse('comment-create'), {
+            'post': self.post.pk, 'author_name': 'Ann', 'body': 'Great read!',
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(list(Job.objects.values_list('name', flat=True)), ['process_comment'])
+        self.assertEqual(len(mail.outbox), 0)
+
+        call_command('run_jobs', '--once', stdout=StringIO())
+        comment = Comment.objects.get()
+        self.assertEqual((comment.spam_score, comment.is_spam, comment.is_approved), (0, False, False))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('Great read!', mail.outbox[0].body)
+        self.assertEqual(set(Job.objects.values_list('status', flat=True)), {'done'})
+
+    def test_spam_and_duplicates_are_flagged_without_notification(self):
+        for message in ['Hi, nice portfolio.', 'hi,  NICE portfolio.', 'Cheap SEO services, click here: http://x.test']:
+            self.client.post(reverse('contact-create'), {'name': 'Bob', 'email': 'bob@example.com', 'message': message})
+        call_command('run_jobs', '--once', stdout=StringIO())
+        self.assertEqual(
+            list(ContactMessage.objects.order_by('pk').values_list('is_spam', flat=True)), [False, True, True]
+        )
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_failures_are_retried_with_backoff(self):
+        job = jobs.enqueue('send_notification', max_attempts=2, subject='Hi', message='There')
+        with self.settings(EMAIL_BACKEND='core.tests.BrokenEmailBackend'), self.assertLogs('core.jobs'):
+            self.assertEqual(jobs.run_pending(), 1)
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.attempts), ('pending', 1))
+            self.assertIn('ConnectionRefusedError', job.last_error)
+            # Not due yet.
+            self.assertEqual(jobs.run_pending(), 0)
+            Job.objects.update(run_at=job.created_at)
+            jobs.run_pending()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('failed', 2))
+
+    def test_stale_running_jobs_are_reclaimed(self):
+        job = jobs.enqueue('send_notification', subject='Hi', message='There')
+        self.assertEqual(len(jobs.claim()), 1)
+        self.assertEqual(jobs.claim(), [])
+        Job.objects.update(locked_at=job.created_at - jobs.STALE_AFTER)
+        self.assertEqual(len(jobs.claim()), 1)
+
+    @override_settings(WRITE_THROTTLE_BURST=3, WRITE_THROTTLE_RATE='1/hour')
+    def test_write_endpoints_share_a_limit(self):
+        data = {'post': self.post.pk, 'author_name': 'Ann', 'body': 'Hi'}
+        statuses = [self.client.post(reverse('comment-create'), data).status_code for _ in range(3)]
+        contact = self.client.post(reverse('contact-create'), {'name': 'A', 'email': 'a@example.com', 'message': 'Hi'})
+        self.assertEqual(statuses, [201, 201, 201])
+        self.assertEqual(contact.status_code, 429)
+        self.assertGreater(int(contact['Retry-After']), 3000)
+        other_client = self.client.post(reverse('comment-create'), data, REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(other_client.status_code, 201)
+        # Behind the proxy, only the address it appended identifies the client.
+        spoofed = self.client.post(reverse('comment-create'), data, HTTP_X_FORWARDED_FOR='1.2.3.4, 127.0.0.1')
+        self.assertEqual(spoofed.status_code, 429)
+
+    @override_settings(WRITE_THROTTLE_BURST=2, WRITE_THROTTLE_RATE='1/minute')
+    def test_tokens_refill_one_at_a_time(self):
+        throttle = WriteRateThrottle()
+        request = RequestFactory().post('/')
+        with mock.patch('core.throttling.time.time', return_value=1000.0) as now:
+            allowed = [throttle.allow_request(request, None) for _ in range(3)]
+            self.assertAlmostEqual(throttle.wait(), 60)
+            # A window boundary doesn't hand out a second burst.
+            now.return_value += 60
+            allowed += [throttle.allow_request(request, None) for _ in range(2)]
+            self.assertAlmostEqual(throttle.wait(), 60)
+            now.return_value += 30
+            allowed.append(throttle.allow_request(request, None))
+            self.assertAlmostEqual(throttle.wait(), 30)
+        self.assertEqual(allowed, [True, True, False, True, False, False])
+
+    @override_settings(WRITE_THROTTLE_BURST=2, WRITE_THROTTLE_RATE='1/hour')
+    def test_a_locked_bucket_is_not_spent(self):
+        throttle = WriteRateThrottle()
+        request = RequestFactory().post('/')
+        # Another request from the same client is updating the bucket.
+        cache.add(throttle.lock_format.format(throttle.get_ident(request)), 1)
+        with mock.patch('core.throttling.time.sleep') as sleep:
+            self.assertFalse(throttle.allow_request(request, None))
+        self.assertEqual(sleep.call_count, throttle.lock_attempts)
+        cache.clear()
+        self.assertTrue(throttle.allow_request(request, None))
+
+
+class BrokenEmailBackend:
+    def __init__(self, **kwargs):
+        pass
+
+    def send_messages(self, messages):
+        raise ConnectionRefusedError('SMTP server unavailable')
+
+
+class SnapshotExportTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.output = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output)
+        self.post = create_posts(3, comments_per_post=50)[0]
+        self.post.save()
+        Project.objects.create(
+            title='Tool', slug='tool', short_description='Short', full_description='Body', thumbnail='projects/t.png',
+        )
+        Skill.objects.create(name='Python', logo='skills/python.png')
+
+    def export(self, *args):
+        out = StringIO()
+        call_command('export_api_snapshot', '--output', self.output, '--base-url', 'https://localhost', *args, stdout=out)
+        return out.getvalue()
+
+    def read(self, name):
+        with open(os.path.join(self.output, name), 'rb') as f:
+            return f.read()
+
+    def test_files_match_live_responses(self):
+        self.export()
+        manifest = json.loads(self.read('manifest.json'))['files']
+        self.assertEqual(len(manifest), 3 * (len(snapshot.LIST_PATHS) + 4))
+        for lang in ('en', 'fr'):
+            for path in ['skills/', 'posts/', 'posts/post-0/', 'projects/tool/', 'home/']:
+                name = f'{lang}/{path}index.json'
+                with translation.override('en'):
+                    live = self.client.get(f'/api/{path}', HTTP_ACCEPT_LANGUAGE=lang, secure=True, HTTP_HOST='localhost')
+                self.assertEqual(self.read(name), live.content, name)
+                self.assertEqual(gzip.decompress(self.read(f'{name}.gz')), live.content)
+                self.assertEqual(manifest[name]['size'], len(live.content))
+        # Absolute links use the configured origin.
+        self.assertIn(b'https://localhost/api/posts/post-0/comments/', self.read('en/posts/post-0/index.json'))
+
+    def test_incremental_export_rewrites_touched_files_only(self):
+        self.export()
+        self.assertFalse(SnapshotChange.objects.exists())
+        self.post.title = 'Renamed'
+        self.post.save()
+        Project.objects.get().delete()
+        # posts/, post-0/, projects/ and home/ change in each language; tool/ goes.
+        # tags/ is re-rendered too, but no count changed.
+        self.assertIn('12 written, 3 unchanged, 3 removed', self.export('--incremental'))
+        self.assertIn(b'Renamed', self.read('fr/posts/post-0/index.json'))
+        self.assertFalse(os.path.exists(os.path.join(self.output, 'en/projects/tool/index.json')))
+        self.assertIn('0 written, 0 unchanged, 0 removed', self.export('--incremental'))
+
+
+def png(width, height, name='image.png'):
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), 'teal').save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+class ImageDerivativeTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        storage = override_settings(MEDIA_ROOT=media, STORAGES={
+            'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+            'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+        })
+        storage.enable()
+        self.addCleanup(storage.disable)
+
+    def test_upload_generates_srcset(self):
+        skill = Skill.objects.create(name='Python', logo=png(1000, 500, 'python.png'))
+        self.assertEqual(list(Job.objects.values_list('name', flat=True)), ['generate_image_derivatives'])
+        jobs.run_pending()
+
+        skill.refresh_from_db()
+        variants = skill.logo_variants
+        self.assertEqual((variants['width'], variants['height'], variants['source']), (1000, 500, skill.logo.name))
+        self.assertTrue(variants['placeholder'].startswith('data:image/webp;base64,'))
+        webp = variants['sources']['webp']
+        self.assertEqual([(f['width'], f['height']) for f in webp], [(320, 160), (640, 320), (960, 480), (1000, 500)])
+        self.assertTrue(all(skill.logo.storage.exists(f['name']) for f in webp))
+
+        data = self.client.get(reverse('skill-list')).json()[0]['logo_image']
+        self.assertIn({'type': 'image/webp', 'srcset': ', '.join(
+            f"http://testserver{f['url']} {f['width']}w" for f in webp
+        )}, data['sources'])
+
+        # Replacing the image swaps the derivatives.
+        skill.logo = png(200, 200, 'python.png')
+        skill.save()
+        jobs.run_pending()
+        skill.refresh_from_db()
+        self.assertEqual([f['width'] for f in skill.logo_variants['sources']['webp']], [200])
+        self.assertFalse(any(skill.logo.storage.exists(f['name']) for f in webp))
+
+    def test_markdown_uploads_render_as_picture(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        response = self.client.post(
+            '/markdownx/upload/', {'image': png(800, 600)}, HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+        )
+        image_code = response.json()['image_code']
+        post = Post.objects.create(title='Pics', slug='pics', content=f'Look: {image_code}', is_active=True)
+        self.assertNotIn('<picture>', post.content_html)
+
+        jobs.run_pending()
+        post.refresh_from_db()
+        self.assertIn('<picture><source srcset=', post.content_html)
+        self.assertIn('height="600"', post.content_html)
+        self.assertIn('width="800"', post.content_html)
+        self.assertEqual(MarkdownImage.objects.get().image_variants['width'], 800)
+        self.assertTrue(MarkdownImage.objects.get().image.name.startswith(timezone.now().strftime('markdownx/%Y/%m/%d/')))
+
+    def test_thumbnail_derivatives_do_not_rerender_markdown(self):
+        project = Project.objects.create(
+            title='Tool', slug='tool', short_description='Short',
+            full_description='Long', thumbnail=png(400, 300, 'tool.png'),
+        )
+        with mock.patch('core.rendering.render_markdown') as render:
+            jobs.run_pending()
+        render.assert_not_called()
+        project.refresh_from_db()
+        self.assertEqual(project.thumbnail_variants['width'], 400)
+        self.assertEqual(project.full_description_html, '<p>Long</p>')
+
+    def test_backfill_command(self):
+        skill = Skill.objects.create(name='Go', logo=png(400, 100))
+        Job.objects.all().delete()
+        call_command('generate_image_derivatives', '--workers', '1', stdout=StringIO())
+        skill.refresh_from_db()
+        self.assertEqual(skill.logo_variants['height'], 100)
+
+
+class ReplicaRoutingTests(APITestCase):
+    # A second in-memory SQLite database stands in for the replica; its rows
+    # are written directly, so responses show which database served them.
+    # (The alias only exists while the class runs, so it isn't declared on
+    # the class for the test runner to set up.)
+    @classmethod
+    def setUpClass(cls):
+        connections.settings[REPLICA_ALIAS] = {**connections['default'].settings_dict, 'NAME': ':memory:'}
+        with connections[REPLICA_ALIAS].schema_editor() as editor:
+            editor.create_model(Skill)
+        cls.databases = {'default', REPLICA_ALIAS}
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        del cls.databases
+        del connections[REPLICA_ALIAS]
+        del connections.settings[REPLICA_ALIAS]
+
+    def setUp(self):
+        super().setUp()
+        Skill.objects.bulk_create([Skill(name='Primary', logo='skills/p.png')])
+        Skill.objects.using(REPLICA_ALIAS).bulk_create([Skill(name='Replica', logo='skills/r.png')])
+
+    def skill_names(self):
+        return [skill['name'] for skill in self.client.get(reverse('skill-list')).json()]
+
+    def test_public_reads_use_the_replica(self):
+        self.assertEqual(self.skill_names(), ['Replica'])
+
+    def test_reads_stay_on_the_primary_after_a_change(self):
+        Skill.objects.create(name='New', logo='skills/n.png')
+        self.assertEqual(sorted(self.skill_names()), ['New', 'Primary'])
+        cache.clear()  # the lag window has passed
+        self.assertEqual(self.skill_names(), ['Replica'])
+
+    def test_writes_always_go_to_the_primary(self):
+        skill = Skill.objects.using(REPLICA_ALIAS).get()
+        self.assertEqual(ReplicaRouter().db_for_write(Skill, instance=skill), 'default')
+        self.assertFalse(ReplicaRouter().allow_migrate(REPLICA_ALIAS, 'core'))
+        response = self.client.post(reverse('contact-create'), {'name': 'A', 'email': 'a@example.com', 'message': 'Hi'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(ContactMessage.objects.using('default').count(), 1)
+
+
+class InstrumentationTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        metrics.registry.reset()
+        Skill.objects.create(name='Python', logo='skills/python.png')
+
+    def test_server_timing_header(self):
+        timing = self.client.get(reverse('skill-list'))['Server-Timing']
+        self.assertRegex(timing, r'^db;dur=[\d.]+;desc="\d+ queries", serialize;dur=[\d.]+, render;dur=[\d.]+, total;dur=[\d.]+$')
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_endpoint(self):
+        self.client.get(reverse('skill-list'))
+        self.client.get(reverse('skill-list'))
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        body = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret').content.decode()
+        self.assertIn('# TYPE api_request_duration_seconds histogram', body)
+        self.assertIn('api_request_duration_seconds_count{view="SkillListView"} 2', body)
+        self.assertIn('api_requests_total{view="SkillListView",method="GET",status="200"} 2', body)
+        self.assertIn('api_db_queries_bucket{view="SkillListView",le="+Inf"} 2', body)
+        self.assertNotIn('metrics_view', body)
+
+    def test_workers_share_a_directory(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        with open(os.path.join(directory, 'metrics-1.json'), 'w') as f:
+            json.dump({'api_requests_total': [[['SkillListView', 'GET', '200'], 3]]}, f)
+        with override_settings(METRICS_DIR=directory):
+            self.client.get(reverse('skill-list'))
+            totals = metrics.collect()
+        self.assertEqual(totals['api_requests_total'][('SkillListView', 'GET', '200')], 4)
+        self.assertTrue(os.path.exists(os.path.join(directory, f'metrics-{os.getpid()}.json')))
+
+    async def test_asgi_requests_stay_on_the_event_loop(self):
+        async def get_response(request):
+            pass
+
+        instrumentation = InstrumentationMiddleware(get_response)
+        for hook in (instrumentation, instrumentation.process_view, instrumentation.process_template_response,
+                     compression.CompressionMiddleware(get_response)):
+            self.assertTrue(iscoroutinefunction(hook))
+        response = await self.async_client.get(reverse('skill-list'))
+        # Queries run by the view in its thread are still counted.
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="[1-9]\d* queries"')
+
+    @override_settings(METRICS_SLOW_QUERY_MS=0, METRICS_N_PLUS_ONE_THRESHOLD=1)
+    def test_slow_and_repeated_query_warnings(self):
+        with self.assertLogs('core.metrics', 'WARNING') as logs:
+            self.client.get(reverse('skill-list'))
+        self.assertTrue(any('Slow query' in line and 'SkillListView' in line for line in logs.output))
+        self.assertTrue(any('Possible N+1' in line for line in logs.output))
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_disabled(self):
+        response = Client().get(reverse('skill-list'))
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(metrics.collect()['api_requests_total'], {})
+
+
+class BenchmarkSuiteTests(APITestCase):
+    def test_measure_endpoint(self):
+        benchmarks.create_dataset(posts=3, projects=2, tags=2, comments_per_post=2, body_words=50, render=True)
+        result = benchmarks.measure(self.client, reverse('post-detail', args=['post-0']), 3, languages=('en', 'fr', 'ar'))
+        self.assertEqual(result['queries'], 4)
+        self.assertGreater(result['rps'], 0)
+        self.assertGreater(result['peak_kib'], 0)
+        self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+        with translation.override('en'):
+            body = self.client.get(reverse('post-detail', args=['post-0']), HTTP_ACCEPT_LANGUAGE='fr').json()
+        self.assertEqual(body['title'], 'Article 0')
+        self.assertIn('<h2', body['content_html'])
+
+    def test_compare_against_baseline(self):
+        baseline = {'small': {'post-list': {'rps': 100, 'p95_ms': 10, 'queries': 3, 'peak_kib': 200}}}
+        same = {'small': {'post-list': {'rps': 90, 'p95_ms': 12, 'queries': 3, 'peak_kib': 210}}}
+        self.assertEqual(benchmarks.compare(same, baseline, tolerance=0.25), [])
+        worse = {'small': {'post-list': {'rps': 50, 'p95_ms': 10, 'queries': 4, 'peak_kib': 200}, 'home': {'rps': 1}}}
+        self.assertEqual(benchmarks.compare(worse, baseline, tolerance=0.25), [
+            'small post-list rps: 100 -> 50', 'small post-list queries: 3 -> 4',
+        ])
+
+
+class ActiveTranslationsTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        Post.objects.create(
+            slug='bonjour', is_active=True,
+            title_en='Hello', content_en='English *body*', title_fr='Bonjour', content_fr='', title_ar='مرحبا', content_ar='نص',
+        )
+
+    def get(self, lang, url):
+        with translation.override('en'), CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, HTTP_ACCEPT_LANGUAGE=lang)
+        return response.json(), [query['sql'] for query in queries]
+
+    def test_only_active_language_and_fallback_are_loaded(self):
+        body, queries = self.get('fr', reverse('post-detail', args=['bonjour']) + '?fields=title,content')
+        post_query = next(sql for sql in queries if 'FROM "core_post"' in sql and '"content_fr"' in sql)
+        self.assertIn('"core_post"."content_en"', post_query)
+        self.assertNotIn('"core_post"."content_ar"', post_query)
+        self.assertNotIn('"core_post"."content",', post_query)
+        # French is empty, so the English fallback is served without extra queries.
+        self.assertEqual((body['title'], body['content']), ('Bonjour', 'English *body*'))
+        self.assertEqual(len(queries), len(self.get('en', reverse('post-detail', args=['bonjour']) + '?fields=title,content')[1]))
+
+    def test_default_language_skips_other_columns(self):
+        body, queries = self.get('en', reverse('post-list'))
+        self.assertEqual(body[0]['title'], 'Hello')
+        self.assertFalse(any('"title_fr"' in sql or '"title_ar"' in sql for sql in queries))
+
+
+class StreamingListTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        create_posts(5)
+
+    def test_json_stream_matches_the_regular_list(self):
+        with override_settings(API_CACHE_ENABLED=False):
+            regular = self.client.get(reverse('post-list'))
+        with self.assertNumQueries(3):  # ETag lookup, posts, tags
+            response = self.client.get(reverse('post-list'), {'format': 'json-stream'})
+            body = b''.join(response.streaming_content)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(body, regular.content)
+
+    def test_ndjson(self):
+        with mock.patch.object(StreamingListMixin, 'stream_chunk_size', 2):
+            response = self.client.get(reverse('post-list'), HTTP_ACCEPT='application/x-ndjson')
+            chunks = list(response.streaming_content)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(len(chunks), 3)
+        lines = b''.join(chunks).decode().splitlines()
+        self.assertEqual([json.loads(line)['slug'] for line in lines], [f'post-{i}' for i in reversed(range(5))])
+
+    def test_paginated_requests_are_not_streamed(self):
+        response = self.client.get(reverse('post-list'), {'format': 'ndjson', 'page_size': 2})
+        self.assertFalse(response.streaming)
+        self.assertEqual(len(json.loads(response.content)['results']), 2)
+
+    async def test_asgi_streams_with_an_async_iterator(self):
+        response = await AsyncClient().get(reverse('post-list'), {'format': 'ndjson'})
+        self.assertTrue(response.is_async)
+        body = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(body.splitlines()), 5)
+
+
+class TagCountTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.python, self.django = Tag.objects.create(name='Python'), Tag.objects.create(name='Django')
+        self.post = Post.objects.create(title='Tagged', content='Body', is_active=True)
+        self.project = Project.objects.create(
+            title='Tool', short_description='Short', full_description='Body', thumbnail='projects/tool.png',
+            category='SCRIPTS',
+        )
+
+    def counts(self, tag):
+        count = TagCount.objects.get(tag=tag)
+        return count.post_count, count.project_count
+
+    def test_counts_follow_tagging(self):
+        self.assertEqual(self.counts(self.python), (0, 0))
+        self.post.tags.add(self.python, self.django)
+        self.project.tags.add(self.python)
+        self.assertEqual(self.counts(self.python), (1, 1))
+        self.post.tags.remove(self.django)
+        self.assertEqual(self.counts(self.django), (0, 0))
+        self.post.tags.clear()
+        self.assertEqual(self.counts(self.python), (0, 1))
+        self.django.projects.add(self.project)
+        self.assertEqual(self.counts(self.django), (0, 1))
+        self.django.projects.clear()
+        self.assertEqual(self.counts(self.django), (0, 0))
+
+    def test_only_active_posts_count(self):
+        self.post.tags.add(self.python)
+        self.post.is_active = False
+        self.post.save()
+        self.assertEqual(self.counts(self.python), (0, 0))
+        Post.objects.get(pk=self.post.pk).delete()
+        self.project.delete()
+        self.assertEqual(self.counts(self.python), (0, 0))
+
+    def test_deleting_counts(self):
+        self.post.tags.add(self.python)
+        self.project.tags.add(self.python)
+        self.post.delete()
+        self.project.delete()
+        self.assertEqual(self.counts(self.python), (0, 0))
+
+    def test_tag_list(self):
+        self.post.tags.add(self.python)
+        self.project.tags.add(self.python, self.django)
+        with self.assertNumQueries(2):  # ETag lookup, tags joined to their counts
+            data = self.client.get(reverse('tag-list')).json()
+        self.assertEqual(
+            [(tag['slug'], tag['post_count'], tag['project_count']) for tag in data],
+            [('django', 0, 1), ('python', 1, 1)],
+        )
+        self.post.tags.remove(self.python)
+        data = self.client.get(reverse('tag-list')).json()
+        self.assertEqual(data[1]['post_count'], 0)
+
+    def test_tag_and_category_filters(self):
+        other = Post.objects.create(title='Other', content='Body', is_active=True)
+        self.post.tags.add(self.python)
+        other.tags.add(self.django)
+        self.project.tags.add(self.python)
+        posts = self.client.get(reverse('post-list'), {'tag': 'python'}).json()
+        self.assertEqual([post['slug'] for post in posts], ['tagged'])
+        projects = self.client.get(reverse('project-list'), {'tag': 'python', 'category': 'SCRIPTS'}).json()
+        self.assertEqual([project['slug'] for project in projects], ['tool'])
+        self.assertEqual(self.client.get(reverse('project-list'), {'category': 'FULL_STACK'}).json(), [])
+        self.assertEqual(self.client.get(reverse('post-list'), {'tag': 'missing'}).json(), [])
+
+
+class RecommendationTests(APITestCase):
+    TOPICS = {
+        'orm': 'Django querysets, model managers and database indexes for Python developers.',
+        'views': 'Django class based views, templates and Python forms.',
+        'tomatoes': 'Gardening notes: tomatoes, compost and watering the soil.',
+        'roses': 'Gardening notes: pruning roses and feeding the soil with compost.',
+    }
+
+    def setUp(self):
+        super().setUp()
+        garden = Tag.objects.create(name='Garden')
+        for slug, body in self.TOPICS.items():
+            post = Post.objects.create(title=slug.title(), title_fr=f'{slug} (fr)', slug=slug, content=body, is_active=True)
+            if slug in ('tomatoes', 'roses'):
+                post.tags.add(garden)
+        Project.objects.create(
+            title='Shop', slug='shop', short_description='Django storefront', thumbnail='projects/shop.png',
+            full_description='Python Django models, querysets and class based views.',
+        )
+        recommendations.rebuild()
+        Job.objects.all().delete()
+
+    def related(self, slug):
+        return [item['slug'] for item in Post.objects.get(slug=slug).related]
+
+    def test_rebuild_ranks_similar_items_first(self):
+        self.assertEqual(self.related('tomatoes')[0], 'roses')
+        self.assertEqual(self.related('orm')[0], 'shop')
+        self.assertLessEqual(len(self.related('orm')), recommendations.TOP_K)
+        self.assertEqual(Recommendation.objects.filter(source_kind='post').values('source_id').distinct().count(), 4)
+        # Nothing changed, so nothing is rewritten.
+        self.assertEqual(recommendations.rebuild()[1], 0)
+
+    def test_detail_serializers_embed_them_without_queries(self):
+        with translation.override('en'):
+            with self.assertNumQueries(PostQueryCountTests.EXPECTED_QUERIES):
+                data = self.client.get(reverse('post-detail', args=['roses']), HTTP_ACCEPT_LANGUAGE='fr').json()
+        self.assertEqual(data['related'][0], {'kind': 'post', 'slug': 'tomatoes', 'title': 'tomatoes (fr)'})
+        project = self.client.get(reverse('project-detail', args=['shop'])).json()
+        self.assertIn({'kind': 'post', 'slug': 'orm', 'title': 'Orm'}, project['related'])
+
+    def test_edits_refresh_affected_lists_in_the_background(self):
+        Post.objects.create(
+            title='Soil', slug='soil', content='Gardening notes: compost, soil and pruning roses.', is_active=True,
+        ).tags.add(Tag.objects.get(slug='garden'))
+        jobs.run_pending()
+        self.assertIn('soil', self.related('roses'))
+        self.assertNotIn('soil', self.related('orm'))
+
+        post = Post.objects.get(slug='soil')
+        post.is_active = False
+        post.save()
+        jobs.run_pending()
+        self.assertNotIn('soil', self.related('roses'))
+        self.assertFalse(Recommendation.objects.filter(target_kind='post', target_id=post.pk).exists())
+        self.assertFalse(TermPosting.objects.filter(kind='post', object_id=post.pk).exists())
+
+    def test_one_edit_queues_one_refresh(self):
+        post = Post.objects.get(slug='orm')
+        post.save()
+        post.tags.set([Tag.objects.get(slug='garden')])
+        post.tags.clear()
+        self.assertEqual(Job.objects.filter(name='refresh_recommendations', payload={'kind': 'post', 'pk': post.pk}).count(), 1)
+
+    def test_refresh_only_tokenizes_the_edited_item(self):
+        post = Post.objects.get(slug='tomatoes')
+        post.content = 'Tomatoes want sun, compost and pruning like roses do.'
+        post.save()
+        with mock.patch.object(recommendations, 'terms', wraps=recommendations.terms) as tokenize:
+            jobs.run_pending()
+        self.assertEqual(tokenize.call_count, 1)
+        self.assertEqual(self.related('tomatoes')[0], 'roses')
+        self.assertIn('tomatoes', self.related('roses'))
+        # The same lists as a full rebuild.
+        refreshed = {slug: self.related(slug) for slug in self.TOPICS}
+        recommendations.rebuild()
+        self.assertEqual({slug: self.related(slug) for slug in self.TOPICS}, refreshed)
+
+
+@override_settings(ANALYTICS_FLUSH_SECONDS=0)
+class AnalyticsTests(APITestCase):
+    BROWSER = 'Mozilla/5.0 (X11; Linux x86_64)'
+
+    def setUp(self):
+        super().setUp()
+        self.posts = create_posts(3, tags_per_post=1, comments_per_post=0)
+        analytics.buffer.drain()
+        caches[settings.ANALYTICS_CACHE_ALIAS].clear()
+
+    def tearDown(self):
+        analytics.buffer.drain()  # nothing left for the exit-time flush
+
+    def view(self, slug, kind='post', ip='10.0.0.1', agent=BROWSER, referrer=''):
+        return self.client.post(
+            reverse('record-view'), json.dumps({'kind': kind, 'slug': slug, 'referrer': referrer}),
+            content_type='text/plain;charset=UTF-8', REMOTE_ADDR=ip, HTTP_USER_AGENT=agent,
+        )
+
+    def test_views_are_buffered_without_queries(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(self.view('post-0').status_code, 204)
+        self.assertFalse(DailyView.objects.exists())
+        self.assertEqual(sum(analytics.buffer.hits.values()), 1)
+
+    def test_repeat_visitors_and_bots_count_once(self):
+        self.view('post-0')
+        self.view('post-0')
+        self.view('post-0', ip='10.0.0.2', referrer='https://www.google.com/search?q=x')
+        self.view('post-0', agent='Googlebot/2.1')
+        self.view('missing')
+        self.assertEqual(self.view('post-0', kind='skill').status_code, 400)
+        self.assertEqual(analytics.flush(), 2)
+        self.assertEqual(
+            sorted(DailyView.objects.values_list('referrer', 'views')), [('', 1), ('google.com', 1)]
+        )
+
+    def test_flushes_add_to_existing_rollups(self):
+        for ip in ('10.0.0.1', '10.0.0.2'):
+            self.view('post-1', ip=ip)
+            analytics.flush()
+        self.assertEqual(DailyView.objects.get().views, 2)
+
+    def test_flush_updates_in_bulk(self):
+        for ip in ('10.0.0.1', '10.0.0.2', '10.0.0.3'):
+            self.view('post-0', ip=ip)
+        self.view('post-1')
+        self.view('post-2')
+        analytics.flush()
+        self.view('post-1', ip='10.0.0.2')
+        self.view('post-2', ip='10.0.0.2')
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(analytics.flush(), 2)
+        updates = [q['sql'] for q in queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(sorted(DailyView.objects.values_list('views', flat=True)), [2, 2, 3])
+
+    def test_dedup_does_not_touch_the_database_cache(self):
+        call_command('createcachetable', verbosity=0)
+        with self.settings(CACHES={**settings.CACHES, 'default': DATABASE_CACHES['default']}):
+            with self.assertNumQueries(0):
+                self.view('post-0')
+
+    def test_failed_flushes_keep_the_views(self):
+        self.view('post-1')
+        with mock.patch.object(DailyView.objects, 'bulk_create', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                analytics.flush()
+        self.assertEqual(analytics.flush(), 1)
+
+    def test_full_buffer_is_flushed(self):
+        with self.settings(ANALYTICS_MAX_BUFFERED=2):
+            self.view('post-0')
+            self.assertFalse(DailyView.objects.exists())
+            self.view('post-1')
+        self.assertEqual(DailyView.objects.count(), 2)
+
+    def test_popular(self):
+        for ip in ('10.0.0.1', '10.0.0.2', '10.0.0.3'):
+            self.view('post-2', ip=ip)
+        self.view('post-0')
+        analytics.flush()
+        data = self.client.get(reverse('popular')).json()
+        self.assertEqual([(item['slug'], item['views']) for item in data], [('post-2', 3), ('post-0', 1)])
+        self.view('post-0', ip='10.0.0.9')
+        self.view('post-0', ip='10.0.0.8')
+        self.view('post-0', ip='10.0.0.7')
+        analytics.flush()
+        data = self.client.get(reverse('popular'), {'limit': 1}).json()
+        self.assertEqual([(item['slug'], item['views']) for item in data], [('post-0', 4)])
+        self.assertEqual(self.client.get(reverse('popular'), {'type': 'project'}).json(), [])
+        data = self.client.get(reverse('popular'), {'fields': 'title'}).json()
+        self.assertEqual(data, [{'title': 'Post 0', 'views': 4}, {'title': 'Post 2', 'views': 3}])
+
+    def test_forwarded_for_cannot_inflate_views(self):
+        for spoofed in ('1.1.1.1', '2.2.2.2', '3.3.3.3'):
+            self.client.post(
+                reverse('record-view'), json.dumps({'kind': 'post', 'slug': 'post-0'}),
+                content_type='text/plain;charset=UTF-8', HTTP_USER_AGENT=self.BROWSER,
+                HTTP_X_FORWARDED_FOR=f'{spoofed}, 10.0.0.1',
+            )
+        self.assertEqual(analytics.flush(), 1)
+
+
+# The admin templates need static files, which aren't collected for tests.
+@override_settings(STORAGES={
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+})
+class ModerationAdminTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        self.posts = create_posts(5, comments_per_post=0)
+
+    def add_comments(self, count):
+        Comment.objects.bulk_create([
+            Comment(post=self.posts[i % 5], author_name=f'Reader {i}', body='Spam ' * 500) for i in range(count)
+        ])
+
+    def changelist_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_changelists_run_a_fixed_number_of_queries(self):
+        url = reverse('admin:core_comment_changelist')
+        self.add_comments(5)
+        _, few = self.changelist_queries(url)
+        self.add_comments(50)
+        response, many = self.changelist_queries(url)
+        self.assertEqual(few, many)
+        self.assertContains(response, 'Post 0')
+        self.assertNotContains(response, 'Spam ' * 20)
+
+        ContactMessage.objects.bulk_create([
+            ContactMessage(name=f'N{i}', email=f'n{i}@example.com', message='Buy now ' * 500) for i in range(30)
+        ])
+        response, _ = self.changelist_queries(reverse('admin:core_contactmessage_changelist'))
+        self.assertNotContains(response, 'Buy now ' * 20)
+        self.assertEqual(self.client.get(
+            reverse('admin:core_contactmessage_changelist'), {'q': 'N3@EXAMPLE.com'}
+        ).context['cl'].result_count, 1)
+
+    def act(self, action, pks, model='comment'):
+        return self.client.post(reverse(f'admin:core_{model}_changelist'), {
+            'action': action, '_selected_action': pks,
+        })
+
+    def test_bulk_actions_are_single_statements(self):
+        self.add_comments(10)
+        pks = list(Comment.objects.values_list('pk', flat=True))
+        cached = self.client.get(reverse('post-detail', args=['post-0'])).json()['comment_count']
+        with CaptureQueriesContext(connection) as queries:
+            self.act('approve', pks)
+        writes = [q['sql'] for q in queries if q['sql'].startswith(('UPDATE "core_comment"', 'DELETE FROM "core_comment"'))]
+        self.assertEqual(len(writes), 1)
+        self.assertEqual(Comment.objects.filter(is_approved=True).count(), 10)
+        # The cached post was invalidated.
+        self.assertEqual(self.client.get(reverse('post-detail', args=['post-0'])).json()['comment_count'], cached + 2)
+        self.assertTrue(SnapshotChange.objects.filter(path='posts/post-0/').exists())
+
+        self.act('reject', pks[:4])
+        self.assertEqual(Comment.objects.filter(is_approved=True).count(), 6)
+        with CaptureQueriesContext(connection) as one:
+            self.act('delete_comments', pks[9:])
+        with CaptureQueriesContext(connection) as queries:
+            self.act('delete_comments', pks[:7])
+        writes = [q['sql'] for q in queries if q['sql'].startswith('DELETE FROM "core_comment"')]
+        self.assertEqual(len(writes), 1)
+        # No per-row signal work: deleting 7 costs what deleting 1 does.
+        self.assertEqual(len(queries), len(one))
+        self.assertEqual(Comment.objects.count(), 2)
+        self.assertEqual(self.client.get(reverse('post-detail', args=['post-0'])).json()['comment_count'], 0)
+
+        message = ContactMessage.objects.create(name='A', email='a@example.com', message='Hi')
+        self.act('mark_spam', [message.pk], model='contactmessage')
+        message.refresh_from_db()
+        self.assertTrue(message.is_spam)
+        with CaptureQueriesContext(connection) as queries:
+            self.act('delete_messages', [message.pk], model='contactmessage')
+        writes = [q['sql'] for q in queries if q['sql'].startswith('DELETE FROM "core_contactmessage"')]
+        self.assertEqual(len(writes), 1)
+        self.assertFalse(ContactMessage.objects.exists())
+
+
+class RowSerializerTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        first, second, _ = create_posts(3)
+        Post.objects.filter(pk=second.pk).update(title_fr='', reading_time_fr=0)
+        Post.objects.filter(pk=first.pk).update(
+            title_fr='Premier « billet »', content_fr='Corps\u2028 *en français*', title_ar='مقال', reading_time_ar=4,
+        )
+        variants = {
+            'width': 800, 'height': 600, 'placeholder': 'data:image/webp;base64,AAAA',
+            'sources': {'webp': [{'url': '/media/variants/app-400.webp', 'width': 400}]},
+        }
+        app = Project.objects.create(
+            title_en='App', title_fr='Appli', slug='app', short_description='Short', full_description='Body',
+            thumbnail='projects/app.png', thumbnail_variants=variants, category='DATA_SCIENCE',
+        )
+        app.tags.set(Tag.objects.all()[:2])
+        Project.objects.create(title='Bare', slug='bare', short_description='', full_description='Body', thumbnail='')
+        Skill.objects.create(name='Django', logo='skills/django.png', logo_variants=variants, is_key_skill=True)
+        TimelineEvent.objects.create(
+            year='2024', title_en='Start', title_fr='Début', description_en='Began', description_fr='', order=1,
+        )
+
+    def get(self, name, lang, params):
+        with override_settings(API_CACHE_ENABLED=False), translation.override('en'):
+            return self.client.get(reverse(name), params, HTTP_ACCEPT_LANGUAGE=lang).content
+
+    def test_same_bytes_as_the_serializers(self):
+        cases = [
+            ('skill-list', {}), ('tag-list', {}), ('timeline-list', {}),
+            ('project-list', {}), ('project-list', {'fields': 'title,tags,thumbnail'}), ('project-list', {'page_size': 1}),
+            ('post-list', {}), ('post-list', {'tag': 'tag-0', 'fields': 'id,excerpt'}), ('post-list', {'page_size': 2}),
+        ]
+        for name, params in cases:
+            for lang in ('en', 'fr', 'ar'):
+                with self.subTest(name, lang=lang, **params):
+                    fast = self.get(name, lang, params)
+                    with mock.patch.object(RowListMixin, 'list', generics.ListAPIView.list), \
+                            mock.patch.object(FastJSONRenderer, 'render', JSONRenderer.render):
+                        self.assertEqual(fast, self.get(name, lang, params))
+
+    def test_pages_follow_the_cursor(self):
+        first = json.loads(self.get('post-list', 'en', {'page_size': 2}))
+        second = self.client.get(first['next']).json()
+        slugs = [post['slug'] for post in first['results'] + second['results']]
+        self.assertEqual(sorted(slugs), ['post-0', 'post-1', 'post-2'])
+
+    def test_renderer_matches_json_renderer(self):
+        data = {
+            'text': 'quote " slash \\ tab \t nul \x00 separators \u2028\u2029 é 漢 😀',
+            'when': timezone.now(), 'price': Decimal('1.50'), 'lazy': gettext_lazy('Invalid cursor'),
+            'nested': [1, -2, True, None, {'empty': []}], 'big': 2 ** 70,
+        }
+        for media_type in (None, 'application/json; indent=2'):
+            self.assertEqual(
+                FastJSONRenderer().render(data, media_type), JSONRenderer().render(data, media_type),
+            )
+
+
+class CompressionTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        create_posts(20)
+
+    def test_negotiation(self):
+        self.assertEqual(compression.negotiate('gzip;q=1.0, identity; q=0.5, *;q=0'), 'gzip')
+        self.assertEqual(compression.negotiate('deflate, gzip;q=0'), None)
+        self.assertEqual(compression.negotiate(''), None)
+        self.assertEqual(compression.negotiate('*'), next(iter(compression.ENCODINGS)))
+
+    @skipUnless(compression.brotli, 'Brotli is not installed')
+    def test_prefers_brotli_unless_weighted_lower(self):
+        self.assertEqual(compression.negotiate('gzip, deflate, br'), 'br')
+        self.assertEqual(compression.negotiate('gzip, br;q=0.5'), 'gzip')
+
+    async def test_gzip_response_under_asgi(self):
+        plain = await self.async_client.get(reverse('post-list'))
+        response = await self.async_client.get(reverse('post-list'), headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+
+    def test_gzip_response(self):
+        plain = self.client.get(reverse('post-list'))
+        response = self.client.get(reverse('post-list'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(response['ETag'], 'W/' + plain['ETag'])
+        revalidated = self.client.get(
+            reverse('post-list'), HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'],
+        )
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_small_and_non_api_responses_are_left_alone(self):
+        response = self.client.get(reverse('timeline-list'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotIn('Content-Encoding', response)
+        self.assertTrue(response['ETag'].startswith('"'))
+        with override_settings(API_COMPRESSION_PREFIX='/other/'):
+            response = self.client.get(reverse('post-list'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotIn('Content-Encoding', response)
+
+    def test_cached_responses_are_compressed_once(self):
+        with mock.patch.object(compression, 'compress', wraps=compression.compress) as compress:
+            bodies = [self.client.get(reverse('post-list'), HTTP_ACCEPT_ENCODING='gzip').content for _ in range(3)]
+        self.assertEqual(compress.call_count, 1)
+        self.assertEqual(len(set(bodies)), 1)
+        # A new version of the posts leaves the stored variant behind.
+        Post.objects.first().save()
+        with mock.patch.object(compression, 'compress', wraps=compression.compress) as compress:
+            self.client.get(reverse('post-list'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(compress.call_count, 1)
+
+
+class StartupTests(APITestCase):
+    def test_preload_and_warm_up_run_every_step(self):
+        self.assertEqual(list(startup.preload()), list(startup.PRELOAD_STEPS))
+        self.assertEqual(list(startup.warm_up()), ['connections'])
+        self.assertGreater(startup.build_serializers(), 5)
+
+    def test_failing_step_is_skipped(self):
+        with mock.patch.dict(startup.PRELOAD_STEPS, {'urls': mock.Mock(side_effect=RuntimeError)}):
+            with self.assertLogs('core.startup', 'ERROR'):
+                timings = startup.preload()
+        self.assertNotIn('urls', timings)
+        self.assertIn('translations', timings)
+
+    def test_profile_startup_command(self):
+        out = StringIO()
+        call_command('profile_startup', '--limit', '3', '--no-warm-up', stdout=out)
+        self.assertIn('django.setup()', out.getvalue())
+        self.assertIn('modules imported in', out.getvalue())
+        self.assertNotIn('warm-up:', out.getvalue())
+
+
+@override_settings(SITE_URL='https://example.com', SITEMAP_MAX_URLS=3)
+class SyndicationTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.posts = [
+            Post.objects.create(title=f'Post {i}', slug=f'post-{i}', content=f'Body **{i}**', is_active=True)
+            for i in range(5)
+        ]
+        self.draft = Post.objects.create(title='Draft', slug='draft', content='Soon')
+        self.project = Project.objects.create(
+            title='Site', slug='site', short_description='A site', full_description='Built', thumbnail='projects/x.png',
+        )
+
+    def test_index_lists_pages_and_shards_per_language(self):
+        response = self.client.get('/sitemap.xml')
+        self.assertEqual(response.status_code, 200)
+        content = response.content.decode()
+        shards = sorted({post.pk // 3 for post in self.posts})
+        for lang in ('en', 'fr', 'ar'):
+            self.assertIn(f'<loc>http://testserver/sitemaps/{lang}/pages.xml</loc>', content)
+            for shard in shards:
+                self.assertIn(f'<loc>http://testserver/sitemaps/{lang}/post-{shard}.xml</loc>', content)
+            self.assertIn(f'/sitemaps/{lang}/project-{self.project.pk // 3}.xml', content)
+
+    def test_shards_stay_within_the_limit(self):
+        listed = []
+        for shard in sorted({post.pk // 3 for post in self.posts}):
+            content = self.client.get(f'/sitemaps/fr/post-{shard}.xml').content.decode()
+            self.assertLessEqual(content.count('<url>'), 3)
+            listed += [post.slug for post in self.posts if f'/fr/blog/{post.slug}</loc>' in content]
+            self.assertNotIn('/draft', content)
+        self.assertEqual(listed, [post.slug for post in self.posts])
+
+        content = self.client.get(f'/sitemaps/fr/post-{self.posts[0].pk // 3}.xml').content.decode()
+        self.assertIn('<xhtml:link href="https://example.com/ar/blog/post-0" hreflang="ar" rel="alternate"/>', content)
+        self.assertIn('<xhtml:link href="https://example.com/blog/post-0" hreflang="x-default" rel="alternate"/>', content)
+        self.assertEqual(self.client.get('/sitemaps/de/pages.xml').status_code, 404)
+        self.assertEqual(self.client.get('/sitemaps/en/tag-0.xml').status_code, 404)
+        # Shards past the last post don't exist (and store no version).
+        self.assertEqual(self.client.get('/sitemaps/en/post-99999.xml').status_code, 404)
+        self.assertIsNone(cache.get('api:version:sitemap:post:99999'))
+
+        pages = self.client.get('/sitemaps/ar/pages.xml').content.decode()
+        self.assertIn('<loc>https://example.com/ar</loc>', pages)
+        self.assertIn('<xhtml:link href="https://example.com/" hreflang="x-default" rel="alternate"/>', pages)
+
+    def test_feeds(self):
+        self.posts[0].title_fr = 'Premier'
+        self.posts[0].save()
+        rss = self.client.get('/feeds/fr/posts.rss')
+        self.assertEqual(rss['Content-Type'], 'application/rss+xml; charset=utf-8')
+        self.assertIn('<title>Premier</title>', rss.content.decode())
+        self.assertIn('<link>https://example.com/fr/blog/post-0</link>', rss.content.decode())
+        self.assertNotIn('Draft', rss.content.decode())
+        atom = self.client.get('/feeds/en/posts.atom').content.decode()
+        self.assertIn('<title>Post 0</title>', atom)
+        self.assertIn('Body 4', atom)
+
+    def test_conditional_requests_and_incremental_rebuilds(self):
+        first = self.client.get('/feeds/en/posts.rss')
+        revalidated = self.client.get(
+            '/feeds/en/posts.rss', HTTP_IF_MODIFIED_SINCE=first['Last-Modified'], HTTP_IF_NONE_MATCH=first['ETag'],
+        )
+        self.assertEqual(revalidated.status_code, 304)
+
+        shards = {post.pk // 3 for post in self.posts}
+        urls = ['/sitemap.xml', '/feeds/en/posts.rss', *(f'/sitemaps/en/post-{shard}.xml' for shard in shards)]
+        etags = {url: self.client.get(url)['ETag'] for url in urls}
+        # Editing a draft touches nothing.
+        self.draft.title = 'Still a draft'
+        self.draft.save()
+        # Only the shards' existence checks reach the database.
+        with self.assertNumQueries(len(shards)):
+            for url in urls:
+                self.assertEqual(self.client.get(url)['ETag'], etags[url])
+
+        # A published post only changes its own shard, the index and the feed.
+        post = self.posts[-1]
+        post.title = 'Renamed'
+        post.save()
+        changed = {url for url in urls if self.client.get(url)['ETag'] != etags[url]}
+        self.assertEqual(changed, {'/sitemap.xml', '/feeds/en/posts.rss', f'/sitemaps/en/post-{post.pk // 3}.xml'})
+        self.assertIn('Renamed', self.client.get('/feeds/en/posts.rss').content.decode())
+
+        # Unpublishing removes it.
+        post.is_active = False
+        post.save()
+        self.assertNotIn(f'/blog/{post.slug}<', self.client.get(f'/sitemaps/en/post-{post.pk // 3}.xml').content.decode())
+
+
+DATABASE_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'django_cache'}}
+
+
+class SharedCacheTests(APITestCase):
+    def test_cached_get_runs_one_query_on_the_configured_cache(self):
+        # No override: the backend from settings (CACHE_URL) is measured.
+        create_posts(3)
+        self.client.get(reverse('post-list'))
+        with self.assertNumQueries(1):  # the Last-Modified lookup
+            response = self.client.get(reverse('post-list'))
+        self.assertEqual(cache_stats(), {'hits': 1, 'misses': 1})
+        self.assertEqual(len(response.json()), 3)
+
+    def test_versions_are_read_once_per_request(self):
+        create_posts(1)
+        with mock.patch('core.cache.get_versions', wraps=get_versions) as read:
+            self.client.get(reverse('post-list'))
+        self.assertEqual(read.call_count, 1)
+
+    @override_settings(CACHES=DATABASE_CACHES)
+    def test_database_cache_is_shared(self):
+        # Every worker process sees the same version stamps.
+        call_command('createcachetable', verbosity=0)
+        post = Post.objects.create(title='Shared', slug='shared', content='Body', is_active=True)
+        before = get_versions([Post])
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM django_cache')
+            self.assertGreater(cursor.fetchone()[0], 0)
+        post.save()
+        self.assertGreater(get_versions([Post]), before)
+
+    def test_cached_responses_depend_on_the_media_type(self):
+        create_posts(1)
+        plain = self.client.get(reverse('post-list'), HTTP_ACCEPT='application/json')
+        indented = self.client.get(reverse('post-list'), HTTP_ACCEPT='application/json; indent=4')
+        self.assertIn(b'\n    ', indented.content)
+        self.assertEqual(self.client.get(reverse('post-list'), HTTP_ACCEPT='application/json').content, plain.content)
+        self.assertNotIn(b'\n    ', plain.content)
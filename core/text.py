@@ -0,0 +1,24 @@
+import math
+import re
+
+from django.utils.text import Truncator
+
+WORDS_PER_MINUTE = 200
+EXCERPT_LENGTH = 180
+
+_MARKDOWN_LINK = re.compile(r'!?\[([^\]]*)\]\([^)]*\)')
+_MARKDOWN_SYNTAX = re.compile(r'[#*`>_~|]')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def markdown_excerpt(text, length=EXCERPT_LENGTH):
+    """Plain-text preview of a Markdown body, cut on a word boundary."""
+    text = _MARKDOWN_LINK.sub(r'\1', text or '')
+    text = _MARKDOWN_SYNTAX.sub('', text)
+    text = _WHITESPACE.sub(' ', text).strip()
+    return Truncator(text).chars(length)
+
+
+def reading_time(word_count):
+    """Minutes needed to read ``word_count`` words (same rate as the frontend)."""
+    return max(1, math.ceil(word_count / WORDS_PER_MINUTE))
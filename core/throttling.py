@@ -0,0 +1,72 @@
+import time
+
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+
+from .cache import get_cache
+
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 60 * 60 * 24}
+
+
+def parse_rate(rate):
+    """'20/hour' -> tokens added per second."""
+    count, period = rate.split('/')
+    return int(count) / PERIODS[period[0]]
+
+
+class WriteRateThrottle(BaseThrottle):
+    """
+    Per-client token bucket for the write endpoints: up to
+    ``WRITE_THROTTLE_BURST`` requests may arrive back to back, after which
+    tokens refill at ``WRITE_THROTTLE_RATE``. Buckets live in the API cache
+    and are shared by every view using this throttle.
+
+    A bucket (token count and time of the last update) is read and written
+    while holding a lock taken with cache.add(), the one cache operation
+    that is atomic on every backend, so concurrent requests can't spend
+    the same token. A request that can't get the lock within
+    ``lock_attempts`` tries is refused: only a client racing itself waits
+    that long.
+    """
+    cache_format = 'throttle:write:{}'
+    lock_format = 'throttle:write:{}:lock'
+    lock_timeout = 2  # seconds; frees the bucket if the holder died
+    lock_attempts = 20
+    lock_retry = 0.01  # seconds between attempts
+
+    def __init__(self):
+        self.burst = settings.WRITE_THROTTLE_BURST
+        self.refill = parse_rate(settings.WRITE_THROTTLE_RATE)
+        self.wait_seconds = None
+
+    def allow_request(self, request, view):
+        cache = get_cache()
+        ident = self.get_ident(request)
+        lock = self.lock_format.format(ident)
+        for attempt in range(self.lock_attempts):
+            if cache.add(lock, 1, timeout=self.lock_timeout):
+                break
+            time.sleep(self.lock_retry)
+        else:
+            self.wait_seconds = self.lock_timeout
+            return False
+        try:
+            return self.take_token(cache, self.cache_format.format(ident))
+        finally:
+            cache.delete(lock)
+
+    def take_token(self, cache, key):
+        now = time.time()
+        tokens, updated = cache.get(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.refill)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        else:
+            self.wait_seconds = (1 - tokens) / self.refill
+        # Kept until the bucket would be full again.
+        cache.set(key, (tokens, now), timeout=int((self.burst - tokens) / self.refill) + 1)
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
@@ -3,11 +3,14 @@ from .models import Project, Post, Skill, TimelineEvent, Tag
 
 @register(Project)
 class ProjectTranslationOptions(TranslationOptions):
-    fields = ('title', 'short_description', 'full_description')
+    fields = (
+        'title', 'short_description', 'full_description',
+        'full_description_html', 'full_description_toc', 'word_count', 'reading_time',
+    )
 
 @register(Post)
 class PostTranslationOptions(TranslationOptions):
-    fields = ('title', 'content')
+    fields = ('title', 'content', 'content_html', 'content_toc', 'word_count', 'reading_time')
 
 @register(TimelineEvent)
 class TimelineEventTranslationOptions(TranslationOptions):
@@ -5,6 +5,9 @@ urlpatterns = [
     # Skills
     path('skills/', views.SkillListView.as_view(), name='skill-list'),
 
+    # Tags
+    path('tags/', views.TagListView.as_view(), name='tag-list'),
+
     # Projects
     path('projects/', views.ProjectListView.as_view(), name='project-list'),
     path('projects/<slug:slug>/', views.ProjectDetailView.as_view(), name='project-detail'),
@@ -12,6 +15,7 @@ urlpatterns = [
     # Blog Posts
     path('posts/', views.PostListView.as_view(), name='post-list'),
     path('posts/<slug:slug>/', views.PostDetailView.as_view(), name='post-detail'),
+    path('posts/<slug:slug>/comments/', views.PostCommentListView.as_view(), name='post-comment-list'),
 
     # Contact & Comments
     path('contact/', views.ContactCreateView.as_view(), name='contact-create'),
@@ -19,4 +23,14 @@ urlpatterns = [
 
     # Timeline
     path('timeline/', views.TimelineEventListView.as_view(), name='timeline-list'),
+
+    # Home
+    path('home/', views.HomeView.as_view(), name='home'),
+
+    # Search
+    path('search/', views.SearchView.as_view(), name='search'),
+
+    # Analytics
+    path('views/', views.record_view, name='record-view'),
+    path('popular/', views.PopularListView.as_view(), name='popular'),
 ]
\ No newline at end of file
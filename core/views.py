@@ -1,14 +1,43 @@
+import datetime
+import json
+
+from django.conf import settings
+from django.core.validators import validate_slug
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+from django.utils import translation
+from django.contrib.admin.views.decorators import staff_member_required
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST, require_safe
+from markdownx.views import ImageUploadView
 from rest_framework import generics
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework import status
 
-from .models import Project, Skill, Post, ContactMessage, Comment, TimelineEvent
+from modeltranslation.utils import get_language
+
+from . import analytics, metrics, search, syndication
+from .forms import DerivativeImageForm
+from .jobs import enqueue
+from .cache import CachedResponseMixin, view_versions
+from .conditional import ConditionalGetMixin
+from .pagination import CommentPagination, KeysetPagination
+from .routers import ReplicaReadMixin
+from .i18n import ActiveTranslationsMixin, active_translations
+from .rows import RowListMixin
+from .streaming import StreamingListMixin
+from .throttling import WriteRateThrottle
+from .models import Tag, Project, Skill, Post, ContactMessage, Comment, TimelineEvent, DailyView
 from .serializers import (
+    TagCountSerializer,
     ProjectSerializer, 
+    ProjectSummarySerializer,
     SkillSerializer, 
     PostSerializer, 
+    PostSummarySerializer,
     ContactMessageSerializer,
     CommentSerializer,
     TimelineEventSerializer
@@ -17,22 +46,49 @@ from .serializers import (
 # -----------------
 # SKILLS
 # -----------------
-class SkillListView(generics.ListAPIView):
+class SkillListView(ReplicaReadMixin, ActiveTranslationsMixin, RowListMixin, ConditionalGetMixin, CachedResponseMixin, generics.ListAPIView):
+    cache_dependencies = (Skill,)
     queryset = Skill.objects.all()
     serializer_class = SkillSerializer
     permission_classes = [AllowAny]
 
 
+# -----------------
+# TAGS
+# -----------------
+class TagListView(ReplicaReadMixin, RowListMixin, ConditionalGetMixin, CachedResponseMixin, generics.ListAPIView):
+    cache_dependencies = (Tag, Post, Project)
+    queryset = Tag.objects.with_counts().order_by('name')
+    serializer_class = TagCountSerializer
+    permission_classes = [AllowAny]
+
+
 # -----------------
 # PROJECTS
 # -----------------
-class ProjectListView(generics.ListAPIView):
-    queryset = Project.objects.all().order_by('-created_at')
-    serializer_class = ProjectSerializer
+def project_list_queryset(params):
+    """Projects for the list endpoints, narrowed by ``?tag=`` and ``?category=``."""
+    queryset = Project.objects.summaries().order_by('-created_at', '-id')
+    if tag := params.get('tag'):
+        queryset = queryset.filter(tags__slug=tag)
+    if category := params.get('category'):
+        queryset = queryset.filter(category=category)
+    return queryset
+
+class ProjectListView(ReplicaReadMixin, ActiveTranslationsMixin, StreamingListMixin, RowListMixin, ConditionalGetMixin, CachedResponseMixin, generics.ListAPIView):
+    """``?tag=<slug>`` and ``?category=`` narrow the list."""
+    cache_dependencies = (Project, Tag)
+    serializer_class = ProjectSummarySerializer
+    pagination_class = KeysetPagination
+    row_columns = ('created_at',)  # for the cursor
     permission_classes = [AllowAny]
 
-class ProjectDetailView(generics.RetrieveAPIView):
-    queryset = Project.objects.all()
+    def get_queryset(self):
+        return project_list_queryset(self.request.query_params)
+
+class ProjectDetailView(ReplicaReadMixin, ActiveTranslationsMixin, ConditionalGetMixin, CachedResponseMixin, generics.RetrieveAPIView):
+    cache_dependencies = (Project, Tag)
+    queryset = Project.objects.prefetch_related('tags')
     serializer_class = ProjectSerializer
     lookup_field = 'slug'
     permission_classes = [AllowAny]
@@ -41,35 +97,267 @@ class ProjectDetailView(generics.RetrieveAPIView):
 # -----------------
 # BLOG POSTS
 # -----------------
-class PostListView(generics.ListAPIView):
-    queryset = Post.objects.filter(is_active=True).order_by('-created_at')
-    serializer_class = PostSerializer
+def post_list_queryset(params):
+    """Active posts for the list endpoints, narrowed by ``?tag=``."""
+    queryset = Post.objects.filter(is_active=True).summaries().order_by('-created_at', '-id')
+    if tag := params.get('tag'):
+        queryset = queryset.filter(tags__slug=tag)
+    return queryset
+
+class PostListView(ReplicaReadMixin, ActiveTranslationsMixin, StreamingListMixin, RowListMixin, ConditionalGetMixin, CachedResponseMixin, generics.ListAPIView):
+    """``?tag=<slug>`` narrows the list."""
+    cache_dependencies = (Post, Tag, Comment)
+    serializer_class = PostSummarySerializer
+    pagination_class = KeysetPagination
+    row_columns = ('created_at',)  # for the cursor
     permission_classes = [AllowAny]
 
-class PostDetailView(generics.RetrieveAPIView):
-    queryset = Post.objects.filter(is_active=True)
+    def get_queryset(self):
+        # Built per request: the excerpt annotation depends on the active language.
+        return post_list_queryset(self.request.query_params)
+
+class PostDetailView(ReplicaReadMixin, ActiveTranslationsMixin, ConditionalGetMixin, CachedResponseMixin, generics.RetrieveAPIView):
+    cache_dependencies = (Post, Tag, Comment)
+    queryset = Post.objects.filter(is_active=True).with_approved_comments(limit=CommentPagination.page_size)
     serializer_class = PostSerializer
     lookup_field = 'slug'
     permission_classes = [AllowAny]
 
+class PostCommentListView(ReplicaReadMixin, ActiveTranslationsMixin, CachedResponseMixin, generics.ListAPIView):
+    cache_dependencies = (Comment, Post)
+    serializer_class = CommentSerializer
+    pagination_class = CommentPagination
+    permission_classes = [AllowAny]
+
+    def get_queryset(self):
+        return Comment.objects.filter(
+            post__slug=self.kwargs['slug'], post__is_active=True, is_approved=True
+        )
+
 
 # -----------------
 # CONTACT & COMMENTS
 # -----------------
+# Screening and notifications run in the background (see core/tasks.py).
 class ContactCreateView(generics.CreateAPIView):
     queryset = ContactMessage.objects.all()
     serializer_class = ContactMessageSerializer
     permission_classes = [AllowAny]
+    throttle_classes = [WriteRateThrottle]
+
+    def perform_create(self, serializer):
+        message = serializer.save()
+        enqueue('process_contact_message', pk=message.pk)
 
 class CommentCreateView(generics.CreateAPIView):
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
     permission_classes = [AllowAny]
+    throttle_classes = [WriteRateThrottle]
+
+    def perform_create(self, serializer):
+        comment = serializer.save()
+        enqueue('process_comment', pk=comment.pk)
 
 # -----------------
 # TIMELINE
 # -----------------
-class TimelineEventListView(generics.ListAPIView):
+class TimelineEventListView(ReplicaReadMixin, ActiveTranslationsMixin, RowListMixin, ConditionalGetMixin, CachedResponseMixin, generics.ListAPIView):
+    cache_dependencies = (TimelineEvent,)
     queryset = TimelineEvent.objects.all()
     serializer_class = TimelineEventSerializer
-    permission_classes = [AllowAny]
\ No newline at end of file
+    permission_classes = [AllowAny]
+
+# -----------------
+# HOME
+# -----------------
+class HomeView(ReplicaReadMixin, ConditionalGetMixin, CachedResponseMixin, generics.RetrieveAPIView):
+    """
+    Everything the home page renders, in one response: key skills grouped
+    by category, the latest featured projects, the timeline and the latest
+    posts. ``?lang=`` selects the language (Accept-Language otherwise).
+    """
+    cache_dependencies = (Skill, Project, Post, Tag, Comment, TimelineEvent)
+    permission_classes = [AllowAny]
+    featured_projects = 3
+    latest_posts = 3
+    max_latest_posts = 10
+
+    def dispatch(self, request, *args, **kwargs):
+        lang = request.GET.get('lang')
+        if lang not in dict(settings.LANGUAGES):
+            return super().dispatch(request, *args, **kwargs)
+        with translation.override(lang):
+            response = super().dispatch(request, *args, **kwargs)
+        response['Content-Language'] = lang
+        return response
+
+    def get_last_updated(self, **kwargs):
+        # Every section is tracked by a version stamp already, so the
+        # bundle needs no updated_at lookup of its own.
+        return datetime.datetime.fromtimestamp(
+            view_versions(self)[0] / 1e9, tz=datetime.timezone.utc
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            posts = min(max(int(request.query_params.get('posts', self.latest_posts)), 1), self.max_latest_posts)
+        except ValueError:
+            return Response({'posts': ['A valid integer is required.']}, status=status.HTTP_400_BAD_REQUEST)
+        context = {'request': request}
+
+        skills = {category: [] for category, _ in Skill.CATEGORY_CHOICES}
+        for skill in SkillSerializer(Skill.objects.filter(is_key_skill=True), many=True, context=context).data:
+            skills[skill['category']].append(skill)
+        projects = Project.objects.filter(is_featured=True).summaries().order_by('-created_at', '-id')
+        latest = Post.objects.filter(is_active=True).summaries().order_by('-created_at', '-id')
+        projects, latest, timeline = map(active_translations, (projects, latest, TimelineEvent.objects.all()))
+
+        return Response({
+            'skills': skills,
+            'featured_projects': ProjectSummarySerializer(projects[:self.featured_projects], many=True, context=context).data,
+            'timeline': TimelineEventSerializer(timeline, many=True, context=context).data,
+            'latest_posts': PostSummarySerializer(latest[:posts], many=True, context=context).data,
+        })
+
+# -----------------
+# SEARCH
+# -----------------
+class SearchView(APIView):
+    permission_classes = [AllowAny]
+    max_limit = 50
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        kind = request.query_params.get('type')
+        if kind and kind not in search.DOCUMENTS:
+            return Response({'type': [f'Must be one of: {", ".join(search.DOCUMENTS)}.']}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), self.max_limit)
+        except ValueError:
+            return Response({'limit': ['A valid integer is required.']}, status=status.HTTP_400_BAD_REQUEST)
+        if not query:
+            return Response({'query': query, 'count': 0, 'results': [], 'facets': {'types': {}, 'tags': [], 'categories': []}})
+
+        return Response(search.search(
+            query,
+            get_language(),
+            kinds=(kind,) if kind else tuple(search.DOCUMENTS),
+            tag=request.query_params.get('tag'),
+            category=request.query_params.get('category'),
+            limit=limit,
+        ))
+
+# -----------------
+# ANALYTICS
+# -----------------
+# Page views arrive as beacons with a text/plain JSON body and are only
+# buffered here (see core/analytics.py).
+@csrf_exempt
+@require_POST
+def record_view(request):
+    try:
+        data = json.loads(request.body)
+        kind, slug, referrer = data['kind'], data['slug'], data.get('referrer') or ''
+    except (ValueError, KeyError, TypeError):
+        return HttpResponse(status=400)
+    valid = (
+        kind in analytics.KINDS and isinstance(slug, str) and len(slug) <= 50
+        and validate_slug.regex.match(slug) and isinstance(referrer, str)
+    )
+    if not valid:
+        return HttpResponse(status=400)
+    analytics.record(request, kind, slug, referrer)
+    return HttpResponse(status=204)
+
+class PopularListView(ReplicaReadMixin, CachedResponseMixin, generics.ListAPIView):
+    """
+    The most viewed posts (``?type=project`` for projects) over the last
+    ``?days=`` days, read from the daily rollups. Each item is its list
+    representation plus ``views``.
+    """
+    cache_dependencies = (DailyView, Post, Project)
+    permission_classes = [AllowAny]
+    serializers = {'post': PostSummarySerializer, 'project': ProjectSummarySerializer}
+    max_days = 365
+    max_limit = 20
+
+    def list(self, request, *args, **kwargs):
+        kind = request.query_params.get('type', 'post')
+        if kind not in analytics.KINDS:
+            return Response({'type': [f'Must be one of: {", ".join(analytics.KINDS)}.']}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            days = min(max(int(request.query_params.get('days', 30)), 1), self.max_days)
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), self.max_limit)
+        except ValueError:
+            return Response({'days': ['A valid integer is required.']}, status=status.HTTP_400_BAD_REQUEST)
+
+        views = dict(analytics.popular(kind, days, limit))
+        objects = active_translations(analytics.KINDS[kind]().summaries()).in_bulk(views)
+        items = [objects[pk] for pk in views if pk in objects]
+        data = self.serializers[kind](items, many=True, context={'request': request}).data
+        # Not item['id']: ?fields= may leave it out.
+        return Response([{**item, 'views': views[obj.pk]} for obj, item in zip(items, data)])
+
+# -----------------
+# MARKDOWNX UPLOADS
+# -----------------
+# Only editors upload images, and every upload now queues image processing.
+@method_decorator(staff_member_required, name='dispatch')
+class MarkdownImageUploadView(ImageUploadView):
+    form_class = DerivativeImageForm
+
+
+# -----------------
+# METRICS
+# -----------------
+def metrics_view(request):
+    token = settings.METRICS_TOKEN
+    authorized = request.user.is_staff or (
+        token and constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}')
+    )
+    if not authorized:
+        return HttpResponse(status=403)
+    return HttpResponse(metrics.render_text(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+# -----------------
+# SITEMAPS & FEEDS (see core/syndication.py)
+# -----------------
+def _check_language(lang):
+    if lang not in syndication.languages():
+        raise Http404
+
+
+@require_safe
+def sitemap_index(request):
+    return syndication.serve(request, syndication.INDEX_SECTION, syndication.SITEMAP_TYPE, syndication.build_index)
+
+
+@require_safe
+def sitemap_pages(request, lang):
+    _check_language(lang)
+    return syndication.serve(
+        request, syndication.PAGES_SECTION, syndication.SITEMAP_TYPE, syndication.build_pages, lang,
+    )
+
+
+@require_safe
+def sitemap_shard(request, lang, kind, shard):
+    _check_language(lang)
+    # Checked before any version is stored for the shard.
+    if kind not in syndication.KINDS or not syndication.shard_queryset(kind, shard).exists():
+        raise Http404
+    return syndication.serve(
+        request, syndication.shard_section(kind, shard), syndication.SITEMAP_TYPE,
+        syndication.build_shard, lang, kind, shard,
+    )
+
+
+@require_safe
+def post_feed(request, lang, feed_type):
+    _check_language(lang)
+    _, content_type = syndication.FEED_TYPES[feed_type]
+    return syndication.serve(
+        request, syndication.FEED_SECTION, content_type, syndication.build_feed, lang, feed_type,
+    )
@@ -1,6 +1,7 @@
 import React, { useEffect } from 'react';
-import './i18n';
-import { BrowserRouter as Router, Routes, Route, useLocation } from 'react-router-dom';
+import { useTranslation } from 'react-i18next';
+import { LANGUAGES } from './i18n';
+import { BrowserRouter as Router, Routes, Route, Outlet, useLocation, useParams } from 'react-router-dom';
 import Navbar from './components/Navbar';
 import Home from './components/Home';
 import ProjectsPage from './components/ProjectsPage';
@@ -24,6 +25,22 @@ const ScrollToAnchor = () => {
   return null;
 };
 
+// /en/..., /fr/..., /ar/...: the same pages in the language of the prefix
+// (the unprefixed routes use the visitor's saved or browser language).
+const LanguagePrefix = () => {
+  const { lang } = useParams();
+  const { i18n } = useTranslation();
+  const supported = LANGUAGES.includes(lang);
+
+  useEffect(() => {
+    if (supported && i18n.language !== lang) {
+      i18n.changeLanguage(lang);
+    }
+  }, [lang, supported, i18n]);
+
+  return supported ? <Outlet /> : null;
+};
+
 // Wrapper to conditionally render Navbar or handle layout changes if needed
 const Layout = () => {
   return (
@@ -36,6 +53,13 @@ const Layout = () => {
         <Route path="/projects/:slug" element={<ProjectDetail />} />
         <Route path="/blog" element={<Blog />} />
         <Route path="/blog/:slug" element={<BlogPost />} />
+        <Route path="/:lang" element={<LanguagePrefix />}>
+          <Route index element={<Home />} />
+          <Route path="projects" element={<ProjectsPage />} />
+          <Route path="projects/:slug" element={<ProjectDetail />} />
+          <Route path="blog" element={<Blog />} />
+          <Route path="blog/:slug" element={<BlogPost />} />
+        </Route>
       </Routes>
     </div>
   );
@@ -1,12 +1,27 @@
 import axios from 'axios';
 
 const API_URL = import.meta.env.VITE_API_URL || 'http://127.0.0.1:8000/api';
+// Host of the API, which also serves the uploads (/media/...)
+export const BACKEND_URL = API_URL.replace(/\/api\/?$/, '');
+// Optional static copy of the read endpoints (manage.py export_api_snapshot),
+// e.g. served from the CDN. Writes and search always go to the API.
+const SNAPSHOT_URL = import.meta.env.VITE_SNAPSHOT_URL;
+const SNAPSHOT_LANGUAGES = ['en', 'fr', 'ar'];
+
+const getJSON = (path, lang) => {
+    if (SNAPSHOT_URL) {
+        const code = lang.split('-')[0];
+        const snapshotLang = SNAPSHOT_LANGUAGES.includes(code) ? code : 'en';
+        return axios.get(`${SNAPSHOT_URL}/${snapshotLang}/${path}index.json`);
+    }
+    return axios.get(`${API_URL}/${path}`, {
+        headers: { 'Accept-Language': lang }
+    });
+};
 
 export const fetchTimelineEvents = async (lang = 'en') => {
     try {
-        const response = await axios.get(`${API_URL}/timeline/`, {
-            headers: { 'Accept-Language': lang }
-        });
+        const response = await getJSON('timeline/', lang);
         return response.data;
     } catch (error) {
         console.error("Error fetching timeline events:", error);
@@ -16,9 +31,7 @@ export const fetchTimelineEvents = async (lang = 'en') => {
 
 export const fetchSkills = async (lang = 'en') => {
     try {
-        const response = await axios.get(`${API_URL}/skills/`, {
-            headers: { 'Accept-Language': lang }
-        });
+        const response = await getJSON('skills/', lang);
         return response.data;
     } catch (error) {
         console.error("Error fetching skills:", error);
@@ -28,9 +41,7 @@ export const fetchSkills = async (lang = 'en') => {
 
 export const fetchProjects = async (lang = 'en') => {
     try {
-        const response = await axios.get(`${API_URL}/projects/`, {
-            headers: { 'Accept-Language': lang }
-        });
+        const response = await getJSON('projects/', lang);
         return response.data;
     } catch (error) {
         console.error("Error fetching projects:", error);
@@ -38,11 +49,19 @@ export const fetchProjects = async (lang = 'en') => {
     }
 };
 
+export const fetchHome = async (lang = 'en') => {
+    try {
+        const response = await getJSON('home/', lang);
+        return response.data;
+    } catch (error) {
+        console.error("Error fetching home page:", error);
+        return null;
+    }
+};
+
 export const fetchProjectBySlug = async (slug, lang = 'en') => {
     try {
-        const response = await axios.get(`${API_URL}/projects/${slug}/`, {
-            headers: { 'Accept-Language': lang }
-        });
+        const response = await getJSON(`projects/${slug}/`, lang);
         return response.data;
     } catch (error) {
         console.error("Error fetching project details:", error);
@@ -60,11 +79,19 @@ export const sendContactMessage = async (data) => {
     }
 };
 
+export const fetchTags = async (lang = 'en') => {
+    try {
+        const response = await getJSON('tags/', lang);
+        return response.data;
+    } catch (error) {
+        console.error("Error fetching tags:", error);
+        return [];
+    }
+};
+
 export const fetchPosts = async (lang = 'en') => {
     try {
-        const response = await axios.get(`${API_URL}/posts/`, {
-            headers: { 'Accept-Language': lang }
-        });
+        const response = await getJSON('posts/', lang);
         return response.data;
     } catch (error) {
         console.error("Error fetching posts:", error);
@@ -74,9 +101,7 @@ export const fetchPosts = async (lang = 'en') => {
 
 export const fetchPostBySlug = async (slug, lang = 'en') => {
     try {
-        const response = await axios.get(`${API_URL}/posts/${slug}/`, {
-            headers: { 'Accept-Language': lang }
-        });
+        const response = await getJSON(`posts/${slug}/`, lang);
         return response.data;
     } catch (error) {
         console.error("Error fetching post details:", error);
@@ -93,3 +118,24 @@ export const createComment = async (data) => {
         throw error;
     }
 };
+
+export const searchContent = async (query, lang = 'en', params = {}) => {
+    try {
+        const response = await axios.get(`${API_URL}/search/`, {
+            params: { q: query, ...params },
+            headers: { 'Accept-Language': lang }
+        });
+        return response.data;
+    } catch (error) {
+        console.error("Error searching content:", error);
+        return { results: [], facets: { tags: [], categories: [], types: {} } };
+    }
+};
+
+// Page view beacon: fire-and-forget, counted in batches by the API (core/analytics.py).
+// text/plain keeps it a simple CORS request.
+export const recordView = (kind, slug) => {
+    const body = JSON.stringify({ kind, slug, referrer: document.referrer });
+    if (navigator.sendBeacon && navigator.sendBeacon(`${API_URL}/views/`, body)) return;
+    axios.post(`${API_URL}/views/`, body, { headers: { 'Content-Type': 'text/plain' } }).catch(() => {});
+};
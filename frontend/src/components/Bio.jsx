@@ -3,21 +3,25 @@ import { motion, AnimatePresence } from 'framer-motion';
 import { fetchTimelineEvents } from '../api';
 import { useTranslation } from 'react-i18next';
 
-const Bio = () => {
+const Bio = ({ events: initialEvents }) => {
     const { t, i18n } = useTranslation();
-    const [events, setEvents] = useState([]);
+    const [events, setEvents] = useState(initialEvents || []);
     const [activeIndex, setActiveIndex] = useState(0);
     const [isPaused, setIsPaused] = useState(false);
     const intervalRef = useRef(null);
 
     useEffect(() => {
+        if (initialEvents) {
+            setEvents(initialEvents);
+            return;
+        }
         const loadEvents = async () => {
             const data = await fetchTimelineEvents(i18n.language);
             // Sort by order if needed, assuming backend does it but good to be safe
             setEvents(data);
         };
         loadEvents();
-    }, [i18n.language]);
+    }, [i18n.language, initialEvents]);
 
     useEffect(() => {
         if (events.length === 0) return;
@@ -2,7 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
 import { motion } from 'framer-motion';
 import { Search, Clock, Calendar } from 'lucide-react';
-import { fetchPosts } from '../api';
+import { fetchPosts, fetchTags, searchContent } from '../api';
 import { useTranslation } from 'react-i18next';
 
 const Blog = () => {
@@ -17,16 +17,15 @@ const Blog = () => {
     useEffect(() => {
         const loadPosts = async () => {
             setLoading(true);
-            const data = await fetchPosts(i18n.language);
+            const [data, tagList] = await Promise.all([
+                fetchPosts(i18n.language),
+                fetchTags(i18n.language),
+            ]);
             setPosts(data);
             setFilteredPosts(data);
 
-            // Extract unique tags
-            const allTags = new Set(['All']);
-            data.forEach(post => {
-                post.tags.forEach(tag => allTags.add(tag.name));
-            });
-            setTags(Array.from(allTags));
+            // Tags with at least one published post (counted server-side)
+            setTags(['All', ...tagList.filter(tag => tag.post_count > 0).map(tag => tag.name)]);
 
             setLoading(false);
         };
@@ -34,33 +33,36 @@ const Blog = () => {
     }, [i18n.language]);
 
     useEffect(() => {
-        let result = posts;
-
-        // Filter by Search
-        if (searchTerm) {
-            const lowerTerm = searchTerm.toLowerCase();
-            result = result.filter(post =>
-                post.title.toLowerCase().includes(lowerTerm) ||
-                post.content.toLowerCase().includes(lowerTerm)
-            );
-        }
-
-        // Filter by Tag
-        if (selectedTag !== 'All') {
-            result = result.filter(post =>
-                post.tags.some(tag => tag.name === selectedTag)
-            );
-        }
-
-        setFilteredPosts(result);
-    }, [searchTerm, selectedTag, posts]);
-
-    // Calculate Read Time (approx 200 words per minute)
-    const calculateReadTime = (content) => {
-        const words = content.trim().split(/\s+/).length;
-        const time = Math.ceil(words / 200);
-        return `${time} ${t('blog.read_time')}`;
-    };
+        let cancelled = false;
+
+        const applyFilters = async () => {
+            let result = posts;
+
+            // Filter by Search (ranked server-side, across all translations)
+            if (searchTerm.trim()) {
+                const data = await searchContent(searchTerm, i18n.language, { type: 'post', limit: 50 });
+                const ranked = data.results.map(hit => hit.slug);
+                result = ranked
+                    .map(slug => posts.find(post => post.slug === slug))
+                    .filter(Boolean);
+            }
+
+            // Filter by Tag
+            if (selectedTag !== 'All') {
+                result = result.filter(post =>
+                    post.tags.some(tag => tag.name === selectedTag)
+                );
+            }
+
+            if (!cancelled) setFilteredPosts(result);
+        };
+        applyFilters();
+
+        return () => { cancelled = true; };
+    }, [searchTerm, selectedTag, posts, i18n.language]);
+
+    // Read time is computed by the API (approx 200 words per minute)
+    const formatReadTime = (minutes) => `${minutes} ${t('blog.read_time')}`;
 
     return (
         <div className="min-h-screen bg-primary-bg text-primary-text pt-28 pb-20 px-6">
@@ -127,7 +129,7 @@ const Blog = () => {
                                         <span>•</span>
                                         <span className="flex items-center gap-1">
                                             <Clock size={14} />
-                                            {calculateReadTime(post.content)}
+                                            {formatReadTime(post.reading_time)}
                                         </span>
                                     </div>
 
@@ -139,8 +141,7 @@ const Blog = () => {
                                 </div>
 
                                 <p className="text-zinc-600 dark:text-zinc-300 leading-relaxed mb-4 line-clamp-2 md:line-clamp-3 md:w-3/4">
-                                    {/* Strip markdown for excerpt if needed, or just show raw/formatted text */}
-                                    {post.content.replace(/[#*`]/g, '').slice(0, 180)}...
+                                    {post.excerpt}
                                 </p>
 
                                 <div className="flex gap-2 mt-4">
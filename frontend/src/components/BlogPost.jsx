@@ -2,39 +2,17 @@ import React, { useEffect, useState } from 'react';
 import { useParams, Link } from 'react-router-dom';
 import { motion } from 'framer-motion';
 import { ArrowLeft, Clock, Calendar, Send } from 'lucide-react';
-import ReactMarkdown from 'react-markdown';
-import remarkMath from 'remark-math';
-import rehypeKatex from 'rehype-katex';
-import SyntaxHighlighter from 'react-syntax-highlighter';
-import { atomOneDark } from 'react-syntax-highlighter/dist/esm/styles/hljs';
-import 'katex/dist/katex.min.css';
 import { useTranslation } from 'react-i18next';
 
-import { fetchPostBySlug, createComment } from '../api';
+import RelatedContent from './RelatedContent';
+import RenderedMarkdown from './RenderedMarkdown';
+import { fetchPostBySlug, createComment, recordView } from '../api';
 
-const slugify = (text) => {
-    if (!text) return '';
-    return String(text)
-        .toLowerCase()
-        .trim()
-        .replace(/\s+/g, '-')     // Replace spaces with -
-        .replace(/[^\w\-]+/g, '') // Remove all non-word chars
-        .replace(/\-\-+/g, '-');  // Replace multiple - with single -
-};
-
-const getTextFromChildren = (children) => {
-    let text = '';
-    React.Children.forEach(children, (child) => {
-        if (typeof child === 'string' || typeof child === 'number') {
-            text += child;
-        } else if (child?.props?.children) {
-            text += getTextFromChildren(child.props.children);
-        } else if (Array.isArray(child)) {
-            text += getTextFromChildren(child);
-        }
-    });
-    return text;
-};
+// The API's nested TOC, flattened for the sidebar (levels 1-3).
+const flattenToc = (entries) => entries.flatMap(({ id, title, level, children }) => [
+    ...(level <= 3 ? [{ id, text: title, level }] : []),
+    ...flattenToc(children),
+]);
 
 const BlogPost = () => {
     const { t, i18n } = useTranslation();
@@ -48,6 +26,10 @@ const BlogPost = () => {
     const [commentData, setCommentData] = useState({ author_name: '', body: '' });
     const [commentStatus, setCommentStatus] = useState('IDLE');
 
+    useEffect(() => {
+        recordView('post', slug);
+    }, [slug]);
+
     useEffect(() => {
         const loadPost = async () => {
             setLoading(true);
@@ -55,27 +37,7 @@ const BlogPost = () => {
             setPost(data);
             setLoading(false);
 
-            if (data && data.content) {
-                // Extract headings for TOC
-                // Matches standard Markdown headings with up to 3 leading spaces
-                const headingRegex = /^\s{0,3}(#{1,3})\s+(.*)$/;
-
-                const lines = data.content.split(/\r?\n/);
-                const extractedHeadings = lines
-                    .map(line => {
-                        const match = line.match(headingRegex);
-                        if (!match) return null; // No match
-
-                        // match[1] is hashes, match[2] is text
-                        const level = match[1].length;
-                        const text = match[2].trim();
-                        const id = slugify(text);
-                        return { id, text, level };
-                    })
-                    .filter(Boolean); // Remove nulls
-
-                setHeadings(extractedHeadings);
-            }
+            setHeadings(data ? flattenToc(data.toc) : []);
         };
         loadPost();
     }, [slug, i18n.language]);
@@ -136,16 +98,6 @@ const BlogPost = () => {
         }
     };
 
-    const HeadingRenderer = ({ level, children, ...props }) => {
-        const text = getTextFromChildren(children);
-        const id = slugify(text);
-
-        // Dynamic tag generation
-        const Tag = `h${level}`;
-
-        return <Tag id={id} {...props}>{children}</Tag>;
-    };
-
     if (loading) {
         return (
             <div className="min-h-screen flex items-center justify-center bg-primary-bg text-primary-text">
@@ -165,9 +117,6 @@ const BlogPost = () => {
         );
     }
 
-    // Calculate Read Time
-    const readTime = Math.ceil(post.content.trim().split(/\s+/).length / 200);
-
     return (
         <article className="min-h-screen bg-primary-bg text-primary-text pb-20 pt-28">
 
@@ -194,7 +143,7 @@ const BlogPost = () => {
                             <span>•</span>
                             <span className="flex items-center gap-1">
                                 <Clock size={14} />
-                                {readTime} {t('blog.read_time')}
+                                {post.reading_time} {t('blog.read_time')}
                             </span>
                         </div>
 
@@ -211,49 +160,12 @@ const BlogPost = () => {
                         </div>
                     </div>
 
-                    <div className="prose prose-lg prose-zinc dark:prose-invert max-w-none prose-headings:scroll-mt-32 prose-headings:font-bold prose-a:text-accent hover:prose-a:underline prose-img:rounded-xl prose-img:mx-auto">
-                        <ReactMarkdown
-                            remarkPlugins={[remarkMath]}
-                            rehypePlugins={[rehypeKatex]}
-                            components={{
-                                code({ node, inline, className, children, ...props }) {
-                                    const match = /language-(\w+)/.exec(className || '')
-                                    return !inline && match ? (
-                                        <SyntaxHighlighter
-                                            style={atomOneDark}
-                                            language={match[1]}
-                                            PreTag="div"
-                                            className="rounded-lg shadow-lg !bg-zinc-900 !p-6 my-6 text-sm"
-                                            {...props}
-                                        >
-                                            {String(children).replace(/\n$/, '')}
-                                        </SyntaxHighlighter>
-                                    ) : (
-                                        <code className={`${className} bg-zinc-100 dark:bg-zinc-800 text-red-500 rounded px-1 py-0.5`} {...props}>
-                                            {children}
-                                        </code>
-                                    )
-                                },
-                                img({ node, ...props }) {
-                                    // Backend URL fix
-                                    const src = props.src.startsWith('http') ? props.src : `http://127.0.0.1:8000${props.src}`;
-                                    return (
-                                        <img
-                                            {...props}
-                                            src={src}
-                                            className="rounded-xl shadow-lg my-8 max-w-full w-auto h-auto mx-auto block"
-                                        />
-                                    );
-                                },
-                                // Add IDs to headings for TOC
-                                h1: (props) => <HeadingRenderer level={1} {...props} />,
-                                h2: (props) => <HeadingRenderer level={2} {...props} />,
-                                h3: (props) => <HeadingRenderer level={3} {...props} />
-                            }}
-                        >
-                            {post.content}
-                        </ReactMarkdown>
-                    </div>
+                    <RenderedMarkdown
+                        html={post.content_html}
+                        className="prose prose-lg prose-zinc dark:prose-invert max-w-none prose-headings:scroll-mt-32 prose-headings:font-bold prose-a:text-accent hover:prose-a:underline prose-img:rounded-xl prose-img:shadow-lg prose-img:my-8 prose-img:mx-auto prose-pre:rounded-lg prose-pre:shadow-lg prose-pre:bg-zinc-900 prose-pre:p-6 prose-pre:my-6 prose-pre:text-sm [&_:not(pre)>code]:bg-zinc-100 dark:[&_:not(pre)>code]:bg-zinc-800 [&_:not(pre)>code]:text-red-500 [&_:not(pre)>code]:rounded [&_:not(pre)>code]:px-1 [&_:not(pre)>code]:py-0.5"
+                    />
+
+                    <RelatedContent items={post.related} />
 
                     {/* Comments Section */}
                     <div className="mt-20 pt-12 border-t border-zinc-100 dark:border-zinc-800">
@@ -1,4 +1,6 @@
-import React from 'react';
+import React, { useState, useEffect, useMemo } from 'react';
+import { useTranslation } from 'react-i18next';
+import { fetchHome } from '../api';
 import Hero from './Hero';
 import Bio from './Bio';
 import Projects from './Projects';
@@ -6,12 +8,36 @@ import Skills from './Skills';
 import Contact from './Contact';
 
 const Home = () => {
+    const { i18n } = useTranslation();
+    const [home, setHome] = useState(null);
+
+    // One request for every section; each one falls back to its own
+    // endpoint if the bundle fails to load.
+    useEffect(() => {
+        let cancelled = false;
+        setHome(null);
+        fetchHome(i18n.language).then((data) => {
+            if (!cancelled) setHome(data || false);
+        });
+        return () => { cancelled = true; };
+    }, [i18n.language]);
+
+    const keySkills = useMemo(() => (home ? Object.values(home.skills).flat() : undefined), [home]);
+
+    if (home === null) {
+        return (
+            <main>
+                <Hero />
+            </main>
+        );
+    }
+
     return (
         <main>
             <Hero />
-            <Bio />
-            <Skills />
-            <Projects />
+            <Bio events={home ? home.timeline : undefined} />
+            <Skills skills={keySkills} />
+            <Projects projects={home ? home.featured_projects : undefined} />
             <Contact />
         </main>
     );
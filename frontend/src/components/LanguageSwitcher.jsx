@@ -1,16 +1,26 @@
 import React, { useEffect, useState, useRef } from 'react';
 import { useTranslation } from 'react-i18next';
+import { useLocation, useNavigate } from 'react-router-dom';
 import { Globe, Check } from 'lucide-react';
 import { motion, AnimatePresence } from 'framer-motion';
+import { LANGUAGES } from '../i18n';
 
 const LanguageSwitcher = () => {
     const { i18n } = useTranslation();
     const [isOpen, setIsOpen] = useState(false);
     const dropdownRef = useRef(null);
 
+    const location = useLocation();
+    const navigate = useNavigate();
+
     const changeLanguage = (lng) => {
         i18n.changeLanguage(lng);
         setIsOpen(false);
+        // On a language-prefixed URL, the prefix has to follow the choice.
+        const [, prefix, ...rest] = location.pathname.split('/');
+        if (LANGUAGES.includes(prefix)) {
+            navigate(`/${[lng, ...rest].join('/')}${location.search}${location.hash}`);
+        }
     };
 
     useEffect(() => {
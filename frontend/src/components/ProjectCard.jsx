@@ -2,6 +2,7 @@ import React from 'react';
 import { motion } from 'framer-motion';
 import { Github, ExternalLink } from 'lucide-react';
 import { useNavigate } from 'react-router-dom';
+import ResponsiveImage from './ResponsiveImage';
 
 const ProjectCard = ({ project }) => {
     const navigate = useNavigate();
@@ -19,9 +20,11 @@ const ProjectCard = ({ project }) => {
             {/* Top Half - Thumbnail */}
             <div className="relative aspect-video overflow-hidden">
                 <div className="absolute inset-0 bg-black/0 group-hover:bg-black/10 z-10 transition-colors duration-300" />
-                <img
+                <ResponsiveImage
                     src={project.thumbnail}
+                    image={project.thumbnail_image}
                     alt={project.title}
+                    sizes="(min-width: 1024px) 33vw, (min-width: 768px) 50vw, 100vw"
                     className="w-full h-full object-cover transform group-hover:scale-105 transition-transform duration-500"
                 />
             </div>
@@ -2,15 +2,12 @@ import React, { useEffect, useState } from 'react';
 import { useParams, Link } from 'react-router-dom';
 import { motion } from 'framer-motion';
 import { ArrowLeft, Github, ExternalLink, ArrowRight } from 'lucide-react';
-import ReactMarkdown from 'react-markdown';
-import remarkMath from 'remark-math';
-import rehypeKatex from 'rehype-katex';
-import SyntaxHighlighter from 'react-syntax-highlighter';
-import { atomOneDark } from 'react-syntax-highlighter/dist/esm/styles/hljs';
-import 'katex/dist/katex.min.css';
 import { useTranslation } from 'react-i18next';
+import ResponsiveImage from './ResponsiveImage';
+import RelatedContent from './RelatedContent';
+import RenderedMarkdown from './RenderedMarkdown';
 
-import { fetchProjectBySlug } from '../api';
+import { fetchProjectBySlug, recordView } from '../api';
 
 const ProjectDetail = () => {
     const { t, i18n } = useTranslation();
@@ -18,6 +15,10 @@ const ProjectDetail = () => {
     const [project, setProject] = useState(null);
     const [loading, setLoading] = useState(true);
 
+    useEffect(() => {
+        recordView('project', slug);
+    }, [slug]);
+
     useEffect(() => {
         const loadProject = async () => {
             setLoading(true);
@@ -96,9 +97,12 @@ const ProjectDetail = () => {
                     transition={{ duration: 0.6 }}
                     className="rounded-xl overflow-hidden shadow-2xl bg-zinc-100"
                 >
-                    <img
+                    <ResponsiveImage
                         src={project.thumbnail}
+                        image={project.thumbnail_image}
                         alt={project.title}
+                        sizes="(min-width: 896px) 896px, 100vw"
+                        loading="eager"
                         className="w-full h-auto max-h-[45vh] object-contain bg-zinc-200 dark:bg-zinc-800"
                     />
                 </motion.div>
@@ -114,56 +118,13 @@ const ProjectDetail = () => {
             </div>
 
             {/* Content Body */}
-            <div className="max-w-4xl mx-auto px-6 prose prose-lg prose-zinc dark:prose-invert prose-headings:font-bold prose-h2:text-2xl prose-h2:mt-12 prose-h2:mb-6 prose-a:text-accent hover:prose-a:underline prose-blockquote:border-l-4 prose-blockquote:border-accent prose-blockquote:bg-zinc-50 dark:prose-blockquote:bg-zinc-900 prose-blockquote:py-2 prose-blockquote:px-4 prose-blockquote:rounded-r-lg prose-img:rounded-xl">
-                <ReactMarkdown
-                    remarkPlugins={[remarkMath]}
-                    rehypePlugins={[rehypeKatex]}
-                    components={{
-                        code({ node, inline, className, children, ...props }) {
-                            const match = /language-(\w+)/.exec(className || '')
-                            return !inline && match ? (
-                                <SyntaxHighlighter
-                                    style={atomOneDark}
-                                    language={match[1]}
-                                    PreTag="div"
-                                    className="rounded-lg shadow-lg !bg-zinc-900 !p-6 my-6 text-sm"
-                                    {...props}
-                                >
-                                    {String(children).replace(/\n$/, '')}
-                                </SyntaxHighlighter>
-                            ) : (
-                                <code className={`${className} !bg-zinc-100 dark:!bg-zinc-900 !text-red-500 rounded px-1 py-0.5 font-mono text-sm`} {...props}>
-                                    {children}
-                                </code>
-                            )
-                        },
-                        img({ node, ...props }) {
-                            // Fix for relative media paths from Django/MarkdownX
-                            let src = props.src;
-                            if (src && !src.startsWith('http')) {
-                                // Derive base URL from API_URL (remove /api suffix if present) or default to localhost
-                                const apiUrl = import.meta.env.VITE_API_URL || 'http://127.0.0.1:8000/api';
-                                const baseUrl = apiUrl.includes('/api')
-                                    ? apiUrl.split('/api')[0]
-                                    : apiUrl;
-
-                                // Ensure src starts with / if not present (MarkdownX usually provides /media/...)
-                                const cleanSrc = src.startsWith('/') ? src : `/${src}`;
-                                src = `${baseUrl}${cleanSrc}`;
-                            }
-
-                            return (
-                                <img
-                                    {...props}
-                                    src={src}
-                                    className="rounded-xl shadow-lg my-8 max-w-full w-auto h-auto mx-auto block"
-                                />
-                            );
-                        }
-                    }}
-                >
-                    {project.full_description}
-                </ReactMarkdown>
+            <RenderedMarkdown
+                html={project.full_description_html}
+                className="max-w-4xl mx-auto px-6 prose prose-lg prose-zinc dark:prose-invert prose-headings:font-bold prose-h2:text-2xl prose-h2:mt-12 prose-h2:mb-6 prose-a:text-accent hover:prose-a:underline prose-blockquote:border-l-4 prose-blockquote:border-accent prose-blockquote:bg-zinc-50 dark:prose-blockquote:bg-zinc-900 prose-blockquote:py-2 prose-blockquote:px-4 prose-blockquote:rounded-r-lg prose-img:rounded-xl prose-img:shadow-lg prose-img:my-8 prose-img:mx-auto prose-pre:rounded-lg prose-pre:shadow-lg prose-pre:bg-zinc-900 prose-pre:p-6 prose-pre:my-6 prose-pre:text-sm [&_:not(pre)>code]:bg-zinc-100 dark:[&_:not(pre)>code]:bg-zinc-900 [&_:not(pre)>code]:text-red-500 [&_:not(pre)>code]:rounded [&_:not(pre)>code]:px-1 [&_:not(pre)>code]:py-0.5 [&_:not(pre)>code]:font-mono [&_:not(pre)>code]:text-sm"
+            />
+
+            <div className="max-w-4xl mx-auto px-6">
+                <RelatedContent items={project.related} />
             </div>
 
             {/* Footer */}
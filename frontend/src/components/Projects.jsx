@@ -6,14 +6,19 @@ import { fetchProjects } from '../api';
 import ProjectCard from './ProjectCard';
 import { useTranslation } from 'react-i18next';
 
-const Projects = ({ isArchive = false }) => {
+const Projects = ({ isArchive = false, projects: initialProjects }) => {
     const { t, i18n } = useTranslation();
-    const [projects, setProjects] = useState([]);
-    const [loading, setLoading] = useState(true);
+    const [projects, setProjects] = useState(initialProjects || []);
+    const [loading, setLoading] = useState(!initialProjects);
     const [filter, setFilter] = useState('FULL_STACK');
     const [filteredProjects, setFilteredProjects] = useState([]);
 
     useEffect(() => {
+        if (initialProjects) {
+            setProjects(initialProjects);
+            setLoading(false);
+            return;
+        }
         const loadProjects = async () => {
             setLoading(true);
             const data = await fetchProjects(i18n.language);
@@ -21,7 +26,7 @@ const Projects = ({ isArchive = false }) => {
             setLoading(false);
         };
         loadProjects();
-    }, [i18n.language]);
+    }, [i18n.language, initialProjects]);
 
     useEffect(() => {
         let result = [];
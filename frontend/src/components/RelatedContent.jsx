@@ -0,0 +1,38 @@
+import React from 'react';
+import { Link } from 'react-router-dom';
+import { ArrowRight } from 'lucide-react';
+import { useTranslation } from 'react-i18next';
+
+// Precomputed by the API (core/recommendations.py) and embedded in the detail response
+const RelatedContent = ({ items }) => {
+    const { t } = useTranslation();
+
+    if (!items || items.length === 0) return null;
+
+    return (
+        <div className="mt-20 pt-12 border-t border-zinc-100 dark:border-zinc-800">
+            <h3 className="text-2xl font-bold mb-8">{t('related.title')}</h3>
+            <div className="grid gap-4 sm:grid-cols-2">
+                {items.map(item => (
+                    <Link
+                        key={`${item.kind}-${item.slug}`}
+                        to={item.kind === 'post' ? `/blog/${item.slug}` : `/projects/${item.slug}`}
+                        className="group flex items-center justify-between gap-4 p-5 rounded-xl border border-zinc-100 dark:border-zinc-800 hover:border-accent transition-colors"
+                    >
+                        <div>
+                            <span className="block text-xs font-semibold uppercase tracking-wider text-zinc-400 mb-1">
+                                {t(item.kind === 'post' ? 'related.post' : 'related.project')}
+                            </span>
+                            <span className="font-semibold text-primary-text group-hover:text-accent transition-colors">
+                                {item.title}
+                            </span>
+                        </div>
+                        <ArrowRight size={18} className="shrink-0 text-zinc-400 group-hover:translate-x-1 transition-transform" />
+                    </Link>
+                ))}
+            </div>
+        </div>
+    );
+};
+
+export default RelatedContent;
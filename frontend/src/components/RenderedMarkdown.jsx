@@ -0,0 +1,48 @@
+import React, { useEffect, useRef } from 'react';
+import katex from 'katex';
+import hljs from 'highlight.js';
+import 'katex/dist/katex.min.css';
+import 'highlight.js/styles/atom-one-dark.css';
+
+import { BACKEND_URL } from '../api';
+
+// Uploads are linked as /media/... paths on the API's host.
+const absolute = (url) => (url.startsWith('/') && !url.startsWith('//') ? `${BACKEND_URL}${url}` : url);
+
+// Body HTML rendered and sanitized by the API (core/rendering.py). TeX is
+// left in .math-inline / .math-display elements and code blocks carry a
+// language-* class, so only typesetting and highlighting happen here.
+const RenderedMarkdown = ({ html, className }) => {
+    const ref = useRef(null);
+
+    useEffect(() => {
+        const root = ref.current;
+        if (!root) return;
+
+        root.querySelectorAll('.math-inline, .math-display').forEach((el) => {
+            katex.render(el.textContent, el, {
+                displayMode: el.classList.contains('math-display'),
+                throwOnError: false,
+            });
+        });
+        root.querySelectorAll('pre code[class*="language-"]').forEach((el) => {
+            hljs.highlightElement(el);
+        });
+        root.querySelectorAll('img[src]').forEach((img) => {
+            img.src = absolute(img.getAttribute('src'));
+        });
+        root.querySelectorAll('source[srcset]').forEach((source) => {
+            source.srcset = source.getAttribute('srcset')
+                .split(', ')
+                .map((candidate) => {
+                    const [url, width] = candidate.split(' ');
+                    return `${absolute(url)} ${width}`;
+                })
+                .join(', ');
+        });
+    }, [html]);
+
+    return <div ref={ref} className={className} dangerouslySetInnerHTML={{ __html: html }} />;
+};
+
+export default RenderedMarkdown;
@@ -0,0 +1,29 @@
+import React from 'react';
+
+// Renders the `*_image` structure from the API (AVIF/WebP srcsets plus a
+// blurred placeholder), falling back to the original upload.
+const ResponsiveImage = ({ src, image, alt, className, sizes = '100vw', loading = 'lazy' }) => {
+    if (!image) {
+        return <img src={src} alt={alt} className={className} loading={loading} />;
+    }
+
+    return (
+        <picture>
+            {image.sources.map((source) => (
+                <source key={source.type} type={source.type} srcSet={source.srcset} sizes={sizes} />
+            ))}
+            <img
+                src={src}
+                alt={alt}
+                width={image.width}
+                height={image.height}
+                loading={loading}
+                decoding="async"
+                className={className}
+                style={{ backgroundImage: `url(${image.placeholder})`, backgroundSize: 'cover' }}
+            />
+        </picture>
+    );
+};
+
+export default ResponsiveImage;
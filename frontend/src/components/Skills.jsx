@@ -3,13 +3,18 @@ import { motion, AnimatePresence } from 'framer-motion';
 import { fetchSkills } from '../api';
 import { useTranslation } from 'react-i18next';
 
-const Skills = () => {
+const Skills = ({ skills: initialSkills }) => {
     const { t, i18n } = useTranslation();
-    const [skills, setSkills] = useState([]);
-    const [loading, setLoading] = useState(true);
+    const [skills, setSkills] = useState(initialSkills || []);
+    const [loading, setLoading] = useState(!initialSkills);
     const [activeTab, setActiveTab] = useState('WEB'); // 'WEB' or 'DATA'
 
     useEffect(() => {
+        if (initialSkills) {
+            setSkills(initialSkills);
+            setLoading(false);
+            return;
+        }
         const loadSkills = async () => {
             setLoading(true);
             const data = await fetchSkills(i18n.language);
@@ -17,7 +22,7 @@ const Skills = () => {
             setLoading(false);
         };
         loadSkills();
-    }, [i18n.language]);
+    }, [i18n.language, initialSkills]);
 
     // Filter skills based on tab
     const filteredSkills = skills.filter(skill => {
@@ -5,6 +5,9 @@ import en from './locales/en.json';
 import fr from './locales/fr.json';
 import ar from './locales/ar.json';
 
+// Also the URL prefixes (/fr/blog/...) the sitemap links to.
+export const LANGUAGES = ['en', 'fr', 'ar'];
+
 i18n
     .use(LanguageDetector)
     .use(initReactI18next)
@@ -15,11 +18,13 @@ i18n
             ar: { translation: ar },
         },
         fallbackLng: 'en',
+        supportedLngs: LANGUAGES,
         interpolation: {
             escapeValue: false,
         },
         detection: {
-            order: ['localStorage', 'navigator'],
+            order: ['path', 'localStorage', 'navigator'],
+            lookupFromPathIndex: 0,
             caches: ['localStorage'],
         },
     });
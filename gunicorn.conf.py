@@ -0,0 +1,37 @@
+"""
+gunicorn settings, read from the working directory (see the procfile).
+
+Workers are uvicorn's ASGI workers, so the /api/async/ endpoints run on an
+event loop; the other views run in a thread per request, as Django does
+under ASGI. The application is imported and warmed up once in the master
+(``preload_app``, then core.startup.preload()) and shared copy-on-write
+by the workers, which only open their database connections after the
+fork (core/startup.py). Workers are recycled after ``max_requests``; the
+jitter keeps them from all restarting at once.
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+worker_class = 'uvicorn_worker.UvicornWorker'
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = max_requests // 10
+preload_app = True
+
+
+def on_starting(server):
+    # preload_app has already imported the application.
+    from core.startup import preload
+    preload()
+
+
+def pre_fork(server, worker):
+    # Nothing the master opened while loading the app may be shared.
+    from django.db import connections
+    connections.close_all()
+
+
+def post_fork(server, worker):
+    from core.startup import warm_up
+    warm_up()
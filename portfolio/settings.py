@@ -1,6 +1,5 @@
 from pathlib import Path
 import os
-import datetime
 import environ
 import dj_database_url
 
@@ -33,17 +32,25 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     # 3rd parties
-    'cloudinary_storage',
     'rest_framework',
     'corsheaders',
     'markdownx',
-    'cloudinary', # Moved up to group 3rd parties together
 
     # apps 
     'core',
 ]
 
+# Cloudinary holds uploaded media when it is configured. Without it (local
+# development, CI) media stays in MEDIA_ROOT and the cloudinary packages are
+# never imported.
+CLOUDINARY_CLOUD_NAME = env('CLOUDINARY_CLOUD_NAME', default='')
+if CLOUDINARY_CLOUD_NAME:
+    INSTALLED_APPS[INSTALLED_APPS.index('rest_framework'):0] = ['cloudinary_storage']
+    INSTALLED_APPS[INSTALLED_APPS.index('core'):0] = ['cloudinary']
+
 MIDDLEWARE = [
+    'core.middleware.InstrumentationMiddleware',
+    'core.compression.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     "whitenoise.middleware.WhiteNoiseMiddleware", 
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -102,9 +109,119 @@ DATABASES = {
     }
 }
 
+# On PostgreSQL, connections come from psycopg's connection pool (DB_POOL).
+# Under ASGI (see gunicorn.conf.py) each request's sync code runs in a thread
+# of its own, so a persistent connection would never be reused: Django
+# doesn't allow both at once, and DB_CONN_MAX_AGE (seconds a connection is
+# kept open, health-checked before reuse) only applies with DB_POOL=False.
+DB_CONN_MAX_AGE = env.int('DB_CONN_MAX_AGE', default=0)
+DB_POOL = env.bool('DB_POOL', default=True)
+DB_POOL_OPTIONS = {
+    'min_size': env.int('DB_POOL_MIN_SIZE', default=2),
+    'max_size': env.int('DB_POOL_MAX_SIZE', default=10),
+    'timeout': env.float('DB_POOL_TIMEOUT', default=10),
+}
+
+
+def database_config(url):
+    config = dj_database_url.parse(url, conn_max_age=DB_CONN_MAX_AGE, conn_health_checks=True)
+    if DB_POOL and config['ENGINE'] == 'django.db.backends.postgresql':
+        config['CONN_MAX_AGE'] = 0
+        config['OPTIONS'] = {**config.get('OPTIONS', {}), 'pool': DB_POOL_OPTIONS}
+    return config
+
+
 database_url = os.environ.get("DATABASE_URL") 
 if database_url:
-    DATABASES["default"] = dj_database_url.parse(database_url) 
+    DATABASES["default"] = database_config(database_url)
+
+# Optional read replica for the public GET endpoints (see core/routers.py).
+# Reads stay on the primary for DATABASE_REPLICA_LAG seconds after a change.
+database_replica_url = os.environ.get("DATABASE_REPLICA_URL")
+if database_replica_url:
+    DATABASES["replica"] = {**database_config(database_replica_url), 'TEST': {'MIRROR': 'default'}}
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+DATABASE_REPLICA_LAG = env.int('DATABASE_REPLICA_LAG', default=5)
+
+# Cache: any backend django-environ understands, e.g. redis://, memcache://.
+# It holds the version stamps, throttles and cached responses, so production
+# needs one every gunicorn worker and the job worker share: set CACHE_URL to
+# Redis (or memcached). The local-memory default is per process and only fits
+# development and tests. dbcache://django_cache works too (core's migrations
+# create the table) but costs queries on every request.
+CACHES = {
+    'default': env.cache_url('CACHE_URL', default='locmemcache://'),
+    # Visitors whose views already counted (core/analytics.py), kept apart so
+    # a database CACHE_URL never turns a view beacon into a write. Point it at
+    # the shared Redis in production: locally each process dedups on its own.
+    'analytics': env.cache_url('ANALYTICS_CACHE_URL', default='locmemcache://analytics'),
+}
+
+# Rendered API responses (see core/cache.py)
+API_CACHE_ENABLED = env.bool('API_CACHE_ENABLED', default=True)
+API_CACHE_ALIAS = 'default'
+API_CACHE_TIMEOUT = env.int('API_CACHE_TIMEOUT', default=60 * 60 * 24)
+
+# Compression of API responses (see core/compression.py). Levels are per
+# Content-Encoding; `manage.py bench_compression` measures the trade-off.
+API_COMPRESSION_ENABLED = env.bool('API_COMPRESSION_ENABLED', default=True)
+API_COMPRESSION_PREFIX = '/api/'
+API_COMPRESSION_MIN_SIZE = env.int('API_COMPRESSION_MIN_SIZE', default=1024)
+API_COMPRESSION_LEVELS = {'br': 5, 'zstd': 6, 'gzip': 6}
+
+# Sitemaps and feeds (see core/syndication.py) link to the frontend's pages
+# (frontend/src/App.jsx). Each language's URL has its code as a prefix, e.g.
+# /fr/blog/<slug>; the unprefixed URL picks the visitor's language.
+SITE_URL = env('SITE_URL', default='https://souleimane.com')
+SITE_PATHS = {
+    'home': '/',
+    'projects': '/projects',
+    'project': '/projects/{slug}',
+    'posts': '/blog',
+    'post': '/blog/{slug}',
+}
+# URLs per sitemap file (the protocol allows 50,000)
+SITEMAP_MAX_URLS = 50000
+FEED_TITLE = env('FEED_TITLE', default='Souleimane')
+FEED_DESCRIPTION = env('FEED_DESCRIPTION', default='Latest blog posts')
+FEED_ITEMS = env.int('FEED_ITEMS', default=20)
+
+# Railway's proxy appends the client's address to X-Forwarded-For. DRF only
+# trusts the entries added by this many proxies when identifying a client
+# (throttles, view dedup), so the client can't choose its own identity.
+REST_FRAMEWORK = {
+    'NUM_PROXIES': env.int('NUM_PROXIES', default=1),
+}
+
+# Per-IP limit on the contact/comment endpoints (see core/throttling.py)
+WRITE_THROTTLE_BURST = env.int('WRITE_THROTTLE_BURST', default=5)
+WRITE_THROTTLE_RATE = env('WRITE_THROTTLE_RATE', default='20/hour')
+
+# Email: prints to the console unless EMAIL_URL points at a real server,
+# e.g. smtp://localhost:1025 for a local debugging SMTP server.
+vars().update(env.email_url('EMAIL_URL', default='consolemail://'))
+DEFAULT_FROM_EMAIL = env('DEFAULT_FROM_EMAIL', default='webmaster@localhost')
+# Who hears about new contact messages and comments (sent by core/tasks.py)
+NOTIFICATION_EMAILS = env.list('NOTIFICATION_EMAILS', default=[])
+
+# Request metrics: Server-Timing headers and /metrics (see core/metrics.py).
+# With several gunicorn workers, point METRICS_DIR at a directory they share.
+METRICS_ENABLED = env.bool('METRICS_ENABLED', default=True)
+METRICS_DIR = env('METRICS_DIR', default=None)
+# Bearer token for scraping /metrics; staff sessions always have access.
+METRICS_TOKEN = env('METRICS_TOKEN', default='')
+METRICS_SLOW_QUERY_MS = env.float('METRICS_SLOW_QUERY_MS', default=100)
+METRICS_N_PLUS_ONE_THRESHOLD = env.int('METRICS_N_PLUS_ONE_THRESHOLD', default=10)
+
+# View counting (see core/analytics.py). Hits are buffered per process and
+# written every ANALYTICS_FLUSH_SECONDS, which bounds what a crashed worker
+# loses; 0 only flushes when the buffer fills up and at exit.
+ANALYTICS_ENABLED = env.bool('ANALYTICS_ENABLED', default=True)
+ANALYTICS_FLUSH_SECONDS = env.float('ANALYTICS_FLUSH_SECONDS', default=10)
+ANALYTICS_MAX_BUFFERED = env.int('ANALYTICS_MAX_BUFFERED', default=5000)
+# Repeat views by the same visitor within this window count once.
+ANALYTICS_DEDUP_SECONDS = env.int('ANALYTICS_DEDUP_SECONDS', default=30 * 60)
+ANALYTICS_CACHE_ALIAS = 'analytics'
 
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -135,7 +252,10 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 # 9. Storage Settings (Optimized for Railway/WhiteNoise)
 STORAGES = {
     "default": {
-        "BACKEND": "cloudinary_storage.storage.MediaCloudinaryStorage",
+        "BACKEND": (
+            "cloudinary_storage.storage.MediaCloudinaryStorage" if CLOUDINARY_CLOUD_NAME
+            else "django.core.files.storage.FileSystemStorage"
+        ),
     },
     "staticfiles": {
         # Using CompressedManifest enables hashing and caching for better performance
@@ -146,15 +266,17 @@ STORAGES = {
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Markdownx settings
-MARKDOWNX_IMAGE_MAX_SIZE = {'size': (4000, 4000), 'quality': 100}
-MARKDOWNX_MEDIA_PATH = datetime.datetime.now().strftime('markdownx/%Y/%m/%d')
+# Originals only; pages get the derivatives from core/images.py
+MARKDOWNX_IMAGE_MAX_SIZE = {'size': (2560, 2560), 'quality': 90}
+# strftime() pattern, expanded per upload (see core/forms.py)
+MARKDOWNX_MEDIA_PATH = 'markdownx/%Y/%m/%d'
 MARKDOWNX_UPLOAD_MAX_SIZE = 50 * 1024 * 1024 
 MARKDOWNX_UPLOAD_CONTENT_TYPES = ['image/jpeg', 'image/png', 'image/svg+xml']
 
 CLOUDINARY_STORAGE = {
-    'CLOUD_NAME': env('CLOUDINARY_CLOUD_NAME'),
-    'API_KEY': env('CLOUDINARY_API_KEY'),
-    'API_SECRET': env('CLOUDINARY_API_SECRET'), 
+    'CLOUD_NAME': CLOUDINARY_CLOUD_NAME,
+    'API_KEY': env('CLOUDINARY_API_KEY', default=''),
+    'API_SECRET': env('CLOUDINARY_API_SECRET', default=''), 
     'MDX_UPLOAD_DATA': {'unique_filename': False},
     'EXTRA_PARAMS': {
        'unique_filename': False,
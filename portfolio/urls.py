@@ -3,10 +3,23 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from core.views import (
+    MarkdownImageUploadView, metrics_view, post_feed, sitemap_index, sitemap_pages, sitemap_shard,
+)
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/async/', include('core.async_urls')),
     path('api/', include('core.urls')), 
+    # Replaces markdownx's own upload view (see core/forms.py)
+    path('markdownx/upload/', MarkdownImageUploadView.as_view(), name='markdownx_upload'),
     path('markdownx/', include('markdownx.urls')), 
+    path('metrics', metrics_view, name='metrics'),
+    path('sitemap.xml', sitemap_index, name='sitemap'),
+    path('sitemaps/<str:lang>/pages.xml', sitemap_pages, name='sitemap-pages'),
+    path('sitemaps/<str:lang>/<slug:kind>-<int:shard>.xml', sitemap_shard, name='sitemap-shard'),
+    path('feeds/<str:lang>/posts.rss', post_feed, {'feed_type': 'rss'}, name='post-feed-rss'),
+    path('feeds/<str:lang>/posts.atom', post_feed, {'feed_type': 'atom'}, name='post-feed-atom'),
 ]
 
 if settings.DEBUG: